@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""Benchmark of multi-threaded band reads.
+
+All the bands of an ENVISAT product are read sequentially, then
+concurrently using a pool of threads (one band per task), and finally
+sequentially decoding each band with the *workers* option.
+
+On a free-threaded Python (e.g. 3.14t) all the approaches can use
+multiple CPUs; on a standard build only the decoding of the band data,
+that is performed without holding the GIL, runs in parallel.
+
+Usage::
+
+  $ python3 threaded_read.py <envisat-product> [<nthreads>]
+
+"""
+
+import os
+import sys
+import time
+import sysconfig
+from concurrent.futures import ThreadPoolExecutor
+
+import epr
+
+
+def read_all(product, band_names, workers=1):
+    for name in band_names:
+        product.get_band(name).read_as_array(workers=workers)
+
+
+def read_threads(product, band_names, nthreads):
+    def read(name):
+        return product.get_band(name).read_as_array()
+
+    with ThreadPoolExecutor(nthreads) as executor:
+        for _ in executor.map(read, band_names):
+            pass
+
+
+def timeit(func, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(*argv):
+    if not argv:
+        argv = sys.argv
+
+    if len(argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    filename = argv[1]
+    nthreads = int(argv[2]) if len(argv) > 2 else os.cpu_count() or 1
+
+    gil = (
+        "disabled"
+        if sysconfig.get_config_var("Py_GIL_DISABLED")
+        else "enabled"
+    )
+    print(f"Python {sys.version.split()[0]} (GIL {gil}), {nthreads} threads")
+
+    with epr.open(filename) as product:
+        band_names = product.get_band_names()
+
+        elapsed = timeit(read_all, product, band_names)
+        print(f"sequential:          {elapsed:8.3f} s")
+
+        elapsed = timeit(read_threads, product, band_names, nthreads)
+        print(f"thread pool:         {elapsed:8.3f} s")
+
+        elapsed = timeit(read_all, product, band_names, nthreads)
+        print(f"workers={nthreads:<3d}         {elapsed:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -47,7 +47,9 @@ class NumpyExtension(setuptools.Extension):
         self._include_dirs = include_dirs
 
 
-def setup_extension(eprsrcdir=None, *, coverage: bool = False):
+def setup_extension(
+    eprsrcdir=None, *, coverage: bool = False, subinterpreters: bool = False
+):
     import glob
 
     if eprsrcdir:
@@ -89,13 +91,25 @@ def setup_extension(eprsrcdir=None, *, coverage: bool = False):
     else:
         if Version(Cython.__version__) >= Version("3.1.0"):
             ext.cython_directives["freethreading_compatible"] = True
+            if subinterpreters:
+                # PEP 684 (experimental): module state is per-interpreter,
+                # extension types must be heap types when the module
+                # state is enabled
+                ext.cython_directives["subinterpreters_compatible"] = "own_gil"
+                ext.define_macros.append(("CYTHON_USE_MODULE_STATE", "1"))
+                ext.define_macros.append(("CYTHON_USE_TYPE_SPECS", "1"))
+        elif subinterpreters:
+            print("SUBINTERPRETERS: Cython >= 3.1 is required")
 
     return ext
 
 
-def make_config(eprsrcdir=None, *, coverage=False):
+def make_config(eprsrcdir=None, *, coverage=False, subinterpreters=False):
+    ext = setup_extension(
+        eprsrcdir, coverage=coverage, subinterpreters=subinterpreters
+    )
     return {
-        "ext_modules": [setup_extension(eprsrcdir, coverage=coverage)],
+        "ext_modules": [ext],
     }
 
 
@@ -106,6 +120,12 @@ def get_parser():
     DEFAULT_COVERAGE = bool(
         PYEPR_COVERAGE_STR in {"Y", "YES", "TRUE", "OK", "ON", "1"}
     )
+    PYEPR_SUBINTERPRETERS_STR = os.environ.get(
+        "PYEPR_SUBINTERPRETERS", ""
+    ).upper()
+    DEFAULT_SUBINTERPRETERS = bool(
+        PYEPR_SUBINTERPRETERS_STR in {"Y", "YES", "TRUE", "OK", "ON", "1"}
+    )
     DEFAULT_EPRAPI_SRC = "extern/epr-api/src"
     if not os.path.exists(DEFAULT_EPRAPI_SRC):
         DEFAULT_EPRAPI_SRC = ""
@@ -119,6 +139,14 @@ def get_parser():
         help="build the epr module to allow cython coverage measurement "
         "(default: %(default)s)",
     )
+    parser.add_argument(
+        "--subinterpreters",
+        action="store_true",
+        default=DEFAULT_SUBINTERPRETERS,
+        help="build the epr module with (experimental) support for "
+        "sub-interpreters with a per-interpreter GIL "
+        "(default: %(default)s)",
+    )
     parser.add_argument(
         "--epr-api-src",
         default=DEFAULT_EPRAPI_SRC,
@@ -135,8 +163,13 @@ if __name__ == "__main__":
     extra_args, setup_argv = parser.parse_known_args(sys.argv)
     sys.argv[:] = setup_argv
     print("PYEPR_COVERAGE:", extra_args.coverage)
+    print("PYEPR_SUBINTERPRETERS:", extra_args.subinterpreters)
 
-    config = make_config(extra_args.epr_api_src, coverage=extra_args.coverage)
+    config = make_config(
+        extra_args.epr_api_src,
+        coverage=extra_args.coverage,
+        subinterpreters=extra_args.subinterpreters,
+    )
 
     if "-h" in setup_argv or "--help" in setup_argv:
         msg = parser.format_help()
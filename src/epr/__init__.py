@@ -67,18 +67,31 @@ from ._epr import (  # noqa: F401
     Record,
     Dataset,
     EPRTime,
+    FlagDef,
     Product,
     EPRError,
     EprObject,
+    BitmaskExpr,
+    ProductPool,
+    TiePointGrid,
     EPRValueError,
+    ProductHeader,
     open,  # noqa: A004
+    read_headers,
     create_raster,
+    compile_bitmask,
+    get_num_threads,
     get_numpy_dtype,
+    set_num_threads,
+    clear_layout_cache,
     get_data_type_size,
     data_type_id_to_str,
     create_bitmask_raster,
     get_sample_model_name,
+    clear_record_info_cache,
     get_scaling_method_name,
+    set_record_info_cache_size,
+    get_record_info_cache_stats,
 )
 
 __version__ = "1.3.1.dev0"
@@ -60,6 +60,8 @@ cdef extern from 'epr_api.h' nogil:
     int EPR_MAGIC_RASTER
     int EPR_MAGIC_FLAG_DEF
 
+    int EPR_PRODUCT_ID_STRLEN
+
     enum EPR_ErrCode:
         e_err_none = 0
         e_err_null_pointer = 1
@@ -344,6 +346,11 @@ cdef extern from 'epr_api.h' nogil:
     EPR_SRaster* epr_create_raster(EPR_EDataTypeId, uint, uint, uint, uint)
     EPR_SRaster* epr_create_bitmask_raster(uint, uint, uint, uint)
 
+    # PTR ARRAY (epr_ptrarray.h)
+    EPR_SPtrArray* epr_create_ptr_array(unsigned int)
+    void epr_free_ptr_array(EPR_SPtrArray*)
+    int epr_add_ptr_array_elem(EPR_SPtrArray*, void*)
+
 
 # @IMPORTANT:
 #
@@ -363,6 +370,12 @@ ctypedef struct EPR_FieldInfo:
     uint tot_size
 
 
+# epr_param.h
+ctypedef struct EPR_ParamElem:
+    char* param_name
+    uint param_value
+
+
 # epr_record.h
 ctypedef struct EPR_RecordInfo:
     char* dataset_name
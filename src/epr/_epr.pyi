@@ -1,7 +1,10 @@
 import os
 import typing
+import contextlib
+import concurrent.futures
 
 import numpy as np
+import numpy.typing as npt
 
 EPR_C_API_VERSION: str
 E_SMID_LIN: int
@@ -30,6 +33,21 @@ class EPRTime(typing.NamedTuple):
     seconds: int
     microseconds: int
 
+class TiePointGrid(typing.NamedTuple):
+    lines: np.ndarray
+    pixels: np.ndarray
+    data: np.ndarray
+
+class FlagDef(typing.NamedTuple):
+    bit_mask: int
+    description: str | None
+
+class ProductHeader(typing.NamedTuple):
+    file_path: str | bytes
+    mph: dict[str, typing.Any]
+    sph: dict[str, typing.Any]
+    dsds: np.ndarray
+
 MJD: np.dtype
 
 _EPR_MAGIC_FIELD: int
@@ -86,6 +104,7 @@ class Record(EprObject):
     dataset_name: str
     tot_size: int
     index: int
+    dtype: np.dtype
 
     def fields(self) -> list[Field]: ...
     def get_field(self, name: str) -> Field: ...
@@ -119,6 +138,7 @@ def create_raster(
     src_height: int,
     xstep: int = ...,
     ystep: int = ...,
+    buffer: typing.Any = ...,
 ) -> Raster: ...
 def create_bitmask_raster(
     src_width: int, src_height: int, xstep: int = ..., ystep: int = ...
@@ -133,6 +153,7 @@ class Band(EprObject):
     scaling_offset: float
     scaling_factor: float
     bm_expr: str | None
+    flag_coding: typing.Mapping[str, FlagDef] | None
     unit: str | None
     description: str
     lines_mirrored: bool
@@ -144,6 +165,7 @@ class Band(EprObject):
         src_height: int = ...,
         xstep: int = ...,
         ystep: int = ...,
+        buffer: typing.Any = ...,
     ) -> Raster: ...
     def get_name(self) -> str: ...
     def read_as_array(
@@ -154,17 +176,51 @@ class Band(EprObject):
         yoffset: int = ...,
         xstep: int = ...,
         ystep: int = ...,
+        out: np.ndarray | None = ...,
+        scaled: bool = ...,
+        bbox: tuple[float, float, float, float] | None = ...,
+        mask: str | BitmaskExpr | None = ...,
+        fill_value: float | None = ...,
+        masked: bool = ...,
+        workers: int | None = ...,
+    ) -> np.ndarray: ...
+    def apply_scaling(
+        self,
+        raw: npt.ArrayLike,
+        dtype: npt.DTypeLike = ...,
+        out: np.ndarray | None = ...,
     ) -> np.ndarray: ...
     def read_raster(
         self,
         xoffset: int = ...,
         yoffset: int = ...,
         raster: Raster | None = ...,
+        workers: int | None = ...,
     ) -> Raster: ...
+    def iter_blocks(
+        self,
+        block_shape: tuple[int | None, int | None] = ...,
+        xstep: int = ...,
+        ystep: int = ...,
+        halo: int = ...,
+    ) -> typing.Iterator[tuple[tuple[int, int, int, int], np.ndarray]]: ...
+    def read_tie_points(self) -> TiePointGrid: ...
+    def interpolate(
+        self, lines: npt.ArrayLike, pixels: npt.ArrayLike
+    ) -> np.ndarray: ...
+    def read_flags(
+        self,
+        names: typing.Iterable[str] | None = ...,
+        window: tuple[int, int, int, int] | None = ...,
+        xstep: int = ...,
+        ystep: int = ...,
+        packed: bool = ...,
+    ) -> dict[str, np.ndarray]: ...
 
 class Dataset(EprObject):
     product: Product
     description: str
+    dtype: np.dtype
 
     def create_record(self) -> Record: ...
     def get_dsd(self) -> DSD: ...
@@ -175,18 +231,38 @@ class Dataset(EprObject):
         self, index: int, record: Record | None = ...
     ) -> Record: ...
     def records(self) -> list[Record]: ...
+    def as_memmap(self, writable: bool = ...) -> np.memmap: ...
+    def read_records(
+        self,
+        start: int = ...,
+        stop: int | None = ...,
+        indices: npt.ArrayLike | None = ...,
+    ) -> np.ndarray: ...
+    def read_field(
+        self,
+        name: str,
+        start: int = ...,
+        stop: int | None = ...,
+        step: int = ...,
+    ) -> np.ndarray: ...
     def __iter__(self) -> typing.Generator[Record]: ...
 
 class Product(EprObject):
     file_path: str
     mode: str
+    backend: str
     tot_size: int
     id_string: str
     meris_iodd_version: int
     closed: bool
 
     def __init__(
-        self, filename: str | os.PathLike[str], mode: str = ...
+        self,
+        filename: str | os.PathLike[str],
+        mode: str = ...,
+        backend: str = ...,
+        lazy: bool = ...,
+        layout_cache: bool = ...,
     ) -> None: ...
     def bands(self) -> list[Band]: ...
     def close(self) -> None: ...
@@ -199,6 +275,7 @@ class Product(EprObject):
     def get_dataset_at(self, index) -> Dataset: ...
     def get_dataset_names(self) -> list[str]: ...
     def get_dsd_at(self, index: int) -> DSD: ...
+    def get_header(self) -> ProductHeader: ...
     def get_mph(self) -> Record: ...
     def get_num_bands(self) -> int: ...
     def get_num_datasets(self) -> int: ...
@@ -207,12 +284,99 @@ class Product(EprObject):
     def get_scene_width(self) -> int: ...
     def get_sph(self) -> Record: ...
     def read_bitmask_raster(
-        self, bm_expr: str, xoffset: int, yoffset: int, raster: Raster
+        self,
+        bm_expr: str | BitmaskExpr,
+        xoffset: int,
+        yoffset: int,
+        raster: Raster,
     ) -> Raster: ...
     def get_complex_band_as_array(
         self, i_band_name: str, q_band_name: str, *, strict: bool = ...
     ) -> np.ndarray: ...
+    def window_for_bbox(
+        self, lon_min: float, lat_min: float, lon_max: float, lat_max: float
+    ) -> tuple[int, int, int, int] | None: ...
+    def read_complex_band(
+        self,
+        iname: str,
+        qname: str,
+        window: tuple[int, int, int, int] | None = ...,
+        looks: tuple[int, int] | None = ...,
+        out: np.ndarray | None = ...,
+    ) -> np.ndarray: ...
+    def read_bands(
+        self,
+        names: typing.Iterable[str],
+        window: tuple[int, int, int, int] | None = ...,
+        xstep: int = ...,
+        ystep: int = ...,
+        out: typing.Sequence[np.ndarray] | None = ...,
+    ) -> dict[str, np.ndarray]: ...
+    def read_bitmasks(
+        self,
+        exprs: typing.Mapping[str, str | BitmaskExpr],
+        window: tuple[int, int, int, int] | None = ...,
+        xstep: int = ...,
+        ystep: int = ...,
+        labels: bool = ...,
+    ) -> dict[str, np.ndarray] | np.ndarray: ...
 
+class BitmaskExpr(EprObject):
+    @property
+    def product(self) -> Product: ...
+    @property
+    def expr(self) -> str: ...
+    @property
+    def band_names(self) -> tuple[str, ...]: ...
+    def read(
+        self,
+        window: tuple[int, int, int, int] | None = ...,
+        xstep: int = ...,
+        ystep: int = ...,
+        out: np.ndarray | None = ...,
+    ) -> np.ndarray: ...
+
+def compile_bitmask(product: Product, expr: str) -> BitmaskExpr: ...
+def set_num_threads(nthreads: int | None) -> int: ...
+def get_num_threads() -> int: ...
+def get_record_info_cache_stats() -> dict[str, int]: ...
+def set_record_info_cache_size(max_unused: int) -> int: ...
+def clear_record_info_cache() -> int: ...
+def clear_layout_cache(max_age: float | None = ...) -> int: ...
 def open(  # noqa: A001
-    filename: str | os.PathLike[str], mode: str = ...
+    filename: str | os.PathLike[str],
+    mode: str = ...,
+    backend: str = ...,
+    lazy: bool = ...,
+    layout_cache: bool = ...,
 ) -> Product: ...
+def read_headers(
+    paths: typing.Iterable[str | os.PathLike[str]],
+    workers: int | None = ...,
+    executor: concurrent.futures.Executor | None = ...,
+) -> list[ProductHeader]: ...
+
+class ProductPool:
+    def __init__(
+        self, max_open: int | None = ..., max_bytes: int | None = ...
+    ) -> None: ...
+    @property
+    def max_open(self) -> int: ...
+    @property
+    def max_bytes(self) -> int | None: ...
+    def __len__(self) -> int: ...
+    def open(
+        self,
+        filename: str | os.PathLike[str],
+        mode: str = ...,
+        backend: str = ...,
+    ) -> Product: ...
+    def checkout(
+        self,
+        filename: str | os.PathLike[str],
+        mode: str = ...,
+        backend: str = ...,
+    ) -> contextlib.AbstractContextManager[Product]: ...
+    def clear(self) -> int: ...
+    def close(self) -> None: ...
+    def get_stats(self) -> dict[str, int | None]: ...
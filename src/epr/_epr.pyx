@@ -24,27 +24,170 @@
 
 from posix.stdio cimport fileno
 
+cimport cython
 cimport numpy as np
 from libc cimport errno, stdio
 from libc cimport string as cstring
+from libc.stdint cimport int64_t
+from libc.stdlib cimport calloc, free, strtod, strtol, strtoul
 from libc.stdio cimport FILE
+from cpython.buffer cimport (
+    PyBUF_C_CONTIGUOUS, PyBUF_SIMPLE, PyBUF_WRITABLE, PyBuffer_Release,
+    PyObject_GetBuffer,
+)
 from cpython.object cimport PyObject_AsFileDescriptor
+from cpython.unicode cimport PyUnicode_DecodeLatin1
 from cpython.weakref cimport PyWeakref_NewRef
 
 from ._epr cimport *
 
 np.import_array()
 
+
+cdef extern from *:
+    """
+    #if defined(_WIN32)
+    #include <errno.h>
+    #define PYEPR_HAVE_FMEMOPEN 0
+    static FILE* pyepr_fmemopen(void* buf, size_t size, const char* mode)
+    {
+        errno = ENOSYS;
+        return NULL;
+    }
+    #else
+    #define PYEPR_HAVE_FMEMOPEN 1
+    #define pyepr_fmemopen fmemopen
+    #endif
+    """
+    const bint PYEPR_HAVE_FMEMOPEN
+    FILE* pyepr_fmemopen(void* buf, size_t size, const char* mode) nogil
+
+
+# 64-bit file offsets (long is 32-bit on Windows)
+cdef extern from *:
+    """
+    #if defined(_WIN32)
+    #include <errno.h>
+    #define PYEPR_HAVE_PREAD 0
+    static Py_ssize_t pyepr_pread(int fd, void* buf, size_t size,
+                                  int64_t offset)
+    {
+        errno = ENOSYS;
+        return -1;
+    }
+    #define pyepr_fseek(stream, offset, whence) \
+        _fseeki64((stream), (offset), (whence))
+    #else
+    #include <unistd.h>
+    #define PYEPR_HAVE_PREAD 1
+    #define pyepr_pread(fd, buf, size, offset) \
+        pread((fd), (buf), (size), (off_t)(offset))
+    #define pyepr_fseek(stream, offset, whence) \
+        fseeko((stream), (off_t)(offset), (whence))
+    #endif
+    """
+    const bint PYEPR_HAVE_PREAD
+    Py_ssize_t pyepr_pread(int fd, void* buf, size_t size,
+                           int64_t offset) nogil
+    int pyepr_fseek(FILE* stream, int64_t offset, int whence) nogil
+
+
+# band decoding functions (vendored from the private part of the
+# epr-api library)
+cdef extern from "epr_band_decode.h":
+    ctypedef void (*pyepr_line_decoder)(
+        const void*, const EPR_SBandId*, int, int, int, void*, int
+    ) noexcept nogil
+    pyepr_line_decoder pyepr_select_line_decoder(
+        EPR_EDataTypeId, EPR_ESampleModel, EPR_EDataTypeId
+    ) nogil
+    void pyepr_swap_bytes(void* elems, uint elem_size, uint nelems) nogil
+    void pyepr_mirror_float_lines(float*, uint, uint) nogil
+    void pyepr_mirror_uchar_lines(uchar*, uint, uint) nogil
+    void pyepr_mirror_ushort_lines(ushort*, uint, uint) nogil
+    void pyepr_mirror_uint_lines(uint*, uint, uint) nogil
+    void pyepr_zero_invalid_pixels(EPR_SRaster*, const EPR_SRaster*) nogil
+
+
+cdef struct _BandDecoder:
+    EPR_SBandId* band_id
+    pyepr_line_decoder decode
+    size_t field_offset     # offset of the field in the record
+    uint field_elems        # number of elements of the field
+    uint elem_size          # size of field elements
+    bint swap               # swap the field bytes (once per field)
+    int xoffset
+    void* buffer
+
+
+# op-codes of compiled bit-mask expressions (see compile_bitmask)
+cdef enum _BmOpCode:
+    _BM_REF = 1
+    _BM_AND
+    _BM_OR
+    _BM_NOT
+
+
+cdef struct _BmOp:
+    _BmOpCode op_code
+    Py_ssize_t band_index   # _BM_REF only
+    uint mask               # _BM_REF only
+
+
+import io
 import os
 import sys
+import json
+import mmap
+import time
 import atexit
+import string
+import hashlib
+import tempfile
+import threading
+from types import MappingProxyType
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import numpy as np
 
 
 cdef bint SWAP_BYTES = (sys.byteorder == "little")
 
+# number of samples processed at once by chunked readers
+cdef Py_ssize_t _CHUNK_SIZE = 1 << 20
+
+# default number of threads used to decode bands (see set_num_threads)
+_num_threads = 1
+
+# thread pool used to decode bands in parallel (lazily created)
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+cdef object _get_executor(int workers):
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers < workers:
+            if _executor is not None:
+                # the tasks already submitted by other threads are still
+                # executed, then the threads of the previous pool exit
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(
+                workers, thread_name_prefix="pyepr"
+            )
+            _executor_workers = workers
+        return _executor
+
+
+cdef int _get_workers(workers) except -1:
+    if workers is None:
+        return _num_threads
+    if workers < 1:
+        raise ValueError(f"invalid number of workers: {workers}")
+    return workers
+
 # internal utils
 _DEFAULT_FS_ENCODING = sys.getfilesystemencoding()
 
@@ -59,6 +202,11 @@ cdef inline str _to_str(bytes b, encoding="UTF-8"):
 
 # utils
 EPRTime = namedtuple("EPRTime", ("days", "seconds", "microseconds"))
+TiePointGrid = namedtuple("TiePointGrid", ("lines", "pixels", "data"))
+FlagDef = namedtuple("FlagDef", ("bit_mask", "description"))
+ProductHeader = namedtuple(
+    "ProductHeader", ("file_path", "mph", "sph", "dsds")
+)
 MJD = np.dtype(
     [
         ("days", f"i{sizeof(int)}"),
@@ -202,6 +350,80 @@ cdef const void* _to_ptr(np.ndarray a, EPR_DataTypeId etype):
     return p
 
 
+cdef object _record_dtype(const EPR_RecordInfo* info):
+    # Build the structured dtype describing the on-disk (big-endian)
+    # layout of records with the given record info.
+    # Spare fields are mapped onto padding bytes.
+    cdef const EPR_FieldInfo* field_info = NULL
+    cdef EPR_DataTypeId etype
+    cdef uint offset = 0
+    cdef uint index
+
+    names = []
+    formats = []
+    offsets = []
+    for index in range(info.field_infos.length):
+        field_info = <EPR_FieldInfo*>info.field_infos.elems[index]
+        etype = field_info.data_type_id
+        dtype = _DTYPE_MAP[etype]
+        if etype == e_tid_string:
+            dtype = np.dtype(f"S{field_info.tot_size}")
+        elif dtype is not None:
+            dtype = np.dtype(dtype).newbyteorder(">")
+            if dtype.itemsize * field_info.num_elems != field_info.tot_size:
+                dtype = None
+            elif field_info.num_elems > 1:
+                dtype = np.dtype((dtype, (field_info.num_elems,)))
+
+        if dtype is not None:
+            names.append(_to_str(field_info.name, "ascii"))
+            formats.append(dtype)
+            offsets.append(offset)
+
+        offset += field_info.tot_size
+
+    return np.dtype(
+        {
+            "names": names,
+            "formats": formats,
+            "offsets": offsets,
+            "itemsize": info.tot_size,
+        }
+    )
+
+
+cdef size_t _get_field_offset(const EPR_RecordInfo* info,
+                              uint index) noexcept:
+    # Offset of the field with the given index from the record start
+    cdef size_t offset = 0
+    cdef uint i
+
+    for i in range(index):
+        offset += (<EPR_FieldInfo*>info.field_infos.elems[i]).tot_size
+
+    return offset
+
+
+cdef size_t _pread_all(int fd, char* buf, size_t size,
+                       int64_t offset) noexcept nogil:
+    # Read *size* bytes starting from the specified (absolute) file
+    # offset without using (or changing) the file position, so that
+    # concurrent reads do not interfere. Partial reads are retried.
+    # The number of bytes actually read is returned.
+    cdef size_t nread = 0
+    cdef Py_ssize_t ret
+
+    while nread < size:
+        ret = pyepr_pread(fd, buf + nread, size - nread, offset + nread)
+        if ret < 0 and errno.errno == errno.EINTR:
+            continue
+        if ret <= 0:
+            break
+        nread += ret
+
+    return nread
+
+
 class EPRError(Exception):
     """EPR API error."""
 
@@ -218,33 +440,352 @@ class EPRValueError(EPRError, ValueError):
     pass
 
 
-cdef pyepr_check_errors():
-    cdef int code
-    cdef str msg
-    code = epr_get_last_err_code()
-    if code != e_err_none:
-        msg = _to_str(<char*>epr_get_last_err_message(), "ascii")
+# The error state of the EPR C API is global and the C API functions
+# reading data use the (shared) input stream of the product: calls are
+# serialized using this lock and the error state is moved into a
+# per-call _ErrorState structure before the lock is released.
+# Being a C global, the lock is shared by all the (sub-)interpreters.
+cdef cython.pymutex _epr_lock
+
+# number of interpreters using the EPR C API (protected by _epr_lock)
+cdef Py_ssize_t _epr_api_refcount = 0
+
+
+cdef struct _ErrorState:
+    EPR_EErrCode code
+    char message[256]
+
+
+cdef void pyepr_pop_error(_ErrorState* err) noexcept nogil:
+    # Move the error state of the C API into *err* and clear it
+    cdef const char* msg = NULL
+
+    err.code = epr_get_last_err_code()
+    err.message[0] = 0
+    if err.code != e_err_none:
+        msg = epr_get_last_err_message()
+        if msg is not NULL:
+            cstring.strncpy(err.message, msg, sizeof(err.message) - 1)
+            err.message[sizeof(err.message) - 1] = 0
         epr_clear_err()
 
-        # @TODO: if not msg: msg = EPR_ERR_MSG[code]
-        if (e_err_invalid_product_id <= code <= e_err_invalid_keyword_name or
-            code in (e_err_null_pointer,
-                     e_err_illegal_arg,
-                     e_err_index_out_of_range)):
-            raise EPRValueError(msg, code)
-        else:
-            raise EPRError(msg, code)
+
+cdef int pyepr_raise_error(const _ErrorState* err) except -1:
+    cdef int code = err.code
+    cdef str msg = _to_str(err.message, "ascii")
+
+    # @TODO: if not msg: msg = EPR_ERR_MSG[code]
+    if (e_err_invalid_product_id <= code <= e_err_invalid_keyword_name or
+        code in (e_err_null_pointer,
+                 e_err_illegal_arg,
+                 e_err_index_out_of_range)):
+        raise EPRValueError(msg, code)
+    else:
+        raise EPRError(msg, code)
+
+
+cdef pyepr_check_errors(const _ErrorState* err=NULL):
+    cdef _ErrorState state
+    if err is NULL:
+        with nogil, _epr_lock:
+            pyepr_pop_error(&state)
+        err = &state
+    if err.code != e_err_none:
+        pyepr_raise_error(err)
 
 
-cdef pyepr_null_ptr_error(str msg="null pointer"):
-    cdef int code
-    cdef str eprmsg = _to_str(<char*>epr_get_last_err_message(), "ascii")
+cdef pyepr_null_ptr_error(str msg="null pointer",
+                          const _ErrorState* err=NULL):
+    cdef _ErrorState state
+    if err is NULL:
+        with nogil, _epr_lock:
+            pyepr_pop_error(&state)
+        err = &state
 
-    code = epr_get_last_err_code()
+    raise EPRValueError(
+        f"{msg}: {_to_str(err.message, 'ascii')}",
+        code=err.code if err.code else None,
+    )
 
-    epr_clear_err()
 
-    raise EPRValueError(f"{msg}: {eprmsg}", code=code if code else None)
+# Process-wide cache of record layouts.
+#
+# The EPR C API builds the layout of the records of each dataset
+# (EPR_RecordInfo) from the compiled-in DDDB tables the first time it is
+# needed, and caches it in the product (record_info_cache): identical
+# layouts are built and kept in memory once for each open product.
+# Layouts only depend on the product type, on the DDDB tables selected
+# for the product (MERIS IODD version, ASAR software version) and on the
+# dynamic DDDB parameters derived from the SPH (param_table), so products
+# with the same key share a cache entry: the record infos of the entry
+# are added to the cache of the product when it is loaded, and the ones
+# built while the product is open are moved into the entry when it is
+# closed (before epr_close_product frees the product cache).
+# Entries are reference counted by the open products using them, and at
+# most _ric_max_unused unused entries are kept (least recently used
+# entries are evicted first).
+# The cache is shared by all the (sub-)interpreters: all the _ric_*
+# functions and variables must be used holding _epr_lock.
+#
+# Ownership of record infos: the C API frees all the record infos in
+# the cache of the product (record_info_cache) in epr_close_product,
+# while the ones of the MPH and SPH records are also freed with the
+# records themselves.
+# For this reason _ric_detach, that must be called just before
+# epr_close_product, removes from the product cache all the record
+# infos owned by the cache entry, leaving only the ones that the C API
+# shall free; record infos are never shared by two cache entries.
+# The structures of the record infos are replicated in _epr.pxd, no
+# private function of the C API is used.
+cdef enum:
+    _RIC_KEY_SIZE = 128
+
+
+cdef struct _RecordInfoCacheEntry:
+    char key[_RIC_KEY_SIZE]
+    EPR_SPtrArray* record_infos
+    Py_ssize_t refcount
+    _RecordInfoCacheEntry* prev
+    _RecordInfoCacheEntry* next
+
+
+# most recently used entry first
+cdef _RecordInfoCacheEntry* _ric_head = NULL
+cdef Py_ssize_t _ric_max_unused = 32
+cdef unsigned long long _ric_hits = 0
+cdef unsigned long long _ric_misses = 0
+cdef unsigned long long _ric_evictions = 0
+
+
+cdef uint _ric_main_params_size(EPR_SProductId* product_id) noexcept nogil:
+    # The record size of the ASAR main processing parameters ADS, that
+    # selects the DDDB tables of the product (see
+    # epr_detect_asar_sw_version)
+    cdef const EPR_SDSD* dsd
+    cdef uint i
+
+    for i in range(epr_get_num_dsds(product_id)):
+        dsd = epr_get_dsd_at(product_id, i)
+        if (dsd is not NULL and dsd.ds_name is not NULL and
+                cstring.strncmp(dsd.ds_name,
+                                "MAIN PROCESSING PARAMS ADS", 26) == 0):
+            return dsd.dsr_size
+    return 0
+
+
+cdef int _ric_make_key(EPR_SProductId* product_id, char* key) noexcept nogil:
+    cdef const EPR_SPtrArray* params = product_id.param_table
+    cdef const EPR_ParamElem* param
+    cdef size_t size = _RIC_KEY_SIZE
+    cdef size_t length
+    cdef int ret
+    cdef uint i
+
+    ret = stdio.snprintf(
+        key, size, "%.10s:%d:%u", product_id.id_string,
+        product_id.meris_iodd_version,
+        _ric_main_params_size(product_id),
+    )
+    if ret < 0 or <size_t>ret >= size:
+        return -1
+    length = ret
+
+    if params is not NULL:
+        for i in range(params.length):
+            param = <const EPR_ParamElem*>params.elems[i]
+            ret = stdio.snprintf(
+                key + length, size - length, ":%s=%u",
+                param.param_name, param.param_value,
+            )
+            if ret < 0 or <size_t>ret >= size - length:
+                return -1
+            length += ret
+
+    return 0
+
+
+cdef void _ric_unlink(_RecordInfoCacheEntry* entry) noexcept nogil:
+    global _ric_head
+
+    if entry.prev is not NULL:
+        entry.prev.next = entry.next
+    else:
+        _ric_head = entry.next
+    if entry.next is not NULL:
+        entry.next.prev = entry.prev
+    entry.prev = NULL
+    entry.next = NULL
+
+
+cdef void _ric_push_front(_RecordInfoCacheEntry* entry) noexcept nogil:
+    global _ric_head
+
+    entry.prev = NULL
+    entry.next = _ric_head
+    if _ric_head is not NULL:
+        _ric_head.prev = entry
+    _ric_head = entry
+
+
+cdef void _ric_free_record_info(EPR_RecordInfo* info) noexcept nogil:
+    # see epr_free_record_info and epr_free_field_info
+    cdef EPR_FieldInfo* field_info
+    cdef uint i
+
+    if info.field_infos is not NULL:
+        for i in range(info.field_infos.length):
+            field_info = <EPR_FieldInfo*>info.field_infos.elems[i]
+            if field_info is not NULL:
+                free(field_info.name)
+                free(field_info.description)
+                free(field_info.unit)
+                free(field_info)
+        epr_free_ptr_array(info.field_infos)
+    free(info.dataset_name)
+    free(info)
+
+
+cdef void _ric_free_entry(_RecordInfoCacheEntry* entry) noexcept nogil:
+    cdef uint i
+
+    for i in range(entry.record_infos.length):
+        _ric_free_record_info(
+            <EPR_RecordInfo*>entry.record_infos.elems[i]
+        )
+    epr_free_ptr_array(entry.record_infos)
+    free(entry)
+
+
+cdef Py_ssize_t _ric_trim(Py_ssize_t max_unused) noexcept nogil:
+    # Evict the least recently used entries that are not used by any
+    # product in excess of max_unused
+    global _ric_evictions
+
+    cdef _RecordInfoCacheEntry* entry = _ric_head
+    cdef _RecordInfoCacheEntry* next_entry
+    cdef Py_ssize_t nunused = 0
+    cdef Py_ssize_t nevicted = 0
+
+    while entry is not NULL:
+        next_entry = entry.next
+        if entry.refcount == 0:
+            nunused += 1
+            if nunused > max_unused:
+                _ric_unlink(entry)
+                _ric_free_entry(entry)
+                nevicted += 1
+        entry = next_entry
+
+    _ric_evictions += nevicted
+
+    return nevicted
+
+
+cdef bint _ric_contains(const EPR_SPtrArray* record_infos,
+                        const EPR_RecordInfo* info,
+                        bint same_name) noexcept nogil:
+    # Check if the record info (or, if same_name is set, a record info of
+    # a dataset with the same name) is in record_infos
+    cdef const EPR_RecordInfo* item
+    cdef uint i
+
+    for i in range(record_infos.length):
+        item = <const EPR_RecordInfo*>record_infos.elems[i]
+        if item == info:
+            return True
+        if (same_name and info.dataset_name is not NULL and
+                item.dataset_name is not NULL and
+                cstring.strcmp(item.dataset_name, info.dataset_name) == 0):
+            return True
+
+    return False
+
+
+cdef _RecordInfoCacheEntry* _ric_attach(
+        EPR_SProductId* product_id) noexcept nogil:
+    # Get the cache entry of the product and add the cached record infos
+    # to the product cache
+    global _ric_hits, _ric_misses
+
+    cdef _RecordInfoCacheEntry* entry
+    cdef char key[_RIC_KEY_SIZE]
+    cdef uint i
+
+    if product_id.record_info_cache is NULL:
+        return NULL
+    if _ric_make_key(product_id, key) != 0:
+        return NULL
+
+    entry = _ric_head
+    while entry is not NULL:
+        if cstring.strcmp(entry.key, key) == 0:
+            break
+        entry = entry.next
+
+    if entry is not NULL:
+        _ric_unlink(entry)
+        _ric_hits += 1
+    else:
+        entry = <_RecordInfoCacheEntry*>calloc(
+            1, sizeof(_RecordInfoCacheEntry)
+        )
+        if entry is NULL:
+            return NULL
+        entry.record_infos = epr_create_ptr_array(16)
+        if entry.record_infos is NULL:
+            free(entry)
+            return NULL
+        cstring.strcpy(entry.key, key)
+        _ric_misses += 1
+
+    _ric_push_front(entry)
+    entry.refcount += 1
+
+    for i in range(entry.record_infos.length):
+        epr_add_ptr_array_elem(
+            product_id.record_info_cache, entry.record_infos.elems[i]
+        )
+
+    return entry
+
+
+cdef void _ric_detach(EPR_SProductId* product_id,
+                      _RecordInfoCacheEntry* entry) noexcept nogil:
+    # Remove the cached record infos from the product cache and move the
+    # ones built for the product into the cache entry
+    cdef EPR_SPtrArray* record_infos = product_id.record_info_cache
+    cdef EPR_RecordInfo* info
+    cdef EPR_RecordInfo* mph_info = NULL
+    cdef EPR_RecordInfo* sph_info = NULL
+    cdef uint count = 0
+    cdef uint i
+
+    if product_id.mph_record is not NULL:
+        mph_info = <EPR_RecordInfo*>product_id.mph_record.info
+    if product_id.sph_record is not NULL:
+        sph_info = <EPR_RecordInfo*>product_id.sph_record.info
+
+    if record_infos is not NULL:
+        # the product cache is compacted in place: epr_close_product
+        # only frees the record infos that are left in it (see the notes
+        # on ownership above)
+        for i in range(record_infos.length):
+            info = <EPR_RecordInfo*>record_infos.elems[i]
+            if _ric_contains(entry.record_infos, info, False):
+                # owned by the cache
+                continue
+            if (info != mph_info and info != sph_info and
+                    not _ric_contains(entry.record_infos, info, True) and
+                    epr_add_ptr_array_elem(entry.record_infos, info) == 0):
+                # moved into the cache
+                continue
+            # owned by the product (freed by the C API)
+            record_infos.elems[count] = info
+            count += 1
+        record_infos.length = count
+
+    entry.refcount -= 1
+    _ric_trim(_ric_max_unused)
 
 
 # https://stackoverflow.com/questions/1603916/close-a-file-pointer-without-closing-the-underlying-file-descriptor
@@ -282,25 +823,50 @@ cdef class _CLib:
 
     .. warning:: this is meant for internal use only. **Do not use it**.
     """
+    cdef bint _initialized
+
     def __cinit__(self, *args, **kwargs):
         cdef bytes msg
+        cdef int ret
+        cdef _ErrorState err
 
         # @TODO: check
         # if EPR_C_API_VERSION != "2.2":
         #     raise ImportError(
         #         f"C library version not supported: {EPR_C_API_VERSION!r}")
 
+        # The C API state is process-global: it is initialized by the
+        # first interpreter importing the module and finalized when the
+        # last one releases it (see __dealloc__)
+        global _epr_api_refcount
+
+        ret = 0
         # if epr_init_api(e_log_warning, epr_log_message, NULL):
-        if epr_init_api(e_log_warning, NULL, NULL):
-            msg = <char*>epr_get_last_err_message()
-            epr_clear_err()
+        with nogil, _epr_lock:
+            if _epr_api_refcount == 0:
+                ret = epr_init_api(e_log_warning, NULL, NULL)
+                pyepr_pop_error(&err)
+            if ret == 0:
+                _epr_api_refcount += 1
+                self._initialized = True
+        if ret != 0:
+            msg = err.message
             raise ImportError(
                 f"unable to initialize EPR API library: "
                 f"{_to_str(msg, 'ascii')}"
             )
 
     def __dealloc__(self):
-        epr_close_api()
+        global _epr_api_refcount
+
+        if not self._initialized:
+            return
+
+        with nogil, _epr_lock:
+            _epr_api_refcount -= 1
+            if _epr_api_refcount == 0:
+                _ric_trim(0)
+                epr_close_api()
 
     def __init__(self):
         raise TypeError(
@@ -309,8 +875,9 @@ cdef class _CLib:
         )
 
 
-# global _CLib instance
-cdef _CLib _EPR_C_LIB = None
+# _CLib instance of the interpreter (stored in the module dict, that is
+# per-interpreter, see _close_api)
+_EPR_C_LIB = None
 
 
 cdef class EprObject:
@@ -389,10 +956,10 @@ cdef class DSD(EprObject):
     cdef object _parent     # Dataset or Product
 
     cdef inline check_closed_product(self):
-        if isinstance(self, Dataset):
+        if isinstance(self._parent, Dataset):
             (<Dataset>self._parent).check_closed_product()
         else:
-            # elif isinstance(self, Product):
+            # elif isinstance(self._parent, Product):
             (<Product>self._parent).check_closed_product()
 
     @property
@@ -508,11 +1075,11 @@ cdef class Field(EprObject):
     cdef inline _check_write_mode(self):
         self._parent._check_write_mode()
 
-    cdef long _get_offset(self, bint absolute=0) except -1:
+    cdef int64_t _get_offset(self, bint absolute=0) except -1:
         cdef bint found = 0
         cdef int i = 0
         cdef int num_fields_in_record = 0
-        cdef long offset = 0
+        cdef int64_t offset = 0
         cdef const char* name = NULL
         cdef const EPR_Field* field = NULL
         cdef const EPR_FieldInfo* info = NULL
@@ -692,22 +1259,29 @@ cdef class Field(EprObject):
         cdef np.npy_intp[1] shape
         cdef np.ndarray out
         cdef EPR_Time* t = NULL
+        cdef const EPR_FieldInfo* info
         cdef np.NPY_TYPES dtype
 
         self.check_closed_product()
 
-        shape[0] = epr_get_field_num_elems(self._ptr)
-        etype = epr_get_field_type(self._ptr)
-        msg = f"Filed({self.get_name()!r}) elems pointer is null"
+        # the field type is checked here: elements are accessed directly
+        # instead of using the epr_get_field_elems_* functions, that
+        # reset the (global) error state of the C library
+        info = <EPR_FieldInfo*>self._ptr.info
+        shape[0] = info.num_elems
+        etype = info.data_type_id
+        buf = self._ptr.elems
+        if buf is NULL:
+            raise EPRValueError(
+                f"Filed({self.get_name()!r}) elems pointer is null"
+            )
 
         if etype == e_tid_time:
             if shape[0] != 1:
                 raise ValueError(
                     f"unexpected number of elements: {shape[0]}"
                 )
-            t = <EPR_Time*>epr_get_field_elem_as_mjd(self._ptr)
-            if t is NULL:
-                pyepr_null_ptr_error(msg)
+            t = <EPR_Time*>buf
 
             out = np.ndarray(1, MJD)
             out[0]["days"] = t.days
@@ -718,44 +1292,20 @@ cdef class Field(EprObject):
 
         if etype == e_tid_uchar:
             dtype = np.NPY_UBYTE
-            buf = <uchar*>epr_get_field_elems_uchar(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_char:
             dtype = np.NPY_BYTE
-            buf = <char*>epr_get_field_elems_char(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_ushort:
             dtype = np.NPY_USHORT
-            buf = <ushort*>epr_get_field_elems_ushort(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_short:
             dtype = np.NPY_SHORT
-            buf = <short*>epr_get_field_elems_short(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_uint:
             dtype = np.NPY_UINT
-            buf = <uint*>epr_get_field_elems_uint(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_int:
             dtype = np.NPY_INT
-            buf = <int*>epr_get_field_elems_int(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_float:
             dtype = np.NPY_FLOAT
-            buf = <float*>epr_get_field_elems_float(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_double:
             dtype = np.NPY_DOUBLE
-            buf = <double*>epr_get_field_elems_double(self._ptr)
-            if buf is NULL:
-                pyepr_null_ptr_error(msg)
         elif etype == e_tid_string:
             if shape[0] != 1:
                 raise ValueError(
@@ -792,8 +1342,8 @@ cdef class Field(EprObject):
         cdef size_t nelems
         cdef size_t elemsize
         cdef size_t datasize
-        cdef long file_offset
-        cdef long field_offset
+        cdef int64_t file_offset
+        cdef int64_t field_offset
         cdef char* buf
         cdef EPR_DataTypeId etype = epr_get_field_type(self._ptr)
         cdef const void* p = NULL
@@ -805,28 +1355,43 @@ cdef class Field(EprObject):
         record = self._parent
         dataset = record._parent
         product = dataset._parent
-        istream = product._ptr.istream
-
-        nelems = elems.size
-        elemsize = epr_get_data_type_size(etype)
-        datasize = elemsize * nelems
-        field_offset = index * elemsize
-        file_offset = self._get_offset(absolute=1)
-        buf = <char*>self._ptr.elems + field_offset
-        p = _to_ptr(elems, etype)
-
-        with nogil:
-            cstring.memcpy(<void*>buf, p, datasize)
-
-        if SWAP_BYTES:
-            elems = elems.byteswap()
+        product._acquire()
+        try:
+            istream = product._ptr.istream
+
+            nelems = elems.size
+            elemsize = epr_get_data_type_size(etype)
+            datasize = elemsize * nelems
+            field_offset = index * elemsize
+            file_offset = self._get_offset(absolute=1) + field_offset
+            buf = <char*>self._ptr.elems + field_offset
             p = _to_ptr(elems, etype)
 
-        with nogil:
-            stdio.fseek(istream, file_offset + field_offset, stdio.SEEK_SET)
-            ret = stdio.fwrite(p, elemsize, nelems, product._ptr.istream)
-        if ret != nelems:
-            raise IOError(f"write error: {ret} of {datasize} bytes written")
+            with nogil:
+                cstring.memcpy(<void*>buf, p, datasize)
+
+            if SWAP_BYTES:
+                elems = elems.byteswap()
+                p = _to_ptr(elems, etype)
+
+            if product._mmap is not None:
+                # memory-mapped backend: write directly into the mapping
+                buf = <char*>product._view.buf + file_offset
+                with nogil:
+                    cstring.memcpy(<void*>buf, p, datasize)
+                return
+
+            with nogil, _epr_lock:
+                pyepr_fseek(istream, file_offset, stdio.SEEK_SET)
+                ret = stdio.fwrite(p, elemsize, nelems, istream)
+                # make data visible to positioned reads
+                stdio.fflush(istream)
+            if ret != nelems:
+                raise IOError(
+                    f"write error: {ret} of {datasize} bytes written"
+                )
+        finally:
+            product._release()
 
     def set_elem(self, elem, uint index=0):
         """set_elem(self, elem, index=0)
@@ -1201,6 +1766,29 @@ cdef class Record(EprObject):
         cdef EPR_RecordInfo* info = <EPR_RecordInfo*>self._ptr.info
         return info.tot_size
 
+    @property
+    def dtype(self):
+        """The NumPy structured dtype describing the record layout.
+
+        Fields are stored in big-endian byte order at the same offsets
+        they have in the product file, time fields use the (big-endian)
+        :data:`MJD` dtype and spare fields are left as padding bytes,
+        so that the *itemsize* of the dtype matches :attr:`tot_size`.
+
+        The dtype is computed only once per record type.
+
+        .. seealso:: :attr:`Dataset.dtype`
+        """
+        cdef Product product
+
+        self.check_closed_product()
+        if isinstance(self._parent, Dataset):
+            product = (<Dataset>self._parent)._parent
+        else:
+            product = self._parent
+
+        return product._get_record_dtype(<EPR_RecordInfo*>self._ptr.info)
+
     @property
     def index(self):
         """Index of the record within the dataset.
@@ -1300,8 +1888,16 @@ cdef class Raster(EprObject):
     cdef EPR_SRaster* _ptr
     cdef Band _parent
     cdef object _data
+    cdef object _buffer
+    cdef Py_buffer _view
+    cdef cython.pymutex _lock   # protects _data
 
     def __dealloc__(self):
+        if self._buffer is not None:
+            # the data buffer is owned by the exporting object
+            if self._ptr is not NULL:
+                self._ptr.buffer = NULL
+            PyBuffer_Release(&self._view)
         if self._ptr is not NULL:
             epr_free_raster(self._ptr)
 
@@ -1421,18 +2017,28 @@ cdef class Raster(EprObject):
                   :class:`Raster` object so any change in its contents
                   is also reflected to the :class:`Raster` object.
         """
-        cdef object data
+        cdef object data = None
+        cdef object cached = None
 
-        if self._data is not None:
-            data = self._data()
-            if data is not None:
-                return data
+        with self._lock:
+            if self._data is not None:
+                data = self._data()
+        if data is not None:
+            return data
 
         if self._ptr.buffer is NULL:
             return np.ndarray(())
 
+        # the array is created without holding the lock: if another
+        # thread cached an array in the meantime that one is returned
         data = self.toarray()
-        self._data = PyWeakref_NewRef(data, None)
+        with self._lock:
+            if self._data is not None:
+                cached = self._data()
+            if cached is None:
+                self._data = PyWeakref_NewRef(data, None)
+            else:
+                data = cached
 
         return data
 
@@ -1459,13 +2065,86 @@ cdef new_raster(EPR_SRaster* ptr, Band parent=None):
     instance._ptr = ptr
     instance._parent = parent       # Band or None
     instance._data = None
+    instance._buffer = None
 
     return instance
 
 
+cdef int _mirror_raster(EPR_SRaster* raster) except -1:
+    # Mirror the lines of the raster (in place)
+    cdef EPR_EDataTypeId data_type = raster.data_type
+    cdef uint width = raster.raster_width
+    cdef uint height = raster.raster_height
+
+    if data_type == e_tid_float:
+        pyepr_mirror_float_lines(<float*>raster.buffer, width, height)
+    elif data_type == e_tid_uchar or data_type == e_tid_char:
+        pyepr_mirror_uchar_lines(<uchar*>raster.buffer, width, height)
+    elif data_type == e_tid_ushort or data_type == e_tid_short:
+        pyepr_mirror_ushort_lines(<ushort*>raster.buffer, width, height)
+    elif data_type == e_tid_uint or data_type == e_tid_int:
+        pyepr_mirror_uint_lines(<uint*>raster.buffer, width, height)
+    else:
+        raise ValueError(
+            f"invalid data type: {data_type_id_to_str(data_type)!r}"
+        )
+
+    return 0
+
+
+cdef new_buffer_raster(EPR_EDataTypeId data_type, uint src_width,
+                       uint src_height, uint xstep, uint ystep,
+                       object buffer, Band parent=None):
+    # Create a raster using the memory of an external (writable and
+    # C-contiguous) buffer as data buffer, instead of allocating it.
+    cdef EPR_SRaster* raster_ptr
+    cdef Raster raster
+    cdef size_t size
+
+    if (data_type == e_tid_string or data_type == e_tid_spare or
+            data_type == e_tid_time):
+        raise ValueError(
+            f"invalid data type: {data_type_id_to_str(data_type)!r}"
+        )
+
+    raster_ptr = <EPR_SRaster*>calloc(1, sizeof(EPR_SRaster))
+    if raster_ptr is NULL:
+        raise MemoryError("unable to create a new raster")
+
+    raster_ptr.magic = EPR_MAGIC_RASTER
+    raster_ptr.data_type = data_type
+    raster_ptr.elem_size = epr_get_data_type_size(data_type)
+    raster_ptr.source_width = src_width
+    raster_ptr.source_height = src_height
+    raster_ptr.source_step_x = xstep
+    raster_ptr.source_step_y = ystep
+    raster_ptr.raster_width = (src_width - 1) // xstep + 1
+    raster_ptr.raster_height = (src_height - 1) // ystep + 1
+
+    raster = new_raster(raster_ptr, parent)
+
+    PyObject_GetBuffer(
+        buffer, &raster._view, PyBUF_WRITABLE | PyBUF_C_CONTIGUOUS
+    )
+    raster._buffer = buffer
+
+    size = raster_ptr.elem_size
+    size *= raster_ptr.raster_width * raster_ptr.raster_height
+    if <size_t>raster._view.len < size:
+        raise ValueError(
+            f"buffer too small: {raster._view.len} bytes "
+            f"({size} bytes required)"
+        )
+
+    raster_ptr.buffer = raster._view.buf
+
+    return raster
+
+
 def create_raster(EPR_EDataTypeId data_type, uint src_width, uint src_height,
-                  uint xstep=1, uint ystep=1):
-    """create_raster(data_type, src_width, src_height, xstep=1, ystep=1)
+                  uint xstep=1, uint ystep=1, buffer=None):
+    """create_raster(data_type, src_width, src_height, xstep=1, ystep=1,
+                     buffer=None)
 
     Creates a raster of the specified data type.
 
@@ -1489,6 +2168,12 @@ def create_raster(EPR_EDataTypeId data_type, uint src_width, uint src_height,
     :param int ystep:
         the sub-sampling step along track of the source when reading
         into the raster
+    :param buffer:
+        writable C-contiguous buffer object (e.g. a
+        :class:`numpy.ndarray`, a :class:`numpy.memmap` or a
+        :class:`multiprocessing.shared_memory.SharedMemory` buffer) to
+        be used as raster data buffer. Data are read in place into the
+        buffer. Default: ``None``, a new data buffer is allocated
     :returns:
         the new :class:`Raster` instance
 
@@ -1497,6 +2182,10 @@ def create_raster(EPR_EDataTypeId data_type, uint src_width, uint src_height,
     if xstep == 0 or ystep == 0:
         raise ValueError(f"invalid step: xspet={xstep}, ystep={ystep}")
 
+    if buffer is not None:
+        return new_buffer_raster(data_type, src_width, src_height,
+                                 xstep, ystep, buffer)
+
     cdef EPR_SRaster* raster_ptr
     raster_ptr = epr_create_raster(data_type, src_width, src_height,
                                    xstep, ystep)
@@ -1556,6 +2245,7 @@ cdef class Band(EprObject):
 
     cdef EPR_SBandId* _ptr
     cdef Product _parent
+    cdef object _valid_expr     # compiled bm_expr (False if not valid)
 
     cdef inline int check_closed_product(self) except -1:
         if self._ptr is NULL:
@@ -1683,6 +2373,33 @@ cdef class Band(EprObject):
         else:
             return _to_str(self._ptr.bm_expr, "ascii")
 
+    @property
+    def flag_coding(self):
+        """The flag coding of flag bands.
+
+        A read-only mapping of flag names to :class:`FlagDef` named
+        tuples ``(bit_mask, description)``.
+
+        ``None`` if this is not a flag band.
+        """
+        cdef const EPR_FlagDef* flag_def
+        cdef uint i
+
+        self.check_closed_product()
+        if self._ptr.flag_coding is NULL:
+            return None
+
+        flags = {}
+        for i in range(self._ptr.flag_coding.length):
+            flag_def = <EPR_FlagDef*>self._ptr.flag_coding.elems[i]
+            flags[_to_str(flag_def.name, "ascii")] = FlagDef(
+                flag_def.bit_mask,
+                _to_str(flag_def.description, "ascii")
+                if flag_def.description is not NULL else None,
+            )
+
+        return MappingProxyType(flags)
+
     @property
     def unit(self):
         """The geophysical unit for the band's pixel values."""
@@ -1736,8 +2453,9 @@ cdef class Band(EprObject):
         return _to_str(name, "ascii")
 
     def create_compatible_raster(self, uint src_width=0, uint src_height=0,
-                                 uint xstep=1, uint ystep=1):
-        """create_compatible_raster(self, src_width, src_height, xstep=1, ystep=1)
+                                 uint xstep=1, uint ystep=1, buffer=None):
+        """create_compatible_raster(self, src_width, src_height, xstep=1,
+                                    ystep=1, buffer=None)
 
         Creates a raster which is compatible with the data type of
         the band.
@@ -1787,6 +2505,10 @@ cdef class Band(EprObject):
         :param int ystep:
             the sub-sampling step along track of the source when
             reading into the raster (default=1)
+        :param buffer:
+            writable C-contiguous buffer object to be used as raster
+            data buffer, see :func:`create_raster`.
+            Default: ``None``, a new data buffer is allocated
         :returns:
             the new raster instance or raises an exception
             (:exc:`EPRValueError`) if an error occurred
@@ -1837,6 +2559,11 @@ cdef class Band(EprObject):
                 f"({src_height})"
             )
 
+        if buffer is not None:
+            return new_buffer_raster(self._ptr.data_type,
+                                     src_width, src_height, xstep, ystep,
+                                     buffer, self)
+
         raster_ptr = epr_create_compatible_raster(self._ptr,
                                                   src_width, src_height,
                                                   xstep, ystep)
@@ -1849,8 +2576,48 @@ cdef class Band(EprObject):
 
         return new_raster(raster_ptr, self)
 
-    cpdef read_raster(self, int xoffset=0, int yoffset=0, Raster raster=None):
-        """read_raster(self, xoffset=0, yoffset=0, Raster raster=None)
+    cdef int _zero_invalid_pixels(self, EPR_SRaster* raster, int xoffset,
+                                  int yoffset) except -1:
+        # Apply the valid pixel expression of the band, see
+        # epr_read_band_raster.
+        # The expression is compiled once; expressions that cannot be
+        # compiled (e.g. referring to unknown flags) are evaluated by
+        # epr_read_bitmask_raster ignoring errors, like the C API does.
+        cdef char* c_bm_expr = self._ptr.bm_expr
+        cdef Raster bm_raster
+
+        if self._valid_expr is None:
+            try:
+                self._valid_expr = compile_bitmask(
+                    self._parent, _to_str(c_bm_expr, "ascii")
+                )
+            except EPRError:
+                self._valid_expr = False
+
+        bm_raster = create_bitmask_raster(
+            raster.source_width, raster.source_height,
+            raster.source_step_x, raster.source_step_y,
+        )
+        if self._valid_expr is False:
+            with nogil, _epr_lock:
+                epr_read_bitmask_raster(
+                    self._parent._ptr, c_bm_expr, xoffset, yoffset,
+                    bm_raster._ptr,
+                )
+                epr_clear_err()
+        else:
+            (<BitmaskExpr>self._valid_expr)._read_into(
+                xoffset, yoffset, bm_raster._ptr
+            )
+        with nogil:
+            pyepr_zero_invalid_pixels(raster, bm_raster._ptr)
+
+        return 0
+
+    cpdef read_raster(self, int xoffset=0, int yoffset=0, Raster raster=None,
+                      workers=None):
+        """read_raster(self, xoffset=0, yoffset=0, Raster raster=None,
+                       workers=None)
 
         Reads (geo-)physical values of the band of the specified
         source-region.
@@ -1872,6 +2639,11 @@ cdef class Band(EprObject):
             :class:`Raster` instance set with appropriate parameters to
             read into. If not provided a new :class:`Raster` is
             instantiated
+        :param int workers:
+            the number of threads used to decode measurement bands,
+            each one decoding a different range of lines.
+            Default: ``None``, the value set using
+            :func:`set_num_threads` (1 if not set)
         :returns:
             the :class:`Raster` instance in which data are read
 
@@ -1884,6 +2656,8 @@ cdef class Band(EprObject):
         cdef int ret
         cdef uint scene_width
         cdef uint scene_height
+        cdef int nworkers = _get_workers(workers)
+        cdef _ErrorState err
 
         self.check_closed_product()
 
@@ -1899,14 +2673,29 @@ cdef class Band(EprObject):
                 "at lease part of the requested area is outside the scene"
             )
 
-        raster._data = None
+        if (xoffset >= 0 and yoffset >= 0 and
+                raster._ptr.data_type == self._ptr.data_type and
+                cstring.strcmp(
+                    self._ptr.dataset_ref.dataset_id.dsd.ds_type, "M"
+                ) == 0):
+            # measurement data are read using positioned I/O and decoded
+            # without holding any lock, by *workers* threads
+            self._parent._read_band_group(
+                [self], [raster], xoffset, yoffset, nworkers
+            )
+            return raster
 
-        with nogil:
-            ret = epr_read_band_raster(self._ptr, xoffset, yoffset,
-                                       raster._ptr)
+        self._parent._acquire()
+        try:
+            with nogil, _epr_lock:
+                ret = epr_read_band_raster(self._ptr, xoffset, yoffset,
+                                           raster._ptr)
+                pyepr_pop_error(&err)
+        finally:
+            self._parent._release()
 
         if ret != 0:
-            pyepr_check_errors()
+            pyepr_check_errors(&err)
 
         return raster
 
@@ -1919,8 +2708,18 @@ cdef class Band(EprObject):
         uint yoffset=0,
         uint xstep=1,
         uint ystep=1,
+        out=None,
+        bint scaled=True,
+        bbox=None,
+        mask=None,
+        fill_value=None,
+        bint masked=False,
+        workers=None,
     ):
-        """read_as_array(width=None, height=None, xoffset=0, yoffset=0, xstep=1, ystep=1):
+        """read_as_array(width=None, height=None, xoffset=0, yoffset=0,
+                         xstep=1, ystep=1, out=None, scaled=True, bbox=None,
+                         mask=None, fill_value=None, masked=False,
+                         workers=None):
 
         Reads the specified source region as an :class:`numpy.ndarray`.
 
@@ -1949,6 +2748,42 @@ cdef class Band(EprObject):
         :param int ystep:
             the sub-sampling step along track of the source when
             reading into the raster
+        :param numpy.ndarray out:
+            writable C-contiguous array, with the band data type and
+            the expected shape, into which data are read in place.
+            Default: ``None``, a new array is allocated
+        :param bool scaled:
+            if ``False`` the raw samples are returned, with the data
+            type used to store them in the product file, instead of
+            the geophysical values. Raw samples can be converted
+            using :meth:`Band.apply_scaling`. Only measurement bands
+            support raw reads, and the valid pixel expression is not
+            applied to raw samples (default: ``True``)
+        :param tuple bbox:
+            the ``(lon_min, lat_min, lon_max, lat_max)`` geographic
+            bounding box of the region to read. If specified, the
+            source region is computed using
+            :meth:`Product.window_for_bbox` and *width*, *height*,
+            *xoffset* and *yoffset* must not be provided
+            (default: ``None``)
+        :param mask:
+            bit-mask expression, either a string (see
+            :meth:`Product.read_bitmask_raster`) or a
+            :class:`BitmaskExpr`, selecting the valid pixels.
+            Invalid pixels are set to *fill_value*, or masked if
+            *masked* is ``True`` (default: ``None``)
+        :param fill_value:
+            the value assigned to invalid pixels. Default: ``None``,
+            NaN for floating point data and 0 otherwise
+        :param bool masked:
+            if ``True`` a :class:`numpy.ma.MaskedArray`, sharing the data
+            buffer, is returned and invalid pixels are masked instead of
+            being set to *fill_value*, which is used as fill value of
+            the masked array (default: ``False``)
+        :param int workers:
+            the number of threads used to decode measurement bands (see
+            :meth:`Band.read_raster`). Default: ``None``, the value set
+            using :func:`set_num_threads`
         :returns:
             the :class:`numpy.ndarray` instance in which data are read
 
@@ -1961,10 +2796,26 @@ cdef class Band(EprObject):
         cdef uint w
         cdef uint h
         cdef EPR_ProductId* product_id
+        cdef BitmaskExpr bm_expr = None
+        cdef Raster bm_raster
 
         self.check_closed_product()
         product_id = self._parent._ptr
 
+        if bbox is not None:
+            if (width is not None or height is not None or
+                    xoffset != 0 or yoffset != 0):
+                raise ValueError(
+                    "bbox and source region parameters are mutually "
+                    "exclusive"
+                )
+            window = self._parent.window_for_bbox(*bbox)
+            if window is None:
+                raise ValueError(
+                    f"the bounding box does not intersect the scene: {bbox!r}"
+                )
+            xoffset, yoffset, width, height = window
+
         if width is None:
             w = epr_get_scene_width(product_id)
             if w > xoffset:
@@ -1979,10 +2830,528 @@ cdef class Band(EprObject):
             else:
                 raise ValueError("yoffset os larger that the scene height")
 
-        raster = self.create_compatible_raster(width, height, xstep, ystep)
-        self.read_raster(xoffset, yoffset, raster)
+        if mask is not None:
+            bm_expr = self._parent._get_bitmask_expr(mask)
+
+        if not scaled:
+            data = self._read_raw_array(
+                xoffset, yoffset, width, height, xstep, ystep, out
+            )
+        else:
+            raster = self._create_output_raster(
+                width, height, xstep, ystep, out
+            )
+            self.read_raster(xoffset, yoffset, raster, workers)
+            data = raster.data if out is None else out
+
+        if bm_expr is None:
+            if masked:
+                return np.ma.MaskedArray(
+                    data, fill_value=fill_value, copy=False
+                )
+            return data
+
+        # the bit-mask buffer is inverted in place to get the invalid
+        # pixels, so no other full size array is allocated
+        bm_raster = create_bitmask_raster(width, height, xstep, ystep)
+        bm_expr._read_into(xoffset, yoffset, bm_raster._ptr)
+        invalid = bm_raster.data.view(np.bool_)
+        np.logical_not(invalid, out=invalid)
+
+        if masked:
+            return np.ma.MaskedArray(
+                data, mask=invalid, fill_value=fill_value, copy=False
+            )
+
+        if fill_value is None:
+            fill_value = np.nan if data.dtype.kind in "fc" else 0
+        np.copyto(data, data.dtype.type(fill_value), where=invalid)
+
+        return data
+
+    cdef Raster _create_output_raster(self, uint width, uint height,
+                                      uint xstep, uint ystep, out):
+        # Create a compatible raster, using the *out* array as data
+        # buffer if provided.
+        if out is None:
+            return self.create_compatible_raster(width, height, xstep, ystep)
+
+        if not isinstance(out, np.ndarray):
+            raise TypeError(
+                f"invalid output array type: {type(out).__name__!r}"
+            )
+        dtype = np.dtype(get_numpy_dtype(self._ptr.data_type))
+        shape = ((height - 1) // ystep + 1, (width - 1) // xstep + 1)
+        if out.dtype != dtype or out.shape != shape:
+            raise ValueError(
+                f"invalid output array: {out.shape} {out.dtype} "
+                f"(expected {shape} {dtype})"
+            )
+
+        return self.create_compatible_raster(
+            width, height, xstep, ystep, buffer=out
+        )
+
+    cdef str _get_field_name(self, Dataset dataset):
+        # Name of the dataset field containing the band raw data
+        cdef const EPR_RecordInfo* info = dataset._get_record_info()
+        cdef const EPR_FieldInfo* field_info = <EPR_FieldInfo*>(
+            info.field_infos.elems[self._ptr.dataset_ref.field_index - 1]
+        )
+        return _to_str(field_info.name, "ascii")
+
+    cdef object _read_raw_block(self, int xoffset, int yoffset, uint width,
+                                uint height, uint xstep=1, uint ystep=1):
+        # Read the raw (unscaled) samples of a measurement band in the
+        # specified source region directly from the dataset records.
+        # The returned array has native byte order and shape
+        # (lines, pixels, nsamples), where nsamples is the number of
+        # interleaved samples per pixel stored in the field (e.g. 2 for
+        # the I/Q samples of complex products).
+        cdef Dataset dataset
+        cdef EPR_SDatasetId* dataset_id = self._ptr.dataset_ref.dataset_id
+        cdef EPR_SampleModel smod = self._ptr.sample_model
+        cdef uint scene_width = self._parent._ptr.scene_width
+        cdef uint nsamples
+        cdef uint x0
+        cdef size_t recsize
+        cdef np.ndarray data
+
+        if xstep == 0 or ystep == 0:
+            raise ValueError(f"invalid step: xspet={xstep}, ystep={ystep}")
+        if cstring.strcmp(dataset_id.dsd.ds_type, "M") != 0:
+            raise ValueError(f"not a measurement band: {self.get_name()!r}")
+        if smod == e_smod_1OF1:
+            nsamples = 1
+        elif smod == e_smod_1OF2 or smod == e_smod_2OF2:
+            nsamples = 2
+        else:
+            raise ValueError(
+                f"unsupported sample model: {get_sample_model_name(smod)}"
+            )
+        if (xoffset < 0 or yoffset < 0 or
+                xoffset + width > scene_width or
+                yoffset + height > dataset_id.dsd.num_dsr):
+            raise ValueError(
+                "at lease part of the requested area is outside the scene"
+            )
+
+        dataset = self.dataset
+        name = self._get_field_name(dataset)
+        fields = dataset.dtype.fields
+        if name not in fields:
+            raise EPRValueError(f"unable to get field {name!r}")
+        ftype, foffset = fields[name][:2]
+        if ftype.shape != (scene_width * nsamples,):
+            raise EPRValueError(
+                f"invalid field shape for band {self.get_name()!r}: "
+                f"{ftype.shape}"
+            )
+        recsize = dataset.dtype.itemsize
+        dataset._check_record_size(recsize)
+
+        # see epr_read_band_measurement_data
+        if self._ptr.lines_mirrored:
+            x0 = scene_width - xoffset - width
+        else:
+            x0 = xoffset
+
+        data = np.empty(
+            ((height - 1) // ystep + 1, width, nsamples), dtype=ftype.base
+        )
+        self._parent._read_strided(
+            np.PyArray_BYTES(data),
+            width * nsamples * ftype.base.itemsize,
+            (dataset_id.dsd.ds_offset + yoffset * recsize + foffset +
+             x0 * nsamples * ftype.base.itemsize),
+            recsize * ystep,
+            data.shape[0],
+        )
+        if SWAP_BYTES:
+            data.byteswap(inplace=True)
+        data = data.view(ftype.base.newbyteorder("="))
+
+        if self._ptr.lines_mirrored:
+            data = data[:, ::-1]
+
+        return data[:, ::xstep]
+
+    cdef object _read_raw(self, int xoffset, int yoffset, uint width,
+                          uint height, uint xstep=1, uint ystep=1):
+        # Read the raw (unscaled) band samples in the specified source
+        # region, picking the right sample for interleaved fields.
+        data = self._read_raw_block(
+            xoffset, yoffset, width, height, xstep, ystep
+        )
+        return data[..., 1 if self._ptr.sample_model == e_smod_2OF2 else 0]
+
+    cdef object _read_raw_array(self, int xoffset, int yoffset, uint width,
+                                uint height, uint xstep, uint ystep, out):
+        # Implementation of read_as_array(scaled=False).
+        data = self._read_raw(xoffset, yoffset, width, height, xstep, ystep)
+        if out is None:
+            return np.ascontiguousarray(data)
+
+        if not isinstance(out, np.ndarray):
+            raise TypeError(
+                f"invalid output array type: {type(out).__name__!r}"
+            )
+        if out.dtype != data.dtype or out.shape != data.shape:
+            raise ValueError(
+                f"invalid output array: {out.shape} {out.dtype} "
+                f"(expected {data.shape} {data.dtype})"
+            )
+        out[...] = data
+
+        return out
+
+    def apply_scaling(self, raw, dtype=np.float32, out=None):
+        """apply_scaling(self, raw, dtype=np.float32, out=None)
+
+        Converts raw samples into geophysical values.
+
+        The :attr:`scaling_method`, :attr:`scaling_factor` and
+        :attr:`scaling_offset` of the band are applied to *raw* values
+        as read by ``read_as_array(scaled=False)``:
+
+        * linear scaling: ``offset + factor * raw``
+        * logarithmic scaling: ``10 ** (offset + factor * raw)``
+
+        :param raw:
+            the array of raw samples
+        :param dtype:
+            the floating point data type of the result
+            (default: float32). Ignored if *out* is provided
+        :param numpy.ndarray out:
+            floating point array, with the same shape of *raw*, into
+            which the result is stored. Default: ``None``, a new array
+            is allocated
+        :returns:
+            the :class:`numpy.ndarray` of geophysical values
+
+        .. seealso:: :meth:`Band.read_as_array`
+        """
+        cdef EPR_ScalingMethod method
+
+        self.check_closed_product()
+        method = self._ptr.scaling_method
+
+        raw = np.asarray(raw)
+        if out is None:
+            dtype = np.dtype(dtype)
+            if dtype.kind != "f":
+                raise ValueError(f"invalid data type: {dtype}")
+            out = np.empty(raw.shape, dtype=dtype)
+        elif not isinstance(out, np.ndarray):
+            raise TypeError(
+                f"invalid output array type: {type(out).__name__!r}"
+            )
+        elif out.dtype.kind != "f" or out.shape != raw.shape:
+            raise ValueError(
+                f"invalid output array: {out.shape} {out.dtype} "
+                f"(expected {raw.shape} floating point)"
+            )
+
+        if method == e_smid_non:
+            out[...] = raw
+            return out
+
+        np.multiply(raw, self._ptr.scaling_factor, out=out, dtype=out.dtype)
+        out += self._ptr.scaling_offset
+        if method == e_smid_log:
+            np.power(10, out, out=out)
+
+        return out
+
+    def iter_blocks(self, block_shape=(512, None), uint xstep=1,
+                    uint ystep=1, uint halo=0):
+        """iter_blocks(self, block_shape=(512, None), xstep=1, ystep=1, halo=0)
+
+        Iterates over the band data in blocks.
+
+        The (sub-sampled) band grid is split into blocks of
+        *block_shape* pixels, blocks at the bottom and right edges of
+        the scene are clipped.
+        For each block a ``(window, data)`` pair is yielded, where
+        *window* is the ``(xoffset, yoffset, width, height)`` tuple of
+        the source region read (in scene pixel coordinates) and *data*
+        is the :class:`numpy.ndarray` of band values.
+
+        A single data buffer is allocated and re-used for all blocks
+        so *data* is overwritten at each iteration: it must be copied
+        if it is needed after the next block has been read.
+
+        :param tuple block_shape:
+            the ``(lines, pixels)`` shape of blocks in (sub-sampled)
+            pixels. ``None`` means the whole scene height or width
+            (default: ``(512, None)``, i.e. blocks of 512 full lines)
+        :param int xstep:
+            the sub-sampling step across track (default: 1)
+        :param int ystep:
+            the sub-sampling step along track (default: 1)
+        :param int halo:
+            number of (sub-sampled) pixels by which each block is
+            extended on all sides, clipped at scene edges, to get
+            overlapping blocks (default: 0)
+        :returns:
+            an iterator of ``(window, data)`` pairs
+
+        .. seealso:: :meth:`Band.read_as_array`
+        """
+        cdef uint scene_width
+        cdef uint scene_height
+        cdef Py_ssize_t nlines
+        cdef Py_ssize_t npixels
+        cdef Py_ssize_t block_lines
+        cdef Py_ssize_t block_pixels
+
+        self.check_closed_product()
+
+        if xstep == 0 or ystep == 0:
+            raise ValueError(f"invalid step: xspet={xstep}, ystep={ystep}")
+
+        scene_width = epr_get_scene_width(self._parent._ptr)
+        scene_height = epr_get_scene_height(self._parent._ptr)
+        nlines = (scene_height - 1) // ystep + 1
+        npixels = (scene_width - 1) // xstep + 1
+
+        lines, pixels = block_shape
+        block_lines = nlines if lines is None else lines
+        block_pixels = npixels if pixels is None else pixels
+        if block_lines <= 0 or block_pixels <= 0:
+            raise ValueError(f"invalid block shape: {block_shape!r}")
+        block_lines = min(block_lines, nlines)
+        block_pixels = min(block_pixels, npixels)
+
+        buf = np.empty(
+            min(block_lines + 2 * halo, nlines) *
+            min(block_pixels + 2 * halo, npixels),
+            dtype=get_numpy_dtype(self._ptr.data_type),
+        )
+
+        def blocks():
+            for line in range(0, nlines, block_lines):
+                line0 = max(line - halo, 0)
+                line1 = min(line + block_lines + halo, nlines)
+                yoffset = line0 * ystep
+                height = min((line1 - line0) * ystep, scene_height - yoffset)
+                for pixel in range(0, npixels, block_pixels):
+                    pixel0 = max(pixel - halo, 0)
+                    pixel1 = min(pixel + block_pixels + halo, npixels)
+                    xoffset = pixel0 * xstep
+                    width = min(
+                        (pixel1 - pixel0) * xstep, scene_width - xoffset
+                    )
+
+                    data = buf[:(line1 - line0) * (pixel1 - pixel0)]
+                    data = data.reshape(line1 - line0, pixel1 - pixel0)
+                    raster = new_buffer_raster(
+                        self._ptr.data_type, width, height, xstep, ystep,
+                        data, self,
+                    )
+                    self.read_raster(xoffset, yoffset, raster)
+
+                    yield (xoffset, yoffset, width, height), data
+
+        return blocks()
+
+    cdef tuple _get_tie_point_geometry(self, uint num_elems):
+        # Return the (lines_per_tie_pt, samples_per_tie_pt, scan_offset_y,
+        # scan_offset_x) parameters of tie-point grids, in the raw (not
+        # mirrored) image geometry, see epr_read_band_annotation_data.
+        product = self.product
+        id_string = product.id_string
+
+        if id_string.startswith("MER"):
+            sph = product.get_sph()
+            return (
+                sph.get_field("LINES_PER_TIE_PT").get_elem(),
+                sph.get_field("SAMPLES_PER_TIE_PT").get_elem(),
+                0.0,
+                0.0,
+            )
+        elif id_string.startswith(("ATS", "AT2")):
+            if num_elems == 23:
+                return 32, 25, -0.5, -19.5
+            elif num_elems == 11:
+                return 32, 50, -0.5, 5.5
+            raise EPRValueError(f"invalid number of tie points: {num_elems}")
+        elif id_string.startswith(("ASA", "SAR")):
+            dataset = product.get_dataset("GEOLOCATION_GRID_ADS")
+            return (
+                product.get_scene_height() // (dataset.get_num_records() - 1),
+                product.get_scene_width() // (11 - 1),
+                0.5,
+                0.5,
+            )
+
+        raise EPRValueError(f"unhandled product type: {id_string!r}")
+
+    def read_tie_points(self):
+        """read_tie_points(self)
+
+        Reads the tie-point grid of an annotation band.
+
+        Annotation bands (e.g. latitude, longitude or solar angles) are
+        defined on a coarse grid of tie-points, and expanded at full
+        resolution by bilinear interpolation when rasters are read.
+
+        The grid is returned as a :class:`TiePointGrid` named tuple
+        ``(lines, pixels, data)``, where *lines* and *pixels* are the
+        1-D arrays of scene coordinates of grid rows and columns
+        (in increasing order) and *data* is the 2-D float32 array of
+        tie-point values, with scaling applied.
+
+        The grid is read only once and cached in the product, so the
+        returned arrays are read-only.
+
+        :returns:
+            a :class:`TiePointGrid` instance
+
+        .. seealso:: :meth:`Band.interpolate`
+        """
+        cdef EPR_SDatasetId* dataset_id
+
+        self.check_closed_product()
+
+        key = <size_t>self._ptr
+        grid = self._parent._tie_point_cache.get(key)
+        if grid is not None:
+            return grid
+
+        dataset_id = self._ptr.dataset_ref.dataset_id
+        if cstring.strcmp(dataset_id.dsd.ds_type, "A") != 0:
+            raise ValueError(f"not an annotation band: {self.get_name()!r}")
+
+        dataset = self.dataset
+        raw = dataset.read_field(self._get_field_name(dataset))
+        if raw.ndim != 2 or raw.shape[0] < 2 or raw.shape[1] < 2:
+            raise EPRValueError(
+                f"invalid tie-point grid for band {self.get_name()!r}: "
+                f"{raw.shape}"
+            )
 
-        return raster.data
+        # see transform_array_*_to_float
+        data = raw.astype(np.float32)
+        data *= np.float32(self._ptr.scaling_factor)
+        data += np.float32(self._ptr.scaling_offset)
+
+        nrows, ncols = data.shape
+        lines_per_tie_pt, samples_per_tie_pt, scan_offset_y, scan_offset_x = (
+            self._get_tie_point_geometry(ncols)
+        )
+        lines = np.arange(nrows) * lines_per_tie_pt + scan_offset_y
+        pixels = np.arange(ncols) * samples_per_tie_pt + scan_offset_x
+        if self._ptr.lines_mirrored:
+            pixels = (self._parent._ptr.scene_width - 1) - pixels[::-1]
+            data = np.ascontiguousarray(data[:, ::-1])
+
+        for array in (lines, pixels, data):
+            array.flags.writeable = False
+
+        grid = TiePointGrid(lines, pixels, data)
+
+        return self._parent._tie_point_cache.setdefault(key, grid)
+
+    def interpolate(self, lines, pixels):
+        """interpolate(self, lines, pixels)
+
+        Interpolates the tie-point grid of an annotation band.
+
+        The band values are computed at arbitrary scene coordinates
+        with the same bilinear interpolation used to read rasters,
+        without expanding the tie-point grid at full resolution.
+        Coordinates outside the grid are linearly extrapolated.
+
+        :param lines:
+            array of scene line (along track) coordinates
+        :param pixels:
+            array of scene pixel (across track) coordinates, with
+            shape broadcastable with *lines*
+        :returns:
+            a float32 :class:`numpy.ndarray` of interpolated values
+            with the broadcast shape of *lines* and *pixels*
+
+        .. seealso:: :meth:`Band.read_tie_points`
+        """
+        grid = self.read_tie_points()
+        data = grid.data
+        nrows, ncols = data.shape
+
+        lines, pixels = np.broadcast_arrays(
+            np.asarray(lines, dtype=np.float64),
+            np.asarray(pixels, dtype=np.float64),
+        )
+        shape = lines.shape
+        lines = lines.ravel()
+        pixels = pixels.ravel()
+
+        y = (lines - grid.lines[0]) / (grid.lines[1] - grid.lines[0])
+        x = (pixels - grid.pixels[0]) / (grid.pixels[1] - grid.pixels[0])
+        row = np.clip(np.floor(y), 0, nrows - 2).astype(np.intp)
+        col = np.clip(np.floor(x), 0, ncols - 2).astype(np.intp)
+        wy = (y - row).astype(np.float32)
+        wx = (x - col).astype(np.float32)
+
+        x00 = data[row, col]
+        x10 = data[row, col + 1]
+        x01 = data[row + 1, col]
+        x11 = data[row + 1, col + 1]
+
+        # handle the anti-meridian crossing, see decode_tiepoint_band
+        wrap = None
+        if self.get_name().startswith("longitude"):
+            wrap = (
+                (np.abs(x10 - x00) > 180) | (np.abs(x00 - x01) > 180) |
+                (np.abs(x01 - x11) > 180) | (np.abs(x11 - x10) > 180)
+            )
+            if wrap.any():
+                for corner in (x00, x10, x01, x11):
+                    corner[wrap & (corner < 0)] += 360
+            else:
+                wrap = None
+
+        # see epr_interpolate2D
+        values = (
+            x00 + wx * (x10 - x00) + wy * (x01 - x00) +
+            wx * wy * (x11 + x00 - x01 - x10)
+        )
+        if wrap is not None:
+            values[wrap & (values > 180)] -= 360
+
+        return values.reshape(shape)
+
+    def read_flags(self, names=None, window=None, uint xstep=1,
+                   uint ystep=1, bint packed=False):
+        """read_flags(self, names=None, window=None, xstep=1, ystep=1,
+                      packed=False)
+
+        Unpacks the flags of a flag band.
+
+        The band is read once and a boolean plane is extracted for each
+        of the requested flags (see :attr:`flag_coding`).
+
+        :param names:
+            sequence of the names of the flags to unpack.
+            Default: ``None``, all the flags of the band
+        :param tuple window:
+            the ``(xoffset, yoffset, width, height)`` source region, in
+            scene pixel coordinates. Default: ``None``, the entire scene
+        :param int xstep:
+            the sub-sampling step across track (default: 1)
+        :param int ystep:
+            the sub-sampling step along track (default: 1)
+        :param bool packed:
+            if ``True`` each plane is returned bit-packed along rows,
+            with the same layout of :func:`numpy.packbits`, as an uint8
+            array with ``ceil(width / 8)`` columns (the original width
+            can be recovered using the *count* parameter of
+            :func:`numpy.unpackbits`). Default: ``False``
+        :returns:
+            a dictionary mapping flag names to :class:`numpy.ndarray`
+            objects
+        """
+        return _read_flags(self, names, window, xstep, ystep, packed)
 
     def __repr__(self):
         return (
@@ -2018,18 +3387,89 @@ cdef class Band(EprObject):
         return self._ptr.dataset_ref.elem_index
 
 
-cdef new_band(EPR_SBandId* ptr, Product parent=None):
-    if ptr is NULL:
-        pyepr_null_ptr_error()
+def _read_flags(band, names, window, uint xstep, uint ystep, bint packed):
+    # Implementation of Band.read_flags, only using the public interface
+    # of the band (so that it can be tested with synthetic flag bands)
+    cdef Py_ssize_t nrows
+    cdef Py_ssize_t row
 
-    cdef Band instance = Band.__new__(Band)
+    flag_coding = band.flag_coding
+    if flag_coding is None:
+        raise ValueError(f"not a flag band: {band.get_name()!r}")
 
-    instance._ptr = ptr
+    if names is None:
+        names = list(flag_coding)
+    else:
+        flags = {name.lower(): name for name in flag_coding}
+        names = list(names)
+        for name in names:
+            if name.lower() not in flags:
+                raise EPRError(
+                    f"flag not found: '{band.get_name()}.{name}'",
+                    e_err_flag_not_found,
+                )
+        flag_coding = {
+            name: flag_coding[flags[name.lower()]] for name in names
+        }
+
+    if window is None:
+        data = band.read_as_array(xstep=xstep, ystep=ystep)
+    else:
+        xoffset, yoffset, width, height = window
+        data = band.read_as_array(
+            width, height, xoffset, yoffset, xstep, ystep
+        )
+
+    planes = {}
+    for name in names:
+        mask = data.dtype.type(flag_coding[name].bit_mask)
+        if not packed:
+            planes[name] = (data & mask) == mask
+            continue
+
+        # unpack and pack in chunks of rows to limit the memory usage
+        plane = np.empty(
+            (data.shape[0], (data.shape[1] + 7) // 8), dtype=np.uint8
+        )
+        nrows = max(1, _CHUNK_SIZE // data.shape[1])
+        for row in range(0, data.shape[0], nrows):
+            block = data[row:row + nrows]
+            plane[row:row + nrows] = np.packbits(
+                (block & mask) == mask, axis=-1
+            )
+        planes[name] = plane
+
+    return planes
+
+
+cdef new_band(EPR_SBandId* ptr, Product parent=None):
+    if ptr is NULL:
+        pyepr_null_ptr_error()
+
+    cdef Band instance = Band.__new__(Band)
+
+    instance._ptr = ptr
     instance._parent = parent
 
     return instance
 
 
+cdef void _swap_field_bytes(EPR_SField* field) noexcept nogil:
+    # Convert the elements of the field read from the (big endian)
+    # product file to the native byte order, see epr_swap_endian_order
+    # (double elements are not converted by the C API either)
+    cdef const EPR_FieldInfo* info = <EPR_FieldInfo*>field.info
+    cdef EPR_EDataTypeId data_type = info.data_type_id
+
+    if data_type == e_tid_time:
+        pyepr_swap_bytes(field.elems, 4, 3)
+    elif data_type == e_tid_ushort or data_type == e_tid_short:
+        pyepr_swap_bytes(field.elems, 2, info.num_elems)
+    elif (data_type == e_tid_uint or data_type == e_tid_int or
+          data_type == e_tid_float):
+        pyepr_swap_bytes(field.elems, 4, info.num_elems)
+
+
 cdef class Dataset(EprObject):
     """ENVISAT dataset.
 
@@ -2054,6 +3494,33 @@ cdef class Dataset(EprObject):
         cdef const EPR_SDSD* dsd = epr_get_dsd(self._ptr)
         return dsd.ds_offset
 
+    cdef int _check_record_size(self, size_t recsize) except -1:
+        cdef const EPR_SDSD* dsd = epr_get_dsd(self._ptr)
+        if recsize != dsd.dsr_size:
+            raise EPRValueError(
+                f"wrong record size: {recsize} (expected {dsd.dsr_size})"
+            )
+        return 0
+
+    cdef EPR_RecordInfo* _get_record_info(self) except NULL:
+        cdef EPR_SRecord* record_ptr = NULL
+        cdef _ErrorState err
+
+        if self._ptr.record_info is NULL:
+            # the record info is lazily initialized by the C library
+            self._parent._acquire()
+            try:
+                with nogil, _epr_lock:
+                    record_ptr = epr_create_record(self._ptr)
+                    pyepr_pop_error(&err)
+            finally:
+                self._parent._release()
+            if record_ptr is NULL:
+                pyepr_null_ptr_error("unable to create record", &err)
+            epr_free_record(record_ptr)
+
+        return <EPR_RecordInfo*>self._ptr.record_info
+
     @property
     def product(self):
         """The :class:`Product` instance to which this dataset belongs to."""
@@ -2068,6 +3535,24 @@ cdef class Dataset(EprObject):
                 return _to_str(self._ptr.description, "ascii")
         return ""
 
+    @property
+    def dtype(self):
+        """The NumPy structured dtype describing the dataset records.
+
+        The dtype describes the exact on-disk layout of records:
+        fields are stored in big-endian byte order, time fields use
+        the (big-endian) :data:`MJD` dtype and spare fields are left
+        as padding bytes. It can be used to view raw dataset data
+        (e.g. a buffer or a memory map of the product file) without
+        any parsing.
+
+        The dtype is computed only once per record type.
+
+        .. seealso:: :attr:`Record.dtype`, :meth:`Dataset.read_records`
+        """
+        self.check_closed_product()
+        return self._parent._get_record_dtype(self._get_record_info())
+
     def get_name(self):
         """get_name(self)
 
@@ -2160,20 +3645,63 @@ cdef class Dataset(EprObject):
 
         """
         cdef EPR_SRecord* record_ptr = NULL
+        cdef EPR_RecordInfo* info
+        cdef const EPR_SDSD* dsd
+        cdef EPR_SField* field
+        cdef char* buf
+        cdef char* p
+        cdef uint size
+        cdef uint i
+        cdef _ErrorState err
 
         self.check_closed_product()
 
-        if record:
-            record_ptr = (<Record>record)._ptr
-
-        with nogil:
-            record_ptr = epr_read_record(self._ptr, index, record_ptr)
-
-        if record_ptr is NULL:
-            pyepr_null_ptr_error(f"unable to read record at index {index}")
-
-        if not record:
+        # Same as epr_read_record, but the record is read using
+        # positioned I/O (see Product._read_block) so that records of
+        # the same or of different products can be read concurrently
+        info = self._get_record_info()
+        dsd = epr_get_dsd(self._ptr)
+        if index >= dsd.num_dsr:
+            raise EPRValueError(
+                f"unable to read record at index {index}: invalid record "
+                f"index, must be < {dsd.num_dsr}",
+                e_err_invalid_value,
+            )
+        self._check_record_size(info.tot_size)
+
+        if record is None:
+            with nogil, _epr_lock:
+                record_ptr = epr_create_record(self._ptr)
+                pyepr_pop_error(&err)
+            if record_ptr is NULL:
+                pyepr_null_ptr_error("unable to create record", &err)
             record = new_record(record_ptr, self, True)
+        elif <EPR_RecordInfo*>record._ptr.info != info:
+            raise EPRValueError(
+                f"unable to read record at index {index}: invalid record "
+                f"name", e_err_invalid_record_name,
+            )
+        record_ptr = record._ptr
+
+        buf = <char*>calloc(info.tot_size, 1)
+        if buf is NULL:
+            raise MemoryError("unable to allocate the record buffer")
+        try:
+            self._parent._read_block(
+                buf, info.tot_size,
+                <int64_t>dsd.ds_offset + <int64_t>info.tot_size * index,
+            )
+            p = buf
+            with nogil:
+                for i in range(record_ptr.num_fields):
+                    field = record_ptr.fields[i]
+                    size = (<EPR_FieldInfo*>field.info).tot_size
+                    cstring.memcpy(field.elems, p, size)
+                    p += size
+                    if SWAP_BYTES:
+                        _swap_field_bytes(field)
+        finally:
+            free(buf)
 
         record._index = index
 
@@ -2187,6 +3715,196 @@ cdef class Dataset(EprObject):
         """
         return list(self)
 
+    def as_memmap(self, writable=False):
+        """as_memmap(self, writable=False)
+
+        Returns a memory-map of the dataset records.
+
+        The returned :class:`numpy.memmap` has one element per record
+        and uses the :attr:`Dataset.dtype` record dtype, so data are
+        exposed with the on-disk (big-endian) byte order and no
+        decoding is performed. Only the pages actually accessed are
+        read from the file.
+
+        :param bool writable:
+            if ``True`` changes to the memory-map are written to the
+            product file. It requires the product to be opened in
+            read-write mode (default: ``False``)
+        :returns:
+            a 1-D :class:`numpy.memmap` of the dataset records
+
+        .. seealso:: :attr:`Dataset.dtype`, :meth:`Dataset.read_records`
+        """
+        cdef const EPR_SDSD* dsd
+
+        self.check_closed_product()
+        if writable:
+            self._check_write_mode()
+
+        dtype = self.dtype
+        self._check_record_size(dtype.itemsize)
+        dsd = epr_get_dsd(self._ptr)
+
+        return np.memmap(
+            self._parent.file_path,
+            dtype=dtype,
+            mode="r+" if writable else "r",
+            offset=dsd.ds_offset,
+            shape=(dsd.num_dsr,),
+        )
+
+    def read_records(self, start=0, stop=None, indices=None):
+        """read_records(self, start=0, stop=None, indices=None)
+
+        Reads multiple records of the dataset into a structured array.
+
+        Records in the [start, stop) range are read with a single I/O
+        operation. Arbitrary records can be gathered by passing the
+        sequence of their zero-based *indices*: runs of consecutive
+        indices are read with a single I/O operation each.
+
+        The dtype of the returned array is derived from the record
+        field info (see :meth:`Dataset.read_record`): each field is
+        mapped onto a native byte order field with the same name,
+        fields with multiple elements have a sub-array shape, time
+        fields use the :data:`MJD` dtype and spare fields are left as
+        padding bytes.
+
+        :param int start:
+            the zero-based index of the first record to read
+            (default: 0)
+        :param int stop:
+            the zero-based index of the record after the last one to
+            read. Default: ``None``, read up to the last record
+        :param indices:
+            sequence of zero-based indices of the records to read.
+            It cannot be used together with *start* and *stop*.
+            Default: ``None``
+        :returns:
+            a 1-D structured :class:`numpy.ndarray` with one element
+            per record
+        """
+        cdef Product product = self._parent
+        cdef EPR_RecordInfo* info
+        cdef const EPR_SDSD* dsd
+        cdef np.ndarray out
+        cdef size_t recsize
+        cdef int64_t offset
+        cdef Py_ssize_t num_records
+        cdef Py_ssize_t nruns
+        cdef Py_ssize_t pos
+        cdef Py_ssize_t count
+        cdef Py_ssize_t i
+
+        self.check_closed_product()
+
+        info = self._get_record_info()
+        recsize = info.tot_size
+        self._check_record_size(recsize)
+        dsd = epr_get_dsd(self._ptr)
+
+        num_records = epr_get_num_records(self._ptr)
+        if indices is None:
+            start, stop, _ = slice(start, stop).indices(num_records)
+            stop = max(start, stop)
+            indices = np.arange(start, stop, dtype=np.intp)
+        elif start != 0 or stop is not None:
+            raise ValueError(
+                "'indices' cannot be used together with 'start' and 'stop'"
+            )
+        else:
+            indices = np.array(indices, dtype=np.intp, ndmin=1)
+            if indices.ndim != 1:
+                raise ValueError(
+                    f"invalid indices shape: {indices.shape!r}, "
+                    f"1-D sequence expected"
+                )
+            indices[indices < 0] += num_records
+            mask = (indices < 0) | (indices >= num_records)
+            if mask.any():
+                raise ValueError(f"invalid index: {indices[mask][0]}")
+
+        dtype = product._get_record_dtype(info)
+        out = np.empty(len(indices), dtype=dtype)
+
+        # split indices into runs of consecutive records
+        bounds = np.flatnonzero(np.diff(indices) != 1) + 1
+        starts = np.concatenate(([0], bounds)).tolist()
+        stops = np.concatenate((bounds, [len(indices)])).tolist()
+        nruns = len(starts) if len(indices) else 0
+
+        for i in range(nruns):
+            pos = starts[i]
+            count = stops[i] - pos
+            offset = dsd.ds_offset + indices[pos] * recsize
+            product._read_block(
+                np.PyArray_BYTES(out) + pos * recsize, count * recsize, offset
+            )
+
+        if SWAP_BYTES:
+            out.byteswap(inplace=True)
+
+        return out.view(dtype.newbyteorder("="))
+
+    def read_field(self, str name, start=0, stop=None, step=1):
+        """read_field(self, name, start=0, stop=None, step=1)
+
+        Reads a single field from multiple records of the dataset.
+
+        Only the bytes of the requested field are read from each
+        record, all other fields are skipped.
+        Records are selected as in ``range(start, stop, step)``,
+        negative values are interpreted as for Python slices.
+
+        :param str name:
+            the name of the field to read
+        :param int start:
+            the zero-based index of the first record to read
+            (default: 0)
+        :param int stop:
+            the zero-based index of the record after the last one to
+            read. Default: ``None``, read up to the last record
+        :param int step:
+            the step between the records to read (default: 1)
+        :returns:
+            a :class:`numpy.ndarray` with native byte order and one
+            element per record (1-D) or one row per record (2-D) for
+            fields with multiple elements
+        """
+        cdef Product product = self._parent
+        cdef const EPR_SDSD* dsd
+        cdef np.ndarray out
+        cdef size_t recsize
+        cdef size_t offset
+
+        self.check_closed_product()
+
+        dtype = self.dtype
+        recsize = dtype.itemsize
+        self._check_record_size(recsize)
+
+        field = dtype.fields.get(name)
+        if field is None:
+            raise EPRValueError(f"unable to get field {name!r}")
+        ftype, offset = field[:2]
+
+        records = range(epr_get_num_records(self._ptr))[start:stop:step]
+        out = np.empty((len(records),) + ftype.shape, dtype=ftype.base)
+
+        dsd = epr_get_dsd(self._ptr)
+        product._read_strided(
+            np.PyArray_BYTES(out),
+            ftype.itemsize,
+            dsd.ds_offset + records.start * recsize + offset,
+            records.step * <int64_t>recsize,
+            len(records),
+        )
+
+        if SWAP_BYTES:
+            out.byteswap(inplace=True)
+
+        return out.view(out.dtype.newbyteorder("="))
+
     def __iter__(self):
         self.check_closed_product()
         cdef uint idx
@@ -2224,6 +3942,51 @@ cdef new_dataset(EPR_SDatasetId* ptr, Product parent=None):
     return instance
 
 
+# the product identifier is the value of the first field of the MPH
+_PRODUCT_ID_OFFSET = len(b'PRODUCT="')
+
+
+def _read_product_id(filename):
+    # Read the product identifier and the size of a product file,
+    # performing the same checks (and raising the same errors) of
+    # epr_open_product
+    try:
+        fd = io.open(filename, "rb")
+    except FileNotFoundError:
+        raise EPRError(
+            "epr_open_product: file not found", e_err_file_not_found
+        )
+    except OSError:
+        raise EPRError(
+            "epr_open_product: file open failed", e_err_file_access_denied
+        )
+
+    with fd:
+        fd.seek(_PRODUCT_ID_OFFSET)
+        data = fd.read(EPR_PRODUCT_ID_STRLEN)
+        size = os.fstat(fd.fileno()).st_size
+
+    if len(data) != EPR_PRODUCT_ID_STRLEN:
+        raise EPRError(
+            "epr_open_product: file read failed", e_err_file_access_denied
+        )
+
+    # disguise ATSR1/ATSR2 products as AATSR
+    if data[:3] in (b"AT1", b"AT2"):
+        data = b"ATS" + data[3:]
+    if data[:3] not in (b"MER", b"ASA", b"SAR", b"AT2", b"ATS"):
+        raise EPRValueError(
+            "epr_open_product: invalid product identifier",
+            e_err_invalid_product_id,
+        )
+    data = data[:9] + b"P" + data[10:]
+
+    # the C API stores the identifier as a NUL terminated string
+    id_string = _to_str(data.split(b"\0", 1)[0], "ascii")
+
+    return id_string, size
+
+
 cdef class Product(EprObject):
     """ENVISAT product.
 
@@ -2234,8 +3997,72 @@ cdef class Product(EprObject):
     """
     cdef EPR_SProductId* _ptr
     cdef str _mode
+    cdef str _backend
+    cdef object _mmap
+    cdef Py_buffer _view
+    cdef FILE* _fstream
+    cdef int _fd
+    cdef dict _dtype_cache
+    cdef dict _tie_point_cache
+    cdef object _spatial_index
+    cdef cython.pymutex _lock   # protects _spatial_index and _users
+    cdef Py_ssize_t _users      # operations in progress (see _acquire)
+    cdef bint _close_pending    # close deferred until _users is 0
+    cdef cython.pymutex _open_lock  # protects the lazy open (see _load)
+    cdef bint _closed
+    cdef object _filename       # see lazy open
+    cdef str _file_path         # see lazy open
+    cdef str _id_string         # see lazy open
+    cdef uint _tot_size         # see lazy open
+    cdef _RecordInfoCacheEntry* _record_infos   # shared record layouts
+    cdef bint _layout_cache     # use the layout cache (see _load_layout)
+    cdef dict _layout           # cached layout of the product
+
+    def __cinit__(self, filename, str mode="rb", str backend="stdio",
+                  bint lazy=False, bint layout_cache=False):
+        pfilename = os.fspath(filename)
+
+        if mode not in ("rb", "rb+", "r+b"):
+            raise ValueError(f"invalid open mode: {mode!r}")
 
-    def __cinit__(self, filename, str mode="rb"):
+        if backend not in ("stdio", "mmap"):
+            raise ValueError(f"invalid backend: {backend!r}")
+        if backend == "mmap" and not PYEPR_HAVE_FMEMOPEN:
+            # in-memory streams (fmemopen) are not available on Windows
+            raise ValueError(
+                "the 'mmap' backend is not supported on this platform"
+            )
+
+        self._mode = mode
+        self._backend = backend
+        self._dtype_cache = {}
+        self._tie_point_cache = {}
+        self._spatial_index = None
+        self._layout_cache = layout_cache
+        self._layout = None
+        self._filename = filename
+        self._fd = -1
+
+        if lazy or layout_cache:
+            self._file_path = os.fsdecode(pfilename)
+            self._id_string, self._tot_size = _read_product_id(pfilename)
+
+        if layout_cache:
+            self._layout = _load_layout(pfilename, self._id_string)
+            if self._layout is not None:
+                lazy = True
+
+        # in lazy mode the product is opened by the C API at the first
+        # access to any information not available in the product
+        # identifier (see _load)
+        if not lazy:
+            self._open()
+            if layout_cache:
+                _store_layout(self)
+
+    cdef int _open(self) except -1:
+        # Open the product with the C API
+        filename = self._filename
         pfilename = os.fspath(filename)
         cdef bytes bfilename
         cdef char* cfilename
@@ -2248,25 +4075,24 @@ cdef class Product(EprObject):
 
         cdef bytes bmode
         cdef char* cmode
+        cdef _ErrorState err
 
-        if mode not in ("rb", "rb+", "r+b"):
-            raise ValueError(f"invalid open mode: {mode!r}")
-
-        self._mode = mode
-
-        with nogil:
+        with nogil, _epr_lock:
             self._ptr = epr_open_product(cfilename)
+            pyepr_pop_error(&err)
+            if self._ptr is not NULL:
+                self._record_infos = _ric_attach(self._ptr)
 
         if self._ptr is NULL:
             # try to get error info from the lib
-            pyepr_check_errors()
+            pyepr_check_errors(&err)
 
             raise ValueError(f"unable to open '{filename}'")
 
-        if "+" in mode:
+        if "+" in self._mode:
             # reopen in "rb+" mode
 
-            bmode = _to_bytes(mode)
+            bmode = _to_bytes(self._mode)
             cmode = bmode
 
             with nogil:
@@ -2275,27 +4101,399 @@ cdef class Product(EprObject):
             if self._ptr.istream is NULL:
                 errno.errno = 0
                 raise ValueError(
-                    f"unable to open file '{filename}' in {mode!r} mode"
+                    f"unable to open file '{filename}' in {self._mode!r} mode"
                 )
 
-    def __dealloc__(self):
+        # file descriptor used for positioned reads
+        self._fd = fileno(self._ptr.istream)
+
+        if self._backend == "mmap":
+            self._map_file(filename)
+
+        return 0
+
+    cdef int _map_file(self, filename) except -1:
+        # Map the whole product file and replace the input stream of the
+        # C library with an in-memory stream on top of the mapping, so
+        # that all the subsequent reads are plain memory copies.
+        # The original stream is kept open to preserve the file
+        # descriptor (see :attr:`Product._fileno`).
+        cdef int flags = PyBUF_SIMPLE
+        cdef FILE* mstream = NULL
+
+        if "+" in self._mode:
+            access = mmap.ACCESS_WRITE
+            flags |= PyBUF_WRITABLE
+        else:
+            access = mmap.ACCESS_READ
+
+        try:
+            self._mmap = mmap.mmap(
+                fileno(self._ptr.istream), 0, access=access
+            )
+        except (OSError, ValueError) as exc:
+            self._close()
+            raise ValueError(f"unable to map file '{filename}': {exc}")
+
+        PyObject_GetBuffer(self._mmap, &self._view, flags)
+
+        with nogil:
+            mstream = pyepr_fmemopen(self._view.buf, self._view.len, "rb")
+            if mstream is not NULL:
+                stdio.setvbuf(mstream, NULL, stdio._IONBF, 0)
+
+        if mstream is NULL:
+            errno.errno = 0
+            self._close()
+            raise ValueError(
+                f"unable to map file '{filename}': "
+                f"in-memory streams not supported on this platform"
+            )
+
+        self._fstream = self._ptr.istream
+        self._ptr.istream = mstream
+
+        return 0
+
+    cdef _unmap_file(self):
+        if self._fstream is not NULL:
+            stdio.fclose(self._fstream)
+            self._fstream = NULL
+        if self._mmap is not None:
+            PyBuffer_Release(&self._view)
+            self._mmap.close()
+            self._mmap = None
+
+    cdef _close(self):
+        cdef _ErrorState err
+
+        self._closed = True
         if self._ptr is not NULL:
-            if "+" in self._mode:
-                stdio.fflush(self._ptr.istream)
-            epr_close_product(self._ptr)
-            pyepr_check_errors()
+            with nogil, _epr_lock:
+                if self._record_infos is not NULL:
+                    _ric_detach(self._ptr, self._record_infos)
+                    self._record_infos = NULL
+                epr_close_product(self._ptr)
+                pyepr_pop_error(&err)
             self._ptr = NULL
+            self._fd = -1
+            self._dtype_cache.clear()
+            self._tie_point_cache.clear()
+            with self._lock:
+                self._spatial_index = None
+            self._unmap_file()
+            pyepr_check_errors(&err)
+
+    def __dealloc__(self):
+        if self._ptr is not NULL and "+" in self._mode:
+            stdio.fflush(self._ptr.istream)
+        self._close()
+
+    cdef object _get_record_dtype(self, const EPR_RecordInfo* info):
+        # record info structures are shared by all the records of the
+        # same type and live as long as the product is open
+        key = <size_t>info
+        dtype = self._dtype_cache.get(key)
+        if dtype is None:
+            dtype = self._dtype_cache.setdefault(key, _record_dtype(info))
+        return dtype
+
+    cdef int _read_block(self, void* buf, size_t size,
+                         int64_t offset) except -1:
+        # Read a block of contiguous bytes starting from the specified
+        # (absolute) file offset, bypassing the record structure.
+        cdef size_t ret = 0
+
+        self._acquire()
+        try:
+            if self._mmap is not None:
+                if offset < 0 or offset + <int64_t>size > self._view.len:
+                    raise IOError(
+                        f"read error: {offset + size} out of range"
+                    )
+                with nogil:
+                    cstring.memcpy(
+                        buf, <char*>self._view.buf + offset, size
+                    )
+                return 0
+
+            if PYEPR_HAVE_PREAD:
+                with nogil:
+                    ret = _pread_all(self._fd, <char*>buf, size, offset)
+            else:
+                with nogil, _epr_lock:
+                    if pyepr_fseek(self._ptr.istream, offset,
+                                   stdio.SEEK_SET) == 0:
+                        ret = stdio.fread(buf, 1, size, self._ptr.istream)
+            if ret != size:
+                errno.errno = 0
+                raise IOError(f"read error: {ret} of {size} bytes read")
+
+            return 0
+        finally:
+            self._release()
+
+    cdef int _read_strided(
+        self, char* buf, size_t size, int64_t offset, int64_t stride,
+        Py_ssize_t count,
+    ) except -1:
+        # Read *count* blocks of *size* bytes each into a contiguous
+        # buffer. The first block starts at the specified (absolute) file
+        # offset, the following ones are spaced by *stride* bytes.
+        cdef size_t ret = size
+        cdef int64_t first
+        cdef int64_t last
+        cdef Py_ssize_t i
+
+        if count <= 0:
+            return 0
+        if stride == <int64_t>size:
+            return self._read_block(buf, size * count, offset)
+
+        self._acquire()
+        try:
+            if self._mmap is not None:
+                first = min(offset, offset + (count - 1) * stride)
+                last = max(offset, offset + (count - 1) * stride) + size
+                if first < 0 or last > self._view.len:
+                    raise IOError(f"read error: {last} out of range")
+                with nogil:
+                    for i in range(count):
+                        cstring.memcpy(
+                            buf + i * size,
+                            <char*>self._view.buf + offset + i * stride,
+                            size,
+                        )
+                return 0
+
+            if PYEPR_HAVE_PREAD:
+                with nogil:
+                    for i in range(count):
+                        ret = _pread_all(
+                            self._fd, buf + i * size, size,
+                            offset + i * stride,
+                        )
+                        if ret != size:
+                            break
+            else:
+                with nogil, _epr_lock:
+                    for i in range(count):
+                        if pyepr_fseek(
+                            self._ptr.istream, offset + i * stride,
+                            stdio.SEEK_SET,
+                        ) != 0:
+                            ret = 0
+                            break
+                        ret = stdio.fread(
+                            buf + i * size, 1, size, self._ptr.istream
+                        )
+                        if ret != size:
+                            break
+            if ret != size:
+                errno.errno = 0
+                raise IOError(f"read error: {ret} of {size} bytes read")
+
+            return 0
+        finally:
+            self._release()
+
+    cdef int _read_band_group(self, list bands, list rasters, int xoffset,
+                              int yoffset, int workers=1) except -1:
+        # The product is in use until all the workers have completed
+        # (see _acquire)
+        self._acquire()
+        try:
+            return self._decode_band_group(
+                bands, rasters, xoffset, yoffset, workers
+            )
+        finally:
+            self._release()
+
+    cdef int _decode_band_group(self, list bands, list rasters,
+                                int xoffset, int yoffset,
+                                int workers) except -1:
+        # Read a group of measurement bands sharing the same dataset:
+        # each record is read once, using positioned I/O, and the fields
+        # of all bands are decoded from it. All rasters are assumed to
+        # have the same size and sub-sampling.
+        # The shared stream and the error state of the C library are
+        # not used, so concurrent reads are safe: if *workers* is
+        # greater than 1 the lines are split into ranges decoded in
+        # parallel by the threads of a pool.
+        cdef Band band
+        cdef Dataset dataset
+        cdef EPR_SDatasetId* dataset_id
+        cdef const EPR_RecordInfo* info
+        cdef const EPR_FieldInfo* field_info
+        cdef EPR_SRaster* raster_ptr = (<Raster>rasters[0])._ptr
+        cdef _BandDecoder* decoders
+        cdef _BandGroupReader reader
+        cdef Py_ssize_t nbands = len(bands)
+        cdef Py_ssize_t nlines
+        cdef Py_ssize_t step
+        cdef Py_ssize_t i
+        cdef size_t recsize
+        cdef uint field_index
+        cdef uint scene_width = self._ptr.scene_width
+
+        band = bands[0]
+        dataset_id = band._ptr.dataset_ref.dataset_id
+        if (xoffset < 0 or yoffset < 0 or
+                xoffset + raster_ptr.source_width > scene_width or
+                yoffset + raster_ptr.source_height > dataset_id.dsd.num_dsr):
+            raise ValueError(
+                "at lease part of the requested area is outside the scene"
+            )
+
+        dataset = band.dataset
+        info = dataset._get_record_info()
+        recsize = info.tot_size
+        dataset._check_record_size(recsize)
+
+        reader = _BandGroupReader.__new__(_BandGroupReader)
+        reader.product = self
+        reader.raster = raster_ptr
+        reader.recsize = recsize
+        reader.ystep = raster_ptr.source_step_y
+        reader.offset = dataset_id.dsd.ds_offset + yoffset * recsize
+        reader.nbands = nbands
+        reader.decoders = <_BandDecoder*>calloc(nbands, sizeof(_BandDecoder))
+        if reader.decoders is NULL:
+            raise MemoryError("unable to allocate band decoders")
+        decoders = reader.decoders
+
+        swapped = set()
+        for i in range(nbands):
+            band = bands[i]
+            field_index = band._ptr.dataset_ref.field_index - 1
+            field_info = <EPR_FieldInfo*>info.field_infos.elems[field_index]
+            decoders[i].band_id = band._ptr
+            decoders[i].buffer = (<Raster>rasters[i])._ptr.buffer
+            decoders[i].field_offset = _get_field_offset(info, field_index)
+            decoders[i].field_elems = field_info.num_elems
+            decoders[i].elem_size = epr_get_data_type_size(
+                field_info.data_type_id
+            )
+            decoders[i].swap = SWAP_BYTES and field_index not in swapped
+            swapped.add(field_index)
+            decoders[i].decode = pyepr_select_line_decoder(
+                band._ptr.data_type, band._ptr.sample_model,
+                field_info.data_type_id,
+            )
+            if decoders[i].decode is NULL:
+                raise EPRValueError(
+                    f"unable to decode band {band.get_name()!r}: "
+                    f"invalid data type"
+                )
+            decoders[i].xoffset = xoffset
+            if band._ptr.lines_mirrored:
+                # see epr_read_band_measurement_data
+                decoders[i].xoffset = (
+                    <int>scene_width - xoffset - 1 -
+                    <int>((raster_ptr.raster_width - 1) *
+                          raster_ptr.source_step_x)
+                )
+
+        nlines = raster_ptr.raster_height
+        if workers > 1 and nlines > 1:
+            step = (nlines - 1) // workers + 1
+            executor = _get_executor(workers)
+            futures = [
+                executor.submit(
+                    reader.read_lines, start, min(start + step, nlines)
+                )
+                for start in range(0, nlines, step)
+            ]
+            # all the tasks must be completed before returning (or
+            # raising), since they write into the raster buffers
+            wait(futures)
+            for future in futures:
+                future.result()
+        else:
+            reader.read_lines(0, nlines)
+
+        for i in range(nbands):
+            band = bands[i]
+            raster_ptr = (<Raster>rasters[i])._ptr
+            if band._ptr.lines_mirrored:
+                _mirror_raster(raster_ptr)
+            if band._ptr.bm_expr is not NULL:
+                band._zero_invalid_pixels(raster_ptr, xoffset, yoffset)
+
+        return 0
+
+    cdef int _load(self) except -1:
+        # Open with the C API a product opened in lazy mode
+        cdef bint loaded = False
+
+        with self._open_lock:
+            if self._ptr is NULL and not self._closed:
+                try:
+                    self._open()
+                except BaseException:
+                    self._close()
+                    raise
+                loaded = True
 
-    cdef inline int check_closed_product(self) except -1:
         if self._ptr is NULL:
             raise ValueError("I/O operation on closed file")
+
+        if loaded and self._layout_cache and self._layout is None:
+            _store_layout(self)
+
+        return 0
+
+    cdef inline int _check_open(self) except -1:
+        # The product identifier is available even if the product has
+        # not been opened by the C API yet (see lazy open)
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        return 0
+
+    cdef inline int check_closed_product(self) except -1:
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        if self._ptr is NULL:
+            self._load()
+        return 0
+
+    cdef int _acquire(self) except -1:
+        # Register an operation that uses the C product, the file
+        # descriptor or the memory mapping with the GIL released: until
+        # the matching _release, closing the product (possibly from
+        # another thread) is deferred
+        self.check_closed_product()
+        with self._lock:
+            if self._closed:
+                raise ValueError("I/O operation on closed file")
+            self._users += 1
+        return 0
+
+    cdef int _release(self) except -1:
+        cdef bint close = False
+
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._close_pending:
+                self._close_pending = False
+                close = True
+        if close:
+            self._close()
         return 0
 
+    cdef inline dict _get_layout(self):
+        # The cached layout of a product that is not loaded yet, if any
+        self._check_open()
+        if self._ptr is not NULL:
+            return None
+        return self._layout
+
     cdef inline _check_write_mode(self):
         if "+" not in self._mode:
             raise TypeError("write operation on read-only file")
 
-    def __init__(self, filename, mode="rb"):
+    def __init__(self, filename, mode="rb", backend="stdio", lazy=False,
+                 layout_cache=False):
         # @NOTE: this method suppresses the default behavior of EprObject
         #        that is raising an exception when it is instantiated by
         #        the user.
@@ -2315,28 +4513,41 @@ cdef class Product(EprObject):
 
         As a convenience, it is allowed to call this method more than
         once; only the first call, however, will have an effect.
+
+        If other threads are reading from the product, the underlying
+        resources are released when the pending reads are completed.
+
+        .. versionchanged:: 1.3.1
+            it is safe to close a product while it is being read by
+            other threads
         """
-        if self._ptr is not NULL:
-            # if "+" in self.mode:
-            #     stdio.fflush(self._ptr.istream)
-            epr_close_product(self._ptr)
-            pyepr_check_errors()
-            self._ptr = NULL
+        with self._lock:
+            # no new operation can start (see _acquire)
+            self._closed = True
+            if self._users > 0:
+                # in use by other threads: closed by the last _release
+                self._close_pending = True
+                return
+        self._close()
 
     def flush(self):
         """Flush the file stream."""
         cdef int ret
-        if "+" in self.mode:
+        if "+" in self.mode and self._ptr is not NULL:
             ret = stdio.fflush(self._ptr.istream)
             if ret != 0:
                 errno.errno = 0
                 raise IOError("flush error")
+            if self._mmap is not None:
+                self._mmap.flush()
 
     @property
     def file_path(self):
         """The file's path including the file name."""
-        self.check_closed_product()
-        if self._ptr.file_path is NULL:
+        self._check_open()
+        if self._ptr is NULL:
+            return self._file_path
+        elif self._ptr.file_path is NULL:
             return None
         else:
             return _to_str(self._ptr.file_path, "ascii")
@@ -2352,7 +4563,11 @@ cdef class Product(EprObject):
             on MacOS-X the position of the file descriptor shall be
             reset to the original one after its use.
         """
-        if self._ptr.istream is NULL:
+        if self._ptr is NULL and not self._closed:
+            self._load()
+        if self._fstream is not NULL:
+            return fileno(self._fstream)
+        elif self._ptr is NULL or self._ptr.istream is NULL:
             return None
         else:
             return fileno(self._ptr.istream)
@@ -2366,10 +4581,23 @@ cdef class Product(EprObject):
         """
         return self._mode
 
+    @property
+    def backend(self):
+        """String that specifies the I/O backend used to read the file.
+
+        Possible values: "stdio" for buffered file I/O, "mmap" for
+        memory-mapped I/O.
+
+        .. versionadded:: 1.3.1
+        """
+        return self._backend
+
     @property
     def tot_size(self):
         """The total size in bytes of the product file."""
-        self.check_closed_product()
+        self._check_open()
+        if self._ptr is NULL:
+            return self._tot_size
         return self._ptr.tot_size
 
     @property
@@ -2382,12 +4610,17 @@ cdef class Product(EprObject):
         product.
         The rest of the string decodes product instance properties.
         """
-        self.check_closed_product()
+        self._check_open()
+        if self._ptr is NULL:
+            return self._id_string
         return _to_str(self._ptr.id_string, "ascii")
 
     @property
     def meris_iodd_version(self):
         """For MERIS L1b and RR and FR to provide backward compatibility."""
+        layout = self._get_layout()
+        if layout is not None:
+            return layout["meris_iodd_version"]
         self.check_closed_product()
         return self._ptr.meris_iodd_version
 
@@ -2396,6 +4629,9 @@ cdef class Product(EprObject):
 
         Gets the product's scene width in pixels.
         """
+        layout = self._get_layout()
+        if layout is not None:
+            return layout["scene_width"]
         self.check_closed_product()
         return epr_get_scene_width(self._ptr)
 
@@ -2404,6 +4640,9 @@ cdef class Product(EprObject):
 
         Gets the product's scene height in pixels.
         """
+        layout = self._get_layout()
+        if layout is not None:
+            return layout["scene_height"]
         self.check_closed_product()
         return epr_get_scene_height(self._ptr)
 
@@ -2412,6 +4651,9 @@ cdef class Product(EprObject):
 
         Gets the number of all datasets contained in a product.
         """
+        layout = self._get_layout()
+        if layout is not None:
+            return len(layout["dataset_names"])
         self.check_closed_product()
         return epr_get_num_datasets(self._ptr)
 
@@ -2423,6 +4665,9 @@ cdef class Product(EprObject):
         Gets the number of all :class:`DSD`\ s (dataset descriptors)
         contained in the product.
         """
+        layout = self._get_layout()
+        if layout is not None:
+            return layout["num_dsds"]
         self.check_closed_product()
         return epr_get_num_dsds(self._ptr)
 
@@ -2431,6 +4676,9 @@ cdef class Product(EprObject):
 
         Gets the number of all bands contained in a product.
         """
+        layout = self._get_layout()
+        if layout is not None:
+            return len(layout["band_names"])
         self.check_closed_product()
         return epr_get_num_bands(self._ptr)
 
@@ -2446,6 +4694,9 @@ cdef class Product(EprObject):
             the requested :class:`Dataset`
         """
         cdef EPR_SDatasetId* dataset_id
+
+        self.check_closed_product()
+
         dataset_id = epr_get_dataset_id_at(self._ptr, index)
         if dataset_id is NULL:
             pyepr_null_ptr_error(f"unable to get dataset at index {index}")
@@ -2464,6 +4715,9 @@ cdef class Product(EprObject):
         """
         cdef EPR_SDatasetId* dataset_id
         cdef bytes cname = _to_bytes(name)
+
+        self.check_closed_product()
+
         dataset_id = epr_get_dataset_id(self._ptr, cname)
         if dataset_id is NULL:
             pyepr_null_ptr_error(f"unable to get dataset {name!r}")
@@ -2500,6 +4754,9 @@ cdef class Product(EprObject):
         The main product header (MPH) :class:`Record`.
         """
         cdef EPR_SRecord* record_ptr
+
+        self.check_closed_product()
+
         record_ptr = epr_get_mph(self._ptr)
         if record_ptr is NULL:
             pyepr_null_ptr_error("unable to get MPH record")
@@ -2512,12 +4769,43 @@ cdef class Product(EprObject):
         The specific product header (SPH) :class:`Record`.
         """
         cdef EPR_SRecord* record_ptr
+
+        self.check_closed_product()
+
         record_ptr = epr_get_sph(self._ptr)
         if record_ptr is NULL:
             pyepr_null_ptr_error("unable to get SPH record")
 
         return new_record(record_ptr, self, False)
 
+    def get_header(self):
+        """get_header(self)
+
+        Return the headers of the product as a :class:`ProductHeader`
+        (see :func:`read_headers`).
+
+        If the product has been opened with *layout_cache* and the
+        layout is available in the cache, the headers are not read
+        from the file; the headers of a product that has already been
+        loaded are decoded from its MPH, SPH and DSDs.
+
+        .. note:: this method has no correspondent in the C API
+
+        .. versionadded:: 1.3.1
+        """
+        layout = self._get_layout()
+        if layout is not None:
+            dsds = np.array(
+                [tuple(row) for row in layout["dsds"]], dtype=_DSD_DTYPE
+            )
+            return ProductHeader(
+                self.file_path, dict(layout["mph"]), dict(layout["sph"]), dsds
+            )
+        if self._ptr is NULL:
+            # lazy open: read the headers without opening the product
+            return _read_header(self.file_path)
+        return _product_header(self)
+
     def get_band(self, str name):
         """get_band(self, name)
 
@@ -2531,6 +4819,9 @@ cdef class Product(EprObject):
         """
         cdef EPR_SBandId* band_id
         cdef bytes cname = _to_bytes(name)
+
+        self.check_closed_product()
+
         band_id = epr_get_band_id(self._ptr, cname)
         if band_id is NULL:
             pyepr_null_ptr_error(f"unable to get band {name!r}")
@@ -2550,13 +4841,16 @@ cdef class Product(EprObject):
             :exc:`EPRValueError` if not found
         """
         cdef EPR_SBandId* band_id
+
+        self.check_closed_product()
+
         band_id = epr_get_band_id_at(self._ptr, index)
         if band_id is NULL:
             pyepr_null_ptr_error(f"unable to get band at index {index}")
 
         return new_band(band_id, self)
 
-    def read_bitmask_raster(self, str bm_expr, int xoffset, int yoffset,
+    def read_bitmask_raster(self, bm_expr, int xoffset, int yoffset,
                             Raster raster not None):
         """read_bitmask_raster(self, bm_expr, xoffset, yoffset, raster)
 
@@ -2573,7 +4867,9 @@ cdef class Product(EprObject):
             the flag-names (found in the DDDB) can be composed with
             "(", ")", "NOT", "AND", "OR". Valid bit-mask expression are
             for example ``flags.LAND OR flags.CLOUD`` or
-            ``NOT flags.WATER AND flags.TURBID_S``
+            ``NOT flags.WATER AND flags.TURBID_S``.
+            A :class:`BitmaskExpr` compiled with
+            :func:`compile_bitmask` can also be used
        :param int xoffset:
             across-track coordinate in pixel coordinates (zero-based)
             of the upper right corner of the source-region
@@ -2588,24 +4884,40 @@ cdef class Product(EprObject):
 
         .. seealso:: :func:`epr.create_bitmask_raster`
         """
-        cdef bytes c_bm_expr = _to_bytes(bm_expr)
-        cdef int ret = 0
-
         self.check_closed_product()
 
-        ret = epr_read_bitmask_raster(self._ptr, c_bm_expr,
-                                      xoffset, yoffset,
-                                      (<Raster>raster)._ptr)
-        if ret != 0:
-            pyepr_check_errors()
+        if raster._ptr.data_type not in (e_tid_uchar, e_tid_char):
+            raise EPRError(
+                "illegal raster datatype; must be 'char' or 'uchar'",
+                e_err_illegal_data_type,
+            )
+
+        # the expression is compiled so that flag bands are read using
+        # positioned I/O and evaluated without holding the GIL, instead
+        # of using epr_read_bitmask_raster that needs the global lock
+        self._get_bitmask_expr(bm_expr)._read_into(
+            xoffset, yoffset, raster._ptr
+        )
 
         return raster
 
+    cdef BitmaskExpr _get_bitmask_expr(self, bm_expr):
+        # Return the compiled version of the bm_expr bit-mask expression
+        if isinstance(bm_expr, BitmaskExpr):
+            if (<BitmaskExpr>bm_expr)._parent is not self:
+                raise ValueError(
+                    "the bit-mask expression refers to a different product"
+                )
+            return bm_expr
+        if isinstance(bm_expr, bytes):
+            bm_expr = _to_str(bm_expr, "ascii")
+        return compile_bitmask(self, bm_expr)
+
     # --- high level interface ------------------------------------------------
     @property
     def closed(self):
         """True if the :class:`epr.Product` is closed."""
-        return self._ptr is NULL
+        return self._closed
 
     def get_dataset_names(self):
         """get_dataset_names(self)
@@ -2619,6 +4931,10 @@ cdef class Product(EprObject):
         cdef char* name
         cdef int num_datasets
 
+        layout = self._get_layout()
+        if layout is not None:
+            return list(layout["dataset_names"])
+
         self.check_closed_product()
 
         num_datasets = epr_get_num_datasets(self._ptr)
@@ -2643,6 +4959,10 @@ cdef class Product(EprObject):
         cdef char* name
         cdef int num_bands
 
+        layout = self._get_layout()
+        if layout is not None:
+            return list(layout["band_names"])
+
         self.check_closed_product()
 
         num_bands = epr_get_num_bands(self._ptr)
@@ -2716,25 +5036,444 @@ cdef class Product(EprObject):
                 )
         return re.read_as_array() + 1j * im.read_as_array()
 
-    # @TODO: iter on both datasets and bands (??)
-    # def __iter__(self):
-    #     return itertools.chain((self.datasets(), self.bands()))
-
-    def __repr__(self):
-        return (
-            f"epr.Product({self.id_string!r}) {self.get_num_datasets()} "
-            f"datasets, {self.get_num_bands()} bands"
+    cdef object _get_spatial_index(self):
+        # Geographic bounding boxes of the cells of the latitude and
+        # longitude tie-point grids, extended up to the scene edges.
+        # Values interpolated inside a cell are bounded by the values at
+        # its corners, so the index allows to locate geographic regions
+        # without expanding the grids at full resolution.
+        cdef Band lat_band
+        cdef Band lon_band
+
+        with self._lock:
+            index = self._spatial_index
+        if index is not None:
+            return index
+
+        lat_band = self.get_band("latitude")
+        lon_band = self.get_band("longitude")
+        lat_grid = lat_band.read_tie_points()
+        lon_grid = lon_band.read_tie_points()
+
+        height = self.get_scene_height()
+        width = self.get_scene_width()
+        lines = np.clip(
+            np.concatenate([lat_grid.lines, lon_grid.lines, [0, height - 1]]),
+            0, height - 1,
+        )
+        pixels = np.clip(
+            np.concatenate([lat_grid.pixels, lon_grid.pixels, [0, width - 1]]),
+            0, width - 1,
+        )
+        lines = np.unique(lines)
+        pixels = np.unique(pixels)
+
+        def corners(values):
+            return np.stack([
+                values[:-1, :-1], values[:-1, 1:],
+                values[1:, :-1], values[1:, 1:],
+            ])
+
+        lat = corners(lat_band.interpolate(lines[:, None], pixels))
+        lon = corners(lon_band.interpolate(lines[:, None], pixels))
+        lon_min = lon.min(axis=0)
+        lon_max = lon.max(axis=0)
+
+        index = (
+            lines,
+            pixels,
+            lat.min(axis=0),
+            lat.max(axis=0),
+            lon_min,
+            lon_max,
+            # cells crossing the anti-meridian match any longitude
+            (lon_max - lon_min) > 180,
         )
 
-    def __str__(self):
-        lines = [repr(self), ""]
-        lines.extend(map(repr, self.datasets()))
-        lines.append("")
-        lines.extend(map(repr, self.bands()))
-        return "\n".join(lines)
+        # concurrent callers all get the first index stored
+        with self._lock:
+            if self._spatial_index is None:
+                self._spatial_index = index
+            index = self._spatial_index
+
+        return index
+
+    def window_for_bbox(self, lon_min, lat_min, lon_max, lat_max):
+        """window_for_bbox(self, lon_min, lat_min, lon_max, lat_max)
+
+        Computes the source region of a geographic bounding box.
+
+        Returns the minimal ``(xoffset, yoffset, width, height)``
+        window, in scene pixel coordinates, containing all the pixels
+        whose geolocation falls in the specified bounding box.
+        If *lon_min* is greater than *lon_max* the bounding box is
+        assumed to cross the anti-meridian.
+
+        The search is performed on the tie-point grids of the
+        ``latitude`` and ``longitude`` bands, using a spatial index
+        that is built once and cached in the product: only the
+        candidate region is evaluated at full resolution.
+
+        :param float lon_min:
+            minimum longitude in degrees
+        :param float lat_min:
+            minimum latitude in degrees
+        :param float lon_max:
+            maximum longitude in degrees
+        :param float lat_max:
+            maximum latitude in degrees
+        :returns:
+            the ``(xoffset, yoffset, width, height)`` tuple, or ``None``
+            if the bounding box does not intersect the scene
 
-    def __enter__(self):
-        return self
+        .. seealso:: :meth:`Band.read_as_array`
+        """
+        cdef Py_ssize_t chunk
+
+        self.check_closed_product()
+
+        if lat_min > lat_max:
+            raise ValueError(
+                f"invalid bounding box: lat_min ({lat_min}) > "
+                f"lat_max ({lat_max})"
+            )
+
+        lines, pixels, cell_lat_min, cell_lat_max, cell_lon_min, \
+            cell_lon_max, wrap = self._get_spatial_index()
+
+        def lon_match(lon0, lon1):
+            if lon_min <= lon_max:
+                return (lon1 >= lon_min) & (lon0 <= lon_max)
+            else:
+                return (lon1 >= lon_min) | (lon0 <= lon_max)
+
+        selected = (
+            (cell_lat_max >= lat_min) & (cell_lat_min <= lat_max) &
+            (wrap | lon_match(cell_lon_min, cell_lon_max))
+        )
+        rows, cols = np.nonzero(selected)
+        if rows.size == 0:
+            return None
+
+        # refine the candidate region at full resolution
+        lat_band = self.get_band("latitude")
+        lon_band = self.get_band("longitude")
+        y0 = int(np.floor(lines[rows.min()]))
+        y1 = int(np.ceil(lines[rows.max() + 1]))
+        x0 = int(np.floor(pixels[cols.min()]))
+        x1 = int(np.ceil(pixels[cols.max() + 1]))
+
+        xs = np.arange(x0, x1 + 1)
+        chunk = max(1, _CHUNK_SIZE // xs.size)
+        line_mask = np.zeros(y1 - y0 + 1, dtype=bool)
+        pixel_mask = np.zeros(xs.size, dtype=bool)
+        for line in range(y0, y1 + 1, chunk):
+            ys = np.arange(line, min(line + chunk, y1 + 1))
+            lat = lat_band.interpolate(ys[:, None], xs)
+            lon = lon_band.interpolate(ys[:, None], xs)
+            inside = (lat >= lat_min) & (lat <= lat_max) & lon_match(lon, lon)
+            line_mask[line - y0:line - y0 + ys.size] = inside.any(axis=1)
+            pixel_mask |= inside.any(axis=0)
+
+        ys = np.flatnonzero(line_mask)
+        if ys.size == 0:
+            return None
+        xs = xs[pixel_mask]
+
+        return (
+            int(xs[0]),
+            int(y0 + ys[0]),
+            int(xs[-1] - xs[0] + 1),
+            int(ys[-1] - ys[0] + 1),
+        )
+
+    def read_complex_band(self, str iname, str qname, window=None,
+                          looks=None, out=None):
+        """read_complex_band(self, iname, qname, window=None, looks=None,
+                             out=None)
+
+        Reads a complex band, or its multi-looked intensity.
+
+        The real and imaginary parts are read from the bands named
+        *iname* and *qname* respectively and combined into a single
+        complex64 array.
+        When both bands are decoded from the same interleaved dataset
+        field, as for the I/Q samples of ASAR SLC (IMS) products, raw
+        samples are read only once.
+        Data are processed in chunks of lines, so no full size
+        temporary array is allocated.
+
+        If *looks* is specified, the intensity ``|z|**2`` is averaged
+        over non-overlapping cells of ``(azimuth_looks, range_looks)``
+        pixels and a float32 array is returned instead.
+        Trailing lines and columns of the source region that do not
+        fill a complete cell are ignored.
+
+        :param str iname:
+            name of the band containing the real part
+        :param str qname:
+            name of the band containing the imaginary part
+        :param tuple window:
+            the ``(xoffset, yoffset, width, height)`` source region, in
+            scene pixel coordinates. Default: ``None``, the entire scene
+        :param tuple looks:
+            the ``(azimuth_looks, range_looks)`` number of looks
+            (default: ``None``, no multi-looking)
+        :param numpy.ndarray out:
+            array with the expected shape and data type into which data
+            are stored. Default: ``None``, a new array is allocated
+        :returns:
+            the :class:`numpy.ndarray` of complex values, or of
+            multi-looked intensity values if *looks* is specified
+
+        .. seealso:: :meth:`Product.get_complex_band_as_array`
+        """
+        cdef Band iband
+        cdef Band qband
+        cdef Py_ssize_t azlooks = 1
+        cdef Py_ssize_t rglooks = 1
+        cdef Py_ssize_t nlines
+        cdef Py_ssize_t ncols
+        cdef Py_ssize_t chunk
+        cdef Py_ssize_t line
+        cdef Py_ssize_t n
+        cdef bint interleaved
+
+        self.check_closed_product()
+
+        iband = self.get_band(iname)
+        qband = self.get_band(qname)
+
+        if window is None:
+            window = (0, 0, self.get_scene_width(), self.get_scene_height())
+        xoffset, yoffset, width, height = window
+
+        if looks is None:
+            dtype = np.dtype(np.complex64)
+        else:
+            azlooks, rglooks = looks
+            if azlooks <= 0 or rglooks <= 0:
+                raise ValueError(f"invalid looks: {looks!r}")
+            dtype = np.dtype(np.float32)
+        shape = (height // azlooks, width // rglooks)
+        nlines = shape[0] * azlooks
+        ncols = shape[1] * rglooks
+
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif not isinstance(out, np.ndarray):
+            raise TypeError(
+                f"invalid output array type: {type(out).__name__!r}"
+            )
+        elif out.dtype != dtype or out.shape != shape:
+            raise ValueError(
+                f"invalid output array: {out.shape} {out.dtype} "
+                f"(expected {shape} {dtype})"
+            )
+
+        interleaved = (
+            iband._ptr.dataset_ref.dataset_id ==
+            qband._ptr.dataset_ref.dataset_id and
+            iband._ptr.dataset_ref.field_index ==
+            qband._ptr.dataset_ref.field_index and
+            iband._ptr.sample_model == e_smod_1OF2 and
+            qband._ptr.sample_model == e_smod_2OF2
+        )
+
+        chunk = azlooks * max(1, _CHUNK_SIZE // max(ncols * azlooks, 1))
+        for line in range(0, nlines, chunk):
+            n = min(chunk, nlines - line)
+            if interleaved:
+                samples = iband._read_raw_block(
+                    xoffset, yoffset + line, ncols, n
+                )
+                re = iband.apply_scaling(samples[..., 0])
+                im = qband.apply_scaling(samples[..., 1])
+            else:
+                re = iband.apply_scaling(
+                    iband._read_raw(xoffset, yoffset + line, ncols, n)
+                )
+                im = qband.apply_scaling(
+                    qband._read_raw(xoffset, yoffset + line, ncols, n)
+                )
+
+            if looks is None:
+                block = out[line:line + n]
+                block.real = re
+                block.imag = im
+            else:
+                re *= re
+                im *= im
+                re += im
+                out[line // azlooks:(line + n) // azlooks] = re.reshape(
+                    n // azlooks, azlooks, shape[1], rglooks
+                ).mean(axis=(1, 3), dtype=np.float32)
+
+        return out
+
+    def read_bands(self, names, window=None, uint xstep=1, uint ystep=1,
+                   out=None):
+        """read_bands(self, names, window=None, xstep=1, ystep=1, out=None)
+
+        Reads multiple bands of the same source region.
+
+        Measurement bands are grouped by dataset: each record of a
+        dataset is read only once and the data of all the requested
+        bands are decoded from it, so the I/O volume scales with the
+        number of datasets involved rather than with the number of
+        bands.
+
+        :param names:
+            sequence of the names of the bands to read
+        :param tuple window:
+            the ``(xoffset, yoffset, width, height)`` source region, in
+            scene pixel coordinates. Default: ``None``, the entire scene
+        :param int xstep:
+            the sub-sampling step across track (default: 1)
+        :param int ystep:
+            the sub-sampling step along track (default: 1)
+        :param out:
+            sequence of arrays, one for each band, into which data are
+            read in place (see :meth:`Band.read_as_array`), e.g. a 3-D
+            :class:`numpy.ndarray`. Default: ``None``, new arrays are
+            allocated
+        :returns:
+            a dictionary mapping band names to :class:`numpy.ndarray`
+            objects
+        """
+        cdef Band band
+        cdef Raster raster
+        cdef EPR_SDatasetId* dataset_id
+
+        self.check_closed_product()
+
+        names = list(names)
+        if window is None:
+            window = (0, 0, self.get_scene_width(), self.get_scene_height())
+        xoffset, yoffset, width, height = window
+
+        if out is None:
+            out = [None] * len(names)
+        elif len(out) != len(names):
+            raise ValueError(
+                f"invalid number of output arrays: {len(out)} "
+                f"(expected {len(names)})"
+            )
+
+        groups = {}
+        data = {}
+        for name, array in zip(names, out):
+            band = self.get_band(name)
+            raster = band._create_output_raster(
+                width, height, xstep, ystep, array
+            )
+            data[name] = raster.data if array is None else array
+
+            dataset_id = band._ptr.dataset_ref.dataset_id
+            if cstring.strcmp(dataset_id.dsd.ds_type, "M") == 0:
+                bands, rasters = groups.setdefault(
+                    <size_t>dataset_id, ([], [])
+                )
+                bands.append(band)
+                rasters.append(raster)
+            else:
+                band.read_raster(xoffset, yoffset, raster)
+
+        for bands, rasters in groups.values():
+            if len(bands) == 1:
+                (<Band>bands[0]).read_raster(xoffset, yoffset, rasters[0])
+            else:
+                self._read_band_group(bands, rasters, xoffset, yoffset)
+
+        return data
+
+    def read_bitmasks(self, exprs, window=None, uint xstep=1, uint ystep=1,
+                      bint labels=False):
+        """read_bitmasks(self, exprs, window=None, xstep=1, ystep=1,
+                         labels=False)
+
+        Evaluates multiple bit-mask expressions on the same source region.
+
+        Each flag band referenced by the expressions is read only once,
+        so the I/O cost does not depend on the number of expressions.
+
+        :param exprs:
+            a mapping of names to bit-mask expressions, either strings
+            (see :meth:`read_bitmask_raster`) or :class:`BitmaskExpr`
+            instances
+        :param tuple window:
+            the ``(xoffset, yoffset, width, height)`` source region, in
+            scene pixel coordinates. Default: ``None``, the entire scene
+        :param int xstep:
+            the sub-sampling step across track (default: 1)
+        :param int ystep:
+            the sub-sampling step along track (default: 1)
+        :param bool labels:
+            if ``True`` a single uint8 class-label array is returned
+            instead of the individual masks: the value of each pixel is
+            the (1-based) position in *exprs* of the first expression
+            that is true for the pixel, or 0 if no expression is true.
+            Default: ``False``
+        :returns:
+            a dictionary mapping names to uint8 :class:`numpy.ndarray`
+            bit-masks, or the class-label :class:`numpy.ndarray` if
+            *labels* is ``True``
+        """
+        cdef BitmaskExpr bm_expr
+        cdef Raster raster
+
+        self.check_closed_product()
+
+        names = list(exprs)
+        compiled = [self._get_bitmask_expr(exprs[name]) for name in names]
+        if labels and len(names) > 255:
+            raise ValueError(
+                f"too many expressions for a uint8 class-label array: "
+                f"{len(names)}"
+            )
+
+        if window is None:
+            window = (0, 0, self.get_scene_width(), self.get_scene_height())
+        xoffset, yoffset, width, height = window
+
+        cache = {}
+        if labels:
+            raster = create_bitmask_raster(width, height, xstep, ystep)
+            mask = raster.data.view(np.bool_)
+            data = np.zeros_like(raster.data)
+            for index in reversed(range(len(compiled))):
+                bm_expr = compiled[index]
+                bm_expr._read_into(xoffset, yoffset, raster._ptr, cache)
+                np.copyto(data, index + 1, where=mask)
+            return data
+
+        data = {}
+        for name, bm_expr in zip(names, compiled):
+            raster = create_bitmask_raster(width, height, xstep, ystep)
+            bm_expr._read_into(xoffset, yoffset, raster._ptr, cache)
+            data[name] = raster.data
+
+        return data
+
+    # @TODO: iter on both datasets and bands (??)
+    # def __iter__(self):
+    #     return itertools.chain((self.datasets(), self.bands()))
+
+    def __repr__(self):
+        return (
+            f"epr.Product({self.id_string!r}) {self.get_num_datasets()} "
+            f"datasets, {self.get_num_bands()} bands"
+        )
+
+    def __str__(self):
+        lines = [repr(self), ""]
+        lines.extend(map(repr, self.datasets()))
+        lines.append("")
+        lines.extend(map(repr, self.bands()))
+        return "\n".join(lines)
+
+    def __enter__(self):
+        return self
 
     def __exit__(self, *exc_info):
         self.close()
@@ -2747,8 +5486,748 @@ cdef class Product(EprObject):
         return self._ptr.magic
 
 
-def open(filename, str mode="rb"):
-    """open(filename)
+cdef class _BandGroupReader:
+    # Decoder of the lines of a group of measurement bands sharing the
+    # same dataset (see Product._read_band_group).
+    # Different line ranges can be decoded concurrently.
+    cdef Product product
+    cdef _BandDecoder* decoders
+    cdef Py_ssize_t nbands
+    cdef EPR_SRaster* raster    # geometry of the (first) output raster
+    cdef int64_t offset         # file offset of the first record
+    cdef size_t recsize
+    cdef uint ystep
+
+    def __dealloc__(self):
+        free(self.decoders)
+
+    cpdef int read_lines(self, Py_ssize_t start, Py_ssize_t stop) except -1:
+        # Read and decode the raster lines in the [start, stop) range
+        cdef _BandDecoder* decoders = self.decoders
+        cdef EPR_SRaster* raster = self.raster
+        cdef char* buf = NULL
+        cdef char* record
+        cdef Py_ssize_t chunk
+        cdef Py_ssize_t count
+        cdef Py_ssize_t line
+        cdef Py_ssize_t i
+        cdef Py_ssize_t j
+        cdef int raster_pos
+
+        chunk = min(
+            stop - start,
+            max(1, _CHUNK_SIZE // <Py_ssize_t>self.recsize),
+        )
+        buf = <char*>calloc(chunk, self.recsize)
+        if buf is NULL:
+            raise MemoryError("unable to allocate the record buffer")
+        try:
+            for line in range(start, stop, chunk):
+                count = min(chunk, stop - line)
+                self.product._read_strided(
+                    buf, self.recsize,
+                    self.offset + line * self.ystep * self.recsize,
+                    self.recsize * self.ystep, count,
+                )
+                raster_pos = line * raster.raster_width
+                with nogil:
+                    for j in range(count):
+                        record = buf + j * self.recsize
+                        for i in range(self.nbands):
+                            if decoders[i].swap:
+                                pyepr_swap_bytes(
+                                    record + decoders[i].field_offset,
+                                    decoders[i].elem_size,
+                                    decoders[i].field_elems,
+                                )
+                            decoders[i].decode(
+                                record + decoders[i].field_offset,
+                                decoders[i].band_id, decoders[i].xoffset,
+                                raster.source_width, raster.source_step_x,
+                                decoders[i].buffer, raster_pos,
+                            )
+                        raster_pos += raster.raster_width
+        finally:
+            free(buf)
+
+        return 0
+
+
+cdef inline uint _get_flag_value(const EPR_SRaster* raster,
+                                 size_t index) noexcept nogil:
+    if raster.elem_size == 1:
+        return (<uchar*>raster.buffer)[index]
+    elif raster.elem_size == 2:
+        return (<ushort*>raster.buffer)[index]
+    else:
+        return (<uint*>raster.buffer)[index]
+
+
+cdef void _eval_bm_program(const _BmOp* ops, Py_ssize_t nops,
+                           EPR_SRaster** rasters, uchar* stack, uchar* out,
+                           size_t npixels) noexcept nogil:
+    # Evaluate a compiled (postfix) bit-mask expression for each pixel
+    # of the flag rasters, see epr_eval_bm_term.
+    cdef size_t i
+    cdef Py_ssize_t k
+    cdef Py_ssize_t sp
+    cdef uint mask
+
+    for i in range(npixels):
+        sp = 0
+        for k in range(nops):
+            if ops[k].op_code == _BM_REF:
+                mask = ops[k].mask
+                stack[sp] = (
+                    _get_flag_value(rasters[ops[k].band_index], i) & mask
+                ) == mask
+                sp += 1
+            elif ops[k].op_code == _BM_NOT:
+                stack[sp - 1] = not stack[sp - 1]
+            elif ops[k].op_code == _BM_AND:
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] and stack[sp]
+            else:   # _BM_OR
+                sp -= 1
+                stack[sp - 1] = stack[sp - 1] or stack[sp]
+        out[i] = stack[0]
+
+
+# characters of names in bit-mask expressions
+_BM_NAME_START = frozenset(string.ascii_letters + "_")
+_BM_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "_")
+
+
+cdef enum _BmTokenType:
+    _BM_TOKEN_EOS
+    _BM_TOKEN_NAME
+    _BM_TOKEN_SPECIAL
+    _BM_TOKEN_UNKNOWN
+
+
+@cython.final
+cdef class _BmExprParser:
+    # Recursive descent parser of bit-mask expressions, following the
+    # grammar of the EPR C API parser (see epr_parse_bm_expr_str):
+    #
+    #   expr    := and_expr [("or" | "|") expr]
+    #   and_expr:= unary [("and" | "&") and_expr]
+    #   unary   := ("not" | "!") unary | primary
+    #   primary := "(" expr ")" | band_name "." flag_name
+    #
+    # Keywords are case insensitive and, as in the C API, the tokens
+    # following a complete expression are ignored.
+    # The expression is converted into a postfix program of
+    # (op_code, band_name, flag_name) tuples.
+
+    cdef list tokens
+    cdef Py_ssize_t pos
+    cdef list ops
+
+    def __cinit__(self, str expr):
+        # tokenize the expression, see epr_tokenize_bm_expr: an unknown
+        # character stops the tokenization
+        cdef Py_ssize_t pos = 0
+        cdef Py_ssize_t end
+        cdef Py_ssize_t size = len(expr)
+
+        self.tokens = []
+        self.pos = 0
+        self.ops = []
+
+        while True:
+            while pos < size and expr[pos] in " \t\n\v\f\r":
+                pos += 1
+            if pos == size:
+                self.tokens.append((_BM_TOKEN_EOS, None))
+                break
+            if expr[pos] in _BM_NAME_START:
+                end = pos + 1
+                while end < size and expr[end] in _BM_NAME_CHARS:
+                    end += 1
+                self.tokens.append((_BM_TOKEN_NAME, expr[pos:end]))
+                pos = end
+            elif expr[pos] in "().&|!":
+                self.tokens.append((_BM_TOKEN_SPECIAL, expr[pos]))
+                pos += 1
+            else:
+                self.tokens.append((_BM_TOKEN_UNKNOWN, expr[pos]))
+                break
+
+    cdef tuple next_token(self):
+        # the last token (end-of-string or unknown) is returned forever
+        cdef Py_ssize_t index = min(self.pos, len(self.tokens) - 1)
+        self.pos += 1
+        return self.tokens[index]
+
+    cdef void push_back(self) noexcept:
+        self.pos -= 1
+
+    cdef raise_error(self, str message, tuple token):
+        self.push_back()
+        kind, text = token
+        if kind == _BM_TOKEN_EOS:
+            message = f"{message}, but found 'end-of-string'"
+        else:
+            message = f"{message}, but found token '{text}'"
+        raise EPRValueError(
+            f"bitmap-expression error: {message}", e_err_invalid_value
+        )
+
+    cdef bint parse_expr(self, bint term_required) except -1:
+        cdef tuple token
+
+        if not self.parse_and_expr(term_required):
+            return False
+
+        token = self.next_token()
+        if _is_bm_operator(token, "or", "|"):
+            self.parse_expr(True)
+            self.ops.append((_BM_OR, None, None))
+        else:
+            self.push_back()
+
+        return True
+
+    cdef bint parse_and_expr(self, bint term_required) except -1:
+        cdef tuple token
+
+        if not self.parse_unary_expr(term_required):
+            return False
+
+        token = self.next_token()
+        if _is_bm_operator(token, "and", "&"):
+            self.parse_and_expr(True)
+            self.ops.append((_BM_AND, None, None))
+        else:
+            self.push_back()
+
+        return True
+
+    cdef bint parse_unary_expr(self, bint term_required) except -1:
+        cdef tuple token = self.next_token()
+
+        if _is_bm_operator(token, "not", "!"):
+            self.parse_unary_expr(True)
+            self.ops.append((_BM_NOT, None, None))
+            return True
+
+        self.push_back()
+
+        return self.parse_primary_expr(term_required)
+
+    cdef bint parse_primary_expr(self, bint term_required) except -1:
+        cdef tuple token = self.next_token()
+
+        if token == (_BM_TOKEN_SPECIAL, "("):
+            self.parse_expr(True)
+            token = self.next_token()
+            if token != (_BM_TOKEN_SPECIAL, ")"):
+                self.raise_error("')' expected", token)
+        elif token[0] == _BM_TOKEN_NAME:
+            band_name = token[1]
+            token = self.next_token()
+            if token != (_BM_TOKEN_SPECIAL, "."):
+                self.raise_error("'.' expected", token)
+            token = self.next_token()
+            if token[0] != _BM_TOKEN_NAME:
+                self.raise_error("flag name expected", token)
+            self.ops.append((_BM_REF, band_name, token[1]))
+        elif token[0] == _BM_TOKEN_EOS and not term_required:
+            return False
+        else:
+            self.raise_error("operator or flag name expected", token)
+
+        return True
+
+
+cdef inline bint _is_bm_operator(tuple token, str keyword, str op):
+    kind, text = token
+    if kind == _BM_TOKEN_NAME:
+        return text.lower() == keyword
+    return kind == _BM_TOKEN_SPECIAL and text == op
+
+
+cdef tuple _resolve_bm_ref(Product product, str band_name, str flag_name,
+                           list bands):
+    # Resolve the flag band and the flag mask of a flag reference, see
+    # epr_resolve_bm_ref.
+    # The flag band is added to *bands* if not already there; the
+    # (band index, flag mask) pair is returned.
+    cdef bytes c_band_name = _to_bytes(band_name)
+    cdef const char* c_band_name_ptr = c_band_name
+    cdef EPR_SBandId* band_ptr
+    cdef const EPR_FlagDef* flag_def
+    cdef Py_ssize_t index
+    cdef uint i
+
+    product._acquire()
+    try:
+        with nogil, _epr_lock:
+            band_ptr = epr_get_band_id(product._ptr, c_band_name_ptr)
+            epr_clear_err()
+    finally:
+        product._release()
+    if band_ptr is NULL:
+        raise EPRError(
+            f"flags band not found: {band_name!r}", e_err_flag_not_found
+        )
+
+    for index in range(len(bands)):
+        if (<Band>bands[index])._ptr is band_ptr:
+            break
+    else:
+        index = len(bands)
+        bands.append(new_band(band_ptr, product))
+
+    if band_ptr.flag_coding is not NULL:
+        for i in range(band_ptr.flag_coding.length):
+            flag_def = <EPR_FlagDef*>band_ptr.flag_coding.elems[i]
+            if _to_str(flag_def.name, "ascii").lower() == flag_name.lower():
+                return index, flag_def.bit_mask
+
+    raise EPRError(
+        f"flag not found: '{band_name}.{flag_name}'", e_err_flag_not_found
+    )
+
+
+cdef class BitmaskExpr(EprObject):
+    """Compiled bit-mask expression.
+
+    Bit-mask expressions are parsed and the referenced flags are
+    resolved only once, so the expression can be evaluated many times
+    (e.g. block by block) without any overhead.
+
+    A new BitmaskExpr instance can be obtained with the
+    :func:`compile_bitmask` function.
+    """
+    cdef Product _parent
+    cdef str _expr
+    cdef list _bands
+    cdef _BmOp* _ops
+    cdef Py_ssize_t _nops
+
+    def __dealloc__(self):
+        free(self._ops)
+
+    cdef inline check_closed_product(self):
+        self._parent.check_closed_product()
+
+    @property
+    def product(self):
+        """The :class:`Product` instance the expression refers to."""
+        return self._parent
+
+    @property
+    def expr(self):
+        """The bit-mask expression string."""
+        return self._expr
+
+    @property
+    def band_names(self):
+        """The names of the flag bands referenced by the expression."""
+        self.check_closed_product()
+        return tuple((<Band>band).get_name() for band in self._bands)
+
+    cdef int _eval(self, list rasters, uchar* out, size_t npixels) except -1:
+        # Evaluate the expression using the flag rasters of the
+        # referenced bands (in the same order of self._bands), all
+        # having the same size.
+        cdef EPR_SRaster** raster_ptrs = NULL
+        cdef uchar* stack = NULL
+        cdef Py_ssize_t i
+
+        raster_ptrs = <EPR_SRaster**>calloc(len(rasters), sizeof(void*))
+        stack = <uchar*>calloc(self._nops, sizeof(uchar))
+        try:
+            if raster_ptrs is NULL or stack is NULL:
+                raise MemoryError("unable to allocate evaluation buffers")
+            for i in range(len(rasters)):
+                raster_ptrs[i] = (<Raster>rasters[i])._ptr
+            with nogil:
+                _eval_bm_program(
+                    self._ops, self._nops, raster_ptrs, stack, out, npixels
+                )
+        finally:
+            free(stack)
+            free(raster_ptrs)
+
+        return 0
+
+    cdef int _read_into(self, int xoffset, int yoffset,
+                        EPR_SRaster* bm_raster, dict cache=None) except -1:
+        # Read the flag bands and evaluate the expression into the
+        # specified bit-mask raster.
+        # Flag rasters already in *cache* (keyed by band) are re-used
+        # and the newly read ones are added to it.
+        cdef Band band
+
+        if cache is None:
+            cache = {}
+
+        rasters = []
+        for band in self._bands:
+            raster = cache.get(<size_t>band._ptr)
+            if raster is None:
+                raster = band.create_compatible_raster(
+                    bm_raster.source_width, bm_raster.source_height,
+                    bm_raster.source_step_x, bm_raster.source_step_y,
+                )
+                band.read_raster(xoffset, yoffset, raster)
+                cache[<size_t>band._ptr] = raster
+            rasters.append(raster)
+
+        return self._eval(
+            rasters, <uchar*>bm_raster.buffer,
+            <size_t>bm_raster.raster_width * bm_raster.raster_height,
+        )
+
+    def read(self, window=None, uint xstep=1, uint ystep=1, out=None):
+        """read(self, window=None, xstep=1, ystep=1, out=None)
+
+        Evaluates the bit-mask expression on the specified source region.
+
+        Each referenced flag band is read once, then the expression is
+        evaluated without holding the GIL.
+
+        :param tuple window:
+            the ``(xoffset, yoffset, width, height)`` source region, in
+            scene pixel coordinates. Default: ``None``, the entire scene
+        :param int xstep:
+            the sub-sampling step across track (default: 1)
+        :param int ystep:
+            the sub-sampling step along track (default: 1)
+        :param numpy.ndarray out:
+            writable C-contiguous uint8 array, with the expected shape,
+            into which the bit-mask is stored. Default: ``None``, a new
+            array is allocated
+        :returns:
+            the :class:`numpy.ndarray` of 0/1 uint8 values
+        """
+        cdef Raster raster
+
+        self.check_closed_product()
+
+        if window is None:
+            window = (
+                0, 0,
+                self._parent.get_scene_width(),
+                self._parent.get_scene_height(),
+            )
+        xoffset, yoffset, width, height = window
+
+        if out is None:
+            raster = create_bitmask_raster(width, height, xstep, ystep)
+        elif not isinstance(out, np.ndarray):
+            raise TypeError(
+                f"invalid output array type: {type(out).__name__!r}"
+            )
+        else:
+            shape = ((height - 1) // ystep + 1, (width - 1) // xstep + 1)
+            if out.dtype != np.uint8 or out.shape != shape:
+                raise ValueError(
+                    f"invalid output array: {out.shape} {out.dtype} "
+                    f"(expected {shape} uint8)"
+                )
+            raster = new_buffer_raster(
+                e_tid_uchar, width, height, xstep, ystep, out
+            )
+
+        self._read_into(xoffset, yoffset, raster._ptr)
+
+        return raster.data if out is None else out
+
+    def __repr__(self):
+        return f"epr.BitmaskExpr({self._expr!r})"
+
+
+def compile_bitmask(Product product not None, str expr):
+    """compile_bitmask(product, expr)
+
+    Compiles a bit-mask expression.
+
+    The expression is parsed and the referenced flag bands and flags
+    are resolved once, so that the returned :class:`BitmaskExpr` can be
+    evaluated many times efficiently, e.g. using
+    :meth:`BitmaskExpr.read` or :meth:`Product.read_bitmask_raster`.
+
+    :param epr.Product product:
+        the product containing the flag bands
+    :param str expr:
+        the bit-mask expression (see :meth:`Product.read_bitmask_raster`)
+    :returns:
+        a :class:`BitmaskExpr` instance
+
+    This function raises an instance of the appropriate
+    :exc:`EPRError` sub-class if case of errors (e.g. syntax errors or
+    unknown flag bands and flags)
+    """
+    cdef _BmExprParser parser
+    cdef BitmaskExpr instance
+
+    product.check_closed_product()
+
+    parser = _BmExprParser(expr)
+    if not parser.parse_expr(False):
+        raise EPRValueError("invalid bit-mask expression")
+
+    ops = []
+    bands = []
+    for op_code, band_name, flag_name in parser.ops:
+        if op_code == _BM_REF:
+            index, mask = _resolve_bm_ref(product, band_name, flag_name, bands)
+            ops.append((op_code, index, mask))
+        else:
+            ops.append((op_code, -1, 0))
+
+    instance = BitmaskExpr.__new__(BitmaskExpr)
+    instance._parent = product
+    instance._expr = expr
+    instance._bands = bands
+    _set_bm_program(instance, ops)
+
+    return instance
+
+
+cdef int _set_bm_program(BitmaskExpr instance, list ops) except -1:
+    # Store the (op_code, band_index, mask) tuples of a resolved postfix
+    # program into the bit-mask expression
+    cdef Py_ssize_t i
+
+    instance._ops = <_BmOp*>calloc(len(ops), sizeof(_BmOp))
+    if instance._ops is NULL:
+        raise MemoryError("unable to allocate the bit-mask program")
+    instance._nops = len(ops)
+    for i, (op_code, band_index, mask) in enumerate(ops):
+        instance._ops[i].op_code = op_code
+        instance._ops[i].band_index = band_index
+        instance._ops[i].mask = mask
+
+    return 0
+
+
+_FLAG_DATA_TYPES = {1: e_tid_uchar, 2: e_tid_ushort, 4: e_tid_uint}
+
+
+def _eval_bitmask(str expr, dict flag_bands):
+    # Evaluate a bit-mask expression on in-memory flag data, using the
+    # same parser and evaluator of compile_bitmask.
+    # *flag_bands* maps band names to (flag_coding, data) pairs, where
+    # flag_coding maps flag names to bit masks and data are 2D unsigned
+    # integer arrays, all with the same shape.
+    # Only intended for testing: products with flag bands are not
+    # required.
+    cdef _BmExprParser parser
+    cdef BitmaskExpr instance
+    cdef Raster bm_raster
+
+    parser = _BmExprParser(expr)
+    if not parser.parse_expr(False):
+        raise EPRValueError("invalid bit-mask expression")
+
+    ops = []
+    names = []
+    rasters = []
+    for op_code, band_name, flag_name in parser.ops:
+        if op_code != _BM_REF:
+            ops.append((op_code, -1, 0))
+            continue
+        if band_name not in flag_bands:
+            raise EPRError(
+                f"flags band not found: {band_name!r}", e_err_flag_not_found
+            )
+        flag_coding, data = flag_bands[band_name]
+        masks = {name.lower(): mask for name, mask in flag_coding.items()}
+        if flag_name.lower() not in masks:
+            raise EPRError(
+                f"flag not found: '{band_name}.{flag_name}'",
+                e_err_flag_not_found,
+            )
+        if band_name not in names:
+            data = np.ascontiguousarray(data)
+            height, width = data.shape
+            names.append(band_name)
+            rasters.append(new_buffer_raster(
+                _FLAG_DATA_TYPES[data.itemsize], width, height, 1, 1, data
+            ))
+        ops.append(
+            (op_code, names.index(band_name), masks[flag_name.lower()])
+        )
+
+    instance = BitmaskExpr.__new__(BitmaskExpr)
+    instance._expr = expr
+    _set_bm_program(instance, ops)
+
+    bm_raster = create_bitmask_raster(width, height)
+    instance._eval(
+        rasters, <uchar*>bm_raster._ptr.buffer,
+        <size_t>bm_raster._ptr.raster_width * bm_raster._ptr.raster_height,
+    )
+
+    return bm_raster.data
+
+
+def set_num_threads(nthreads):
+    """set_num_threads(nthreads)
+
+    Sets the default number of threads used to decode band data.
+
+    Measurement bands are decoded by splitting the requested lines into
+    ranges processed in parallel, without holding the GIL, by a pool of
+    threads (see the *workers* parameter of :meth:`Band.read_raster`
+    and :meth:`Band.read_as_array`).
+
+    :param int nthreads:
+        the number of threads, or ``None`` for the number of CPUs
+        available
+    :returns:
+        the previous value
+    """
+    global _num_threads
+
+    if nthreads is None:
+        nthreads = os.cpu_count() or 1
+    elif nthreads < 1:
+        raise ValueError(f"invalid number of threads: {nthreads}")
+
+    with _executor_lock:
+        previous = _num_threads
+        _num_threads = nthreads
+
+    return previous
+
+
+def get_num_threads():
+    """get_num_threads()
+
+    Returns the default number of threads used to decode band data.
+
+    .. seealso:: :func:`set_num_threads`
+    """
+    return _num_threads
+
+
+def get_record_info_cache_stats():
+    """get_record_info_cache_stats()
+
+    Returns statistics about the process-wide cache of record layouts.
+
+    The layouts of the dataset records, that the EPR C API builds from
+    its internal database (DDDB), are shared by all the products of the
+    same type (and with the same DDDB parameters, e.g. the line length)
+    open in the process, instead of being re-built and stored for each
+    product.
+    Layouts of products that are no longer open are kept in the cache
+    (see :func:`set_record_info_cache_size`).
+
+    :returns:
+        a dictionary with the following items:
+
+        * `hits`: number of product loads that found the layouts of
+          the product type in the cache
+        * `misses`: number of product loads that did not find the
+          layouts of the product type in the cache
+        * `evictions`: number of cache entries evicted
+        * `entries`: number of cache entries (product types)
+        * `in_use`: number of cache entries used by open products
+        * `record_infos`: number of cached record layouts
+        * `max_unused`: maximum number of unused entries
+
+    .. versionadded:: 1.3.1
+    """
+    cdef _RecordInfoCacheEntry* entry
+    cdef Py_ssize_t entries = 0
+    cdef Py_ssize_t in_use = 0
+    cdef Py_ssize_t record_infos = 0
+    cdef Py_ssize_t max_unused
+    cdef unsigned long long hits
+    cdef unsigned long long misses
+    cdef unsigned long long evictions
+
+    with nogil, _epr_lock:
+        entry = _ric_head
+        while entry is not NULL:
+            entries += 1
+            in_use += entry.refcount > 0
+            record_infos += entry.record_infos.length
+            entry = entry.next
+        hits = _ric_hits
+        misses = _ric_misses
+        evictions = _ric_evictions
+        max_unused = _ric_max_unused
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "evictions": evictions,
+        "entries": entries,
+        "in_use": in_use,
+        "record_infos": record_infos,
+        "max_unused": max_unused,
+    }
+
+
+def set_record_info_cache_size(Py_ssize_t max_unused):
+    """set_record_info_cache_size(max_unused)
+
+    Sets the maximum number of unused entries of the cache of record
+    layouts.
+
+    Entries (product types) that are not used by any open product are
+    evicted, least recently used first, when their number exceeds
+    *max_unused*.
+    Entries used by open products are never evicted.
+
+    :param int max_unused:
+        the maximum number of unused entries (default: 32), 0 to free
+        the layouts as soon as the products are closed
+    :returns:
+        the previous value
+
+    .. seealso:: :func:`get_record_info_cache_stats`
+
+    .. versionadded:: 1.3.1
+    """
+    global _ric_max_unused
+
+    cdef Py_ssize_t previous
+
+    if max_unused < 0:
+        raise ValueError(f"invalid cache size: {max_unused}")
+
+    with nogil, _epr_lock:
+        previous = _ric_max_unused
+        _ric_max_unused = max_unused
+        _ric_trim(max_unused)
+
+    return previous
+
+
+def clear_record_info_cache():
+    """clear_record_info_cache()
+
+    Evicts all the entries of the cache of record layouts that are not
+    used by open products.
+
+    :returns:
+        the number of evicted entries
+
+    .. seealso:: :func:`get_record_info_cache_stats`
+
+    .. versionadded:: 1.3.1
+    """
+    cdef Py_ssize_t nevicted
+
+    with nogil, _epr_lock:
+        nevicted = _ric_trim(0)
+
+    return nevicted
+
+
+def open(filename, str mode="rb", str backend="stdio", bint lazy=False,
+         bint layout_cache=False):
+    """open(filename, mode="rb", backend="stdio", lazy=False,
+            layout_cache=False)
 
     Open the ENVISAT product.
 
@@ -2762,14 +6241,809 @@ def open(filename, str mode="rb"):
         string that specifies the mode in which the file is opened.
         Allowed values: "rb", "rb+" for read-write mode.
         Default: mode="rb".
+    :param str backend:
+        string that specifies the I/O backend used to read the file.
+        Allowed values: "stdio" for buffered file I/O, "mmap" to map
+        the whole file in memory once and serve all the reads
+        (records, fields and bands) directly from the mapping.
+        The memory-mapped backend avoids repeated system calls when
+        scanning large products and lets processes reading the same
+        product share the page cache.
+        The "mmap" backend is not available on Windows, where a
+        :exc:`ValueError` is raised.
+        Default: backend="stdio".
+    :param bool lazy:
+        if ``True`` only the product identifier is read when the
+        product is opened, the product headers and the dataset and
+        band identifiers are loaded on first access (e.g. by
+        :meth:`Product.get_mph`, :meth:`Product.get_dataset` or
+        :meth:`Product.get_band`).
+        The :attr:`Product.id_string`, :attr:`Product.file_path`
+        and :attr:`Product.tot_size` attributes and
+        :meth:`Product.get_header` do not trigger the loading.
+        Default: lazy=False.
+    :param bool layout_cache:
+        if ``True`` the layout of the product (MPH, SPH, DSDs, scene
+        size and dataset and band names) is stored in a persistent
+        cache in ``$XDG_CACHE_HOME/pyepr`` (``~/.cache/pyepr`` by
+        default).
+        When the product is opened again the layout is read from the
+        cache, the product is opened in lazy mode and
+        :meth:`Product.get_header`, :meth:`Product.get_dataset_names`,
+        :meth:`Product.get_band_names`, the scene size and the number
+        of datasets, DSDs and bands are served from the cache without
+        loading the product.
+        Cache entries are invalidated if the size, the modification
+        time or the product identifier of the product file change
+        (see also :func:`clear_layout_cache`).
+        Default: layout_cache=False.
     :returns:
         the :class:`Product` instance representing the specified
         product. An exception (:exc:`exceptions.ValueError`) is raised
         if the file could not be opened.
 
+    .. versionchanged:: 1.3.1
+        added the *backend*, *lazy* and *layout_cache* parameters.
+
     .. seealso :class:`Product`
     """
-    return Product(filename, mode)
+    return Product(filename, mode, backend, lazy, layout_cache)
+
+
+# header scanner
+_MPH_SIZE = 1247
+_PRODUCT_PREFIXES = (b"MER", b"ASA", b"SAR", b"AT1", b"AT2", b"ATS")
+_DSD_DTYPE = np.dtype([
+    ("index", np.int32),
+    ("ds_name", "U28"),
+    ("ds_type", "U1"),
+    ("filename", "U62"),
+    ("ds_offset", np.int64),
+    ("ds_size", np.int64),
+    ("num_dsr", np.int64),
+    ("dsr_size", np.int64),
+])
+
+
+cdef list _split_header_numbers(str value):
+    # split concatenated values on signs that are not part of an exponent
+    cdef Py_ssize_t start = 0
+    cdef Py_ssize_t i
+    cdef list items = []
+
+    for i in range(1, len(value)):
+        if value[i] in "+-" and value[i - 1] not in "eE":
+            items.append(value[start:i])
+            start = i
+    items.append(value[start:])
+
+    return items
+
+
+cdef object _parse_header_number(str value):
+    # see epr_parse_header and epr_set_header_field_values: values
+    # containing a "." or an exponent are doubles, other values with
+    # more than one character are integers (signed if any item is
+    # negative, -999999 for items that are not numbers) and a single
+    # character is stored as a char (i.e. its code); multiple values
+    # can be concatenated (e.g. "+0001-0002")
+    cdef list items
+    cdef list values
+    cdef bytes bitem
+
+    if len(value) <= 1:
+        return ord(value) if value else value
+
+    items = _split_header_numbers(value)
+    if "." in value or "e" in value or "E" in value:
+        values = [strtod(_to_bytes(item, "latin-1"), NULL) for item in items]
+    else:
+        values = []
+        for item in items:
+            bitem = _to_bytes(item, "latin-1")
+            if item.strip("0123456789+- "):
+                values.append(-999999)
+            elif "-" in value:
+                values.append(<int>strtol(bitem, NULL, 10))
+            else:
+                values.append(<uint>strtoul(bitem, NULL, 10))
+
+    return values[0] if len(values) == 1 else values
+
+
+cdef str _header_char(value):
+    # single characters are decoded as numbers (see _parse_header_number)
+    if isinstance(value, int):
+        return chr(value)
+    return str(value)[:1]
+
+
+cdef dict _parse_header(bytes block):
+    cdef const char* buf = block
+    cdef const char* line = buf
+    cdef const char* stop = buf + len(block)
+    cdef const char* eol
+    cdef const char* sep
+    cdef const char* value
+    cdef const char* end
+    cdef dict header = {}
+
+    while line < stop:
+        eol = <const char*>cstring.memchr(line, b"\n", stop - line)
+        if eol is NULL:
+            eol = stop
+
+        # empty lines and lines with spare bytes start with a blank
+        sep = NULL
+        if line < eol and line[0] != b" ":
+            sep = <const char*>cstring.memchr(line, b"=", eol - line)
+
+        if sep is not NULL and sep > line:
+            key = PyUnicode_DecodeLatin1(line, sep - line, NULL)
+            value = sep + 1
+            if value < eol and value[0] == b'"':
+                value += 1
+                end = <const char*>cstring.memchr(value, b'"', eol - value)
+                if end is NULL:
+                    end = eol
+                while end > value and end[-1] == b" ":
+                    end -= 1
+                header[key] = PyUnicode_DecodeLatin1(
+                    value, end - value, NULL
+                )
+            else:
+                # the unit, if any, is dropped
+                end = <const char*>cstring.memchr(value, b"<", eol - value)
+                if end is NULL:
+                    end = eol
+                header[key] = _parse_header_number(
+                    PyUnicode_DecodeLatin1(value, end - value, NULL)
+                )
+
+        line = eol + 1
+
+    return header
+
+
+def _read_header(path):
+    file_path = os.fspath(path)
+    with io.open(file_path, "rb") as fd:
+        block = fd.read(_MPH_SIZE)
+        if (
+            len(block) < _MPH_SIZE
+            or not block.startswith(b'PRODUCT="')
+            or block[9:12] not in _PRODUCT_PREFIXES
+        ):
+            raise EPRValueError(
+                f"{file_path!r}: invalid product identifier",
+                e_err_invalid_product_id,
+            )
+        mph = _parse_header(block)
+
+        try:
+            sph_size = int(mph["SPH_SIZE"])
+            num_dsd = int(mph["NUM_DSD"])
+            dsd_size = int(mph["DSD_SIZE"])
+        except (KeyError, TypeError, ValueError):
+            raise EPRValueError(
+                f"{file_path!r}: invalid MPH", e_err_invalid_record
+            ) from None
+        if num_dsd <= 0 or dsd_size <= 0 or sph_size < num_dsd * dsd_size:
+            raise EPRValueError(
+                f"{file_path!r}: invalid MPH", e_err_invalid_value
+            )
+
+        block = fd.read(sph_size)
+        if len(block) < sph_size:
+            raise EPRError(
+                f"{file_path!r}: unable to read the SPH",
+                e_err_file_read_error,
+            )
+
+    sph = _parse_header(block[:sph_size - num_dsd * dsd_size])
+
+    # see epr_find_first_dsd
+    dsd_begin = block.find(b"DS_NAME=")
+    if dsd_begin < 0:
+        raise EPRValueError(
+            f"{file_path!r}: no DS_NAME in SPH", e_err_invalid_record
+        )
+
+    dsds = []
+    for index in range(num_dsd):
+        offset = dsd_begin + index * dsd_size
+        dsd_block = block[offset:offset + dsd_size]
+        if not dsd_block or dsd_block.startswith(b" "):
+            # empty DSD
+            continue
+        dsd = _parse_header(dsd_block)
+        dsds.append((
+            index,
+            dsd.get("DS_NAME", ""),
+            _header_char(dsd.get("DS_TYPE", "")),
+            dsd.get("FILENAME", ""),
+            dsd.get("DS_OFFSET", 0),
+            dsd.get("DS_SIZE", 0),
+            dsd.get("NUM_DSR", 0),
+            dsd.get("DSR_SIZE", 0),
+        ))
+
+    return ProductHeader(
+        file_path, mph, sph, np.array(dsds, dtype=_DSD_DTYPE)
+    )
+
+
+cdef dict _header_record_to_dict(Record record):
+    # Decode the fields of a header record as _parse_header
+    cdef dict header = {}
+
+    for field in record:
+        if field.get_type() == e_tid_string:
+            value = _to_str(field.get_elem(), "latin-1")
+        else:
+            value = field.get_elems().tolist()
+            if len(value) == 1:
+                value = value[0]
+        header[field.get_name()] = value
+
+    return header
+
+
+def _product_header(Product product):
+    # The headers of an open product (see _read_header)
+    dsds = []
+    for index in range(product.get_num_dsds()):
+        dsd = product.get_dsd_at(index)
+        dsds.append((
+            dsd.index,
+            dsd.ds_name,
+            dsd.ds_type,
+            dsd.filename,
+            dsd.ds_offset,
+            dsd.ds_size,
+            dsd.num_dsr,
+            dsd.dsr_size,
+        ))
+
+    return ProductHeader(
+        product.file_path,
+        _header_record_to_dict(product.get_mph()),
+        _header_record_to_dict(product.get_sph()),
+        np.array(dsds, dtype=_DSD_DTYPE),
+    )
+
+
+def read_headers(paths, workers=None, executor=None):
+    """read_headers(paths, workers=None, executor=None)
+
+    Reads the headers of a set of ENVISAT products.
+
+    Only the fixed-size prefix of each file (MPH, SPH and DSDs) is read
+    and decoded, no :class:`Product` is created: this is much faster
+    than opening the products with :func:`open` when only the
+    metadata are needed, e.g. to index large archives.
+
+    Header values are decoded into Python objects as in the
+    :class:`Record` returned by :meth:`Product.get_mph` and
+    :meth:`Product.get_sph`: strings are stripped, numeric values are
+    converted into :class:`int` or :class:`float` (a :class:`list` for
+    multi-valued entries), single characters that are not quoted are
+    converted into their character code and units are dropped.
+
+    :param paths:
+        an iterable of paths of ENVISAT product files
+    :param int workers:
+        number of threads used to read the files concurrently
+        (default: :func:`get_num_threads`)
+    :param executor:
+        a :class:`concurrent.futures.Executor` used to read the files
+        (*workers* is ignored).
+        By default a dedicated pool of *workers* threads is used, so
+        that header scans do not compete with band decoding
+        (see :func:`set_num_threads`)
+    :returns:
+        a list of :class:`ProductHeader` named tuples
+        (`file_path`, `mph`, `sph`, `dsds`), in the same order of
+        *paths*: `mph` and `sph` are dictionaries and `dsds` is a
+        numpy structured array with fields `index`, `ds_name`,
+        `ds_type`, `filename`, `ds_offset`, `ds_size`, `num_dsr` and
+        `dsr_size`, one item for each non-empty DSD.
+        An exception (:exc:`OSError` or :exc:`EPRError`) is raised if
+        any of the files cannot be read or is not a valid product.
+
+    .. versionadded:: 1.3.1
+    """
+    paths = list(paths)
+    if executor is not None:
+        return list(executor.map(_read_header, paths))
+
+    nworkers = min(_get_workers(workers), len(paths))
+    if nworkers <= 1:
+        return [_read_header(path) for path in paths]
+
+    with ThreadPoolExecutor(
+        nworkers, thread_name_prefix="pyepr-headers"
+    ) as executor:
+        return list(executor.map(_read_header, paths))
+
+
+# layout cache
+_LAYOUT_CACHE_VERSION = 2
+
+
+def _get_layout_cache_dir():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "pyepr")
+
+
+def _get_layout_file(file_path):
+    name = hashlib.sha256(os.fsencode(file_path)).hexdigest()
+    return os.path.join(_get_layout_cache_dir(), f"{name}.json")
+
+
+def _load_layout(filename, str id_string):
+    # Return the cached layout of the product or None if it is missing
+    # or stale
+    file_path = os.path.abspath(os.fsdecode(filename))
+    try:
+        st = os.stat(file_path)
+        with io.open(_get_layout_file(file_path), "rb") as fd:
+            layout = json.load(fd)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(layout, dict)
+        or layout.get("version") != _LAYOUT_CACHE_VERSION
+        or layout.get("file_path") != file_path
+        or layout.get("size") != st.st_size
+        or layout.get("mtime_ns") != st.st_mtime_ns
+        or layout.get("id_string") != id_string
+    ):
+        return None
+
+    return layout
+
+
+def _store_layout(Product product):
+    # Write the layout of a loaded product in the cache (errors are
+    # ignored: the cache is only an optimization)
+    file_path = os.path.abspath(os.fsdecode(os.fspath(product._filename)))
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return
+    if st.st_size != product.tot_size:
+        # the file has been modified after the product has been opened
+        return
+
+    header = product.get_header()
+    layout = {
+        "version": _LAYOUT_CACHE_VERSION,
+        "file_path": file_path,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "id_string": product.id_string,
+        "meris_iodd_version": product.meris_iodd_version,
+        "scene_width": product.get_scene_width(),
+        "scene_height": product.get_scene_height(),
+        "num_dsds": product.get_num_dsds(),
+        "dataset_names": product.get_dataset_names(),
+        "band_names": product.get_band_names(),
+        "mph": header.mph,
+        "sph": header.sph,
+        "dsds": header.dsds.tolist(),
+    }
+
+    cache_file = _get_layout_file(file_path)
+    cache_dir = os.path.dirname(cache_file)
+    tmp_name = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=cache_dir, suffix=".tmp", delete=False
+        ) as fd:
+            tmp_name = fd.name
+            json.dump(layout, fd)
+        # atomic update (concurrent readers never see partial files)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def clear_layout_cache(max_age=None):
+    """clear_layout_cache(max_age=None)
+
+    Removes the entries of the persistent cache of product layouts
+    (see the *layout_cache* parameter of :func:`open`).
+
+    :param float max_age:
+        if not ``None``, only the entries stored more than *max_age*
+        seconds ago are removed
+    :returns:
+        the number of removed entries
+
+    .. note:: this function has no correspondent in the C API
+
+    .. versionadded:: 1.3.1
+    """
+    if max_age is not None and max_age < 0:
+        raise ValueError(f"invalid max_age: {max_age}")
+
+    cache_dir = _get_layout_cache_dir()
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return 0
+
+    now = time.time()
+    count = 0
+    for name in names:
+        if not name.endswith((".json", ".tmp")):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            if max_age is not None and now - os.stat(path).st_mtime < max_age:
+                continue
+            os.unlink(path)
+        except OSError:
+            # removed or replaced concurrently
+            continue
+        if name.endswith(".json"):
+            count += 1
+
+    return count
+
+
+# product pool
+cdef Py_ssize_t _get_max_open_products() except -1:
+    # Maximum number of products that can be kept open at the same time
+    # without exhausting the file descriptors of the process: half of
+    # the limit, products opened with the "mmap" backend use two
+    # descriptors
+    try:
+        import resource
+    except ImportError:
+        # Windows: the C runtime allows 512 streams by default
+        return 256
+
+    limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if limit == resource.RLIM_INFINITY or limit > 1 << 20:
+        limit = 1 << 20
+    return max(limit // 2, 1)
+
+
+cdef class ProductPool:
+    """ProductPool(max_open=None, max_bytes=None)
+
+    Pool of open products.
+
+    Products are kept open and re-used by the :meth:`open` method, so
+    that repeated requests of the same products do not need to open
+    and parse the product files again.
+    Products are identified by the path of the file, the open mode and
+    the I/O backend, and are re-opened if the size or the modification
+    time of the file change.
+    When the limits of the pool are exceeded the least recently used
+    products are closed.
+
+    Products checked out with :meth:`checkout` are closed only when
+    they are released, even if they have been removed from the pool
+    in the meantime.
+
+    :param int max_open:
+        the maximum number of open products (default and upper bound:
+        half of the limit on the number of open files of the process)
+    :param int max_bytes:
+        the maximum total size of the open product files
+        (default: no limit).
+        The most recently used product is always kept open, even if it
+        exceeds the limit.
+
+    .. note::
+
+        products are shared by all the users of the pool and should
+        not be closed explicitly.
+        Products returned by :meth:`open` are closed by the pool as
+        soon as they are evicted (pending reads are completed first):
+        use :meth:`checkout` to keep using a product across requests
+        of other products from the same pool.
+
+    .. versionadded:: 1.3.1
+    """
+    cdef cython.pymutex _lock   # protects all the following attributes
+    cdef dict _entries          # LRU first: key -> (product, size, mtime)
+    cdef dict _leases           # product -> number of active leases
+    cdef set _retired           # leased products removed from the pool
+    cdef Py_ssize_t _max_open
+    cdef Py_ssize_t _max_bytes  # -1: no limit
+    cdef Py_ssize_t _nbytes
+    cdef Py_ssize_t _hits
+    cdef Py_ssize_t _misses
+    cdef Py_ssize_t _evictions
+    cdef Py_ssize_t _invalidations
+
+    def __cinit__(self, max_open=None, max_bytes=None):
+        cdef Py_ssize_t limit = _get_max_open_products()
+
+        if max_open is None:
+            max_open = limit
+        elif max_open < 1:
+            raise ValueError(
+                f"invalid maximum number of products: {max_open}"
+            )
+        if max_bytes is None:
+            max_bytes = -1
+        elif max_bytes < 0:
+            raise ValueError(f"invalid maximum size: {max_bytes}")
+
+        self._entries = {}
+        self._leases = {}
+        self._retired = set()
+        self._max_open = min(max_open, limit)
+        self._max_bytes = max_bytes
+
+    @property
+    def max_open(self):
+        """The maximum number of open products."""
+        return self._max_open
+
+    @property
+    def max_bytes(self):
+        """The maximum size of the open products (``None``: no limit)."""
+        return None if self._max_bytes < 0 else self._max_bytes
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    cdef list _evict(self):
+        # Remove the least recently used products exceeding the limits
+        # (the most recently used one is always kept)
+        victims = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self._max_open
+            or 0 <= self._max_bytes < self._nbytes
+        ):
+            key = next(iter(self._entries))
+            product, size, _ = self._entries.pop(key)
+            self._nbytes -= size
+            self._evictions += 1
+            victims.append(product)
+        return victims
+
+    cdef int _add_lease(self, product) except -1:
+        self._leases[product] = self._leases.get(product, 0) + 1
+        return 0
+
+    cdef list _retire(self, list products):
+        # Return the products that can be closed immediately, leased
+        # products are closed when the last lease is released
+        victims = []
+        for product in products:
+            if product in self._leases:
+                self._retired.add(product)
+            else:
+                victims.append(product)
+        return victims
+
+    cdef _open(self, filename, str mode, str backend, bint lease):
+        file_path = os.path.abspath(os.fsdecode(os.fspath(filename)))
+        key = (file_path, mode, backend)
+        st = os.stat(file_path)
+        stale = None
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                product, size, mtime_ns = entry
+                if (
+                    not product.closed
+                    and size == st.st_size
+                    and mtime_ns == st.st_mtime_ns
+                ):
+                    self._entries[key] = entry
+                    self._hits += 1
+                    if lease:
+                        self._add_lease(product)
+                    return product
+
+                # modified file or product closed by the user
+                stale = product
+                self._nbytes -= size
+                self._invalidations += 1
+            self._misses += 1
+
+            if stale is not None and stale in self._leases:
+                self._retired.add(stale)
+                stale = None
+
+        if stale is not None:
+            stale.close()
+
+        product = Product(file_path, mode, backend)
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                entry = (product, st.st_size, st.st_mtime_ns)
+                self._nbytes += st.st_size
+                victims = []
+            else:
+                # opened concurrently by another thread
+                victims = [product]
+                product = entry[0]
+            self._entries[key] = entry
+            if lease:
+                self._add_lease(product)
+            victims.extend(self._retire(self._evict()))
+
+        for victim in victims:
+            victim.close()
+
+        return product
+
+    cdef _release(self, Product product):
+        # Release a lease on the product, close it if it has been removed
+        # from the pool and this was the last lease
+        with self._lock:
+            count = self._leases.pop(product) - 1
+            if count:
+                self._leases[product] = count
+                return
+            if product not in self._retired:
+                return
+            self._retired.discard(product)
+
+        product.close()
+
+    def open(self, filename, str mode="rb", str backend="stdio"):
+        """open(self, filename, mode="rb", backend="stdio")
+
+        Return an open :class:`Product` from the pool.
+
+        The product is opened (see :func:`epr.open`) only if it is not
+        already in the pool, or if the file has been modified after it
+        has been opened.
+
+        :param PathLike filename:
+            the path to the ENVISAT product file
+        :param str mode:
+            string that specifies the mode in which the file is opened
+        :param str backend:
+            string that specifies the I/O backend used to read the file
+        :returns:
+            the :class:`Product` instance
+        """
+        return self._open(filename, mode, backend, False)
+
+    def checkout(self, filename, str mode="rb", str backend="stdio"):
+        """checkout(self, filename, mode="rb", backend="stdio")
+
+        Check out a :class:`Product` from the pool.
+
+        Same as :meth:`open`, but the product is returned by a context
+        manager and is not closed, even if evicted from the pool, until
+        the context manager exits::
+
+            with pool.checkout(filename) as product:
+                ...
+
+        :param PathLike filename:
+            the path to the ENVISAT product file
+        :param str mode:
+            string that specifies the mode in which the file is opened
+        :param str backend:
+            string that specifies the I/O backend used to read the file
+        :returns:
+            a context manager returning the :class:`Product` instance
+        """
+        return _ProductLease(self, filename, mode, backend)
+
+    def clear(self):
+        """clear(self)
+
+        Close all the products in the pool.
+
+        Checked out products are closed when they are released.
+
+        :returns:
+            the number of products removed from the pool
+        """
+        with self._lock:
+            products = [entry[0] for entry in self._entries.values()]
+            self._entries.clear()
+            self._nbytes = 0
+            victims = self._retire(products)
+
+        for product in victims:
+            product.close()
+
+        return len(products)
+
+    def close(self):
+        """close(self)
+
+        Close all the products in the pool (see :meth:`clear`).
+        """
+        self.clear()
+
+    def get_stats(self):
+        """get_stats(self)
+
+        Returns statistics about the pool.
+
+        :returns:
+            a dictionary with the following items:
+
+            * `hits`: number of requests served by an open product
+            * `misses`: number of requests that opened a product
+            * `evictions`: number of products closed to satisfy the
+              limits of the pool
+            * `invalidations`: number of products re-opened because
+              the file has been modified or the product has been closed
+            * `open`: number of open products
+            * `bytes`: total size of the open product files
+            * `leased`: number of checked out products, including the
+              ones removed from the pool and not yet released
+            * `max_open`: maximum number of open products
+            * `max_bytes`: maximum total size of the open product
+              files (``None``: no limit)
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "open": len(self._entries),
+                "bytes": self._nbytes,
+                "leased": len(self._leases),
+                "max_open": self._max_open,
+                "max_bytes": None if self._max_bytes < 0 else self._max_bytes,
+            }
+
+
+cdef class _ProductLease:
+    # Context manager returned by ProductPool.checkout: the product is
+    # checked out on enter and released on exit
+    cdef ProductPool pool
+    cdef object filename
+    cdef str mode
+    cdef str backend
+    cdef Product product
+
+    def __cinit__(self, ProductPool pool, filename, str mode, str backend):
+        self.pool = pool
+        self.filename = filename
+        self.mode = mode
+        self.backend = backend
+
+    def __enter__(self):
+        if self.product is not None:
+            raise RuntimeError("product already checked out")
+        self.product = self.pool._open(
+            self.filename, self.mode, self.backend, True
+        )
+        return self.product
+
+    def __exit__(self, *args):
+        product = self.product
+        self.product = None
+        if product is not None:
+            self.pool._release(product)
 
 
 # library initialization/finalization
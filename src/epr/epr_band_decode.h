@@ -0,0 +1,283 @@
+/*
+ * PyEPR - Python bindings for ENVISAT Product Reader API
+ *
+ * Copyright (C) 2011-2026, Antonio Valentino <antonio.valentino@tiscali.it>
+ *
+ * This file is part of PyEPR.
+ *
+ * PyEPR is free software: you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation, either version 3 of the License, or
+ * (at your option) any later version.
+ *
+ * PyEPR is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with PyEPR.  If not, see <http://www.gnu.org/licenses/>.
+ */
+
+/*
+ * Decoding of the measurement data of bands.
+ *
+ * The functions in this file are vendored from the private part of the
+ * EPR C API (epr_band.c and epr_swap.c), that is not exported by the
+ * shared library. Only the public data structures declared in
+ * "epr_api.h" are used.
+ * Any change to the decoding rules of the EPR C API (see
+ * select_line_decode_function, epr_swap_endian_order,
+ * mirror_*_array and epr_zero_invalid_pixels) must be reflected here.
+ */
+
+#ifndef PYEPR_EPR_BAND_DECODE_H
+#define PYEPR_EPR_BAND_DECODE_H
+
+#include <math.h>
+#include <string.h>
+
+#include "epr_api.h"
+
+/* decoder of the raw data of a band (one raster line) */
+typedef void (*pyepr_line_decoder)(const void* source_array,
+                                   const EPR_SBandId* band_id,
+                                   int offset_x,
+                                   int raster_width,
+                                   int step_x,
+                                   void* raster_buffer,
+                                   int raster_pos);
+
+
+/* decoders of raw samples into (scaled) float values */
+#define PYEPR_DECODE_LINE_TO_FLOAT(NAME, SOURCE_TYPE, SAMPLE)              \
+static void NAME(const void* source_array, const EPR_SBandId* band_id,   \
+                 int offset_x, int raster_width, int step_x,             \
+                 void* raster_buffer, int raster_pos)                    \
+{                                                                         \
+    const SOURCE_TYPE* sa = (const SOURCE_TYPE*)source_array;            \
+    float* buf = (float*)raster_buffer;                                  \
+    int x1 = offset_x;                                                    \
+    int x2 = x1 + raster_width - 1;                                       \
+    int x;                                                                \
+                                                                          \
+    if (band_id->scaling_method == e_smid_log) {                          \
+        for (x = x1; x <= x2; x += step_x) {                              \
+            buf[raster_pos++] = (float)pow(                               \
+                10, band_id->scaling_offset +                             \
+                    band_id->scaling_factor * (SAMPLE));                  \
+        }                                                                 \
+    } else if (band_id->scaling_method == e_smid_lin) {                   \
+        for (x = x1; x <= x2; x += step_x) {                              \
+            buf[raster_pos++] = band_id->scaling_offset +                 \
+                                band_id->scaling_factor * (SAMPLE);       \
+        }                                                                 \
+    } else {                                                              \
+        for (x = x1; x <= x2; x += step_x) {                              \
+            buf[raster_pos++] = (float)(SAMPLE);                          \
+        }                                                                 \
+    }                                                                     \
+}
+
+/* decoders of raw samples copied without conversion */
+#define PYEPR_DECODE_LINE(NAME, SOURCE_TYPE, TARGET_TYPE, SAMPLE)         \
+static void NAME(const void* source_array, const EPR_SBandId* band_id,   \
+                 int offset_x, int raster_width, int step_x,             \
+                 void* raster_buffer, int raster_pos)                    \
+{                                                                         \
+    const SOURCE_TYPE* sa = (const SOURCE_TYPE*)source_array;            \
+    TARGET_TYPE* buf = (TARGET_TYPE*)raster_buffer;                      \
+    int x1 = offset_x;                                                    \
+    int x2 = x1 + raster_width - 1;                                       \
+    int x;                                                                \
+                                                                          \
+    (void)band_id;                                                        \
+    for (x = x1; x <= x2; x += step_x) {                                  \
+        buf[raster_pos++] = (TARGET_TYPE)(SAMPLE);                        \
+    }                                                                     \
+}
+
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_uchar_1_of_1_to_float,
+                           uchar, sa[x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_char_1_of_1_to_float,
+                           char, sa[x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_ushort_1_of_1_to_float,
+                           ushort, sa[x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_short_1_of_1_to_float,
+                           short, sa[x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_short_1_of_2_to_float,
+                           short, sa[2 * x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_short_2_of_2_to_float,
+                           short, sa[2 * x + 1])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_uchar_1_of_2_to_float,
+                           uchar, sa[2 * x])
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_uchar_2_of_2_to_float,
+                           uchar, sa[2 * x + 1])
+/* little endian 16-bit integer split into two bytes */
+PYEPR_DECODE_LINE_TO_FLOAT(pyepr_decode_line_uchar_2_to_f_to_float,
+                           uchar, (int)(sa[2 * x] | (sa[2 * x + 1] << 8)))
+
+PYEPR_DECODE_LINE(pyepr_decode_line_uchar_1_of_1_to_uchar,
+                  uchar, uchar, sa[x])
+PYEPR_DECODE_LINE(pyepr_decode_line_uchar_1_of_2_to_uchar,
+                  uchar, uchar, sa[2 * x])
+PYEPR_DECODE_LINE(pyepr_decode_line_uchar_2_of_2_to_uchar,
+                  uchar, uchar, sa[2 * x + 1])
+PYEPR_DECODE_LINE(pyepr_decode_line_ushort_1_of_1_to_ushort,
+                  ushort, ushort, sa[x])
+/* big endian 24-bit integer split into three bytes */
+PYEPR_DECODE_LINE(pyepr_decode_line_uchar_3_to_i_to_uint,
+                  uchar, uint,
+                  ((uint)sa[3 * x] << 16) | ((uint)sa[3 * x + 1] << 8) |
+                  (uint)sa[3 * x + 2])
+
+
+/* see select_line_decode_function */
+static pyepr_line_decoder pyepr_select_line_decoder(
+    EPR_EDataTypeId band_tid, EPR_ESampleModel band_smod,
+    EPR_EDataTypeId raw_tid)
+{
+    int band_byte = band_tid == e_tid_char || band_tid == e_tid_uchar;
+    int band_short = band_tid == e_tid_short || band_tid == e_tid_ushort;
+    int raw_byte = raw_tid == e_tid_char || raw_tid == e_tid_uchar;
+    int raw_short = raw_tid == e_tid_short || raw_tid == e_tid_ushort;
+
+    if (band_byte && raw_byte) {
+        switch (band_smod) {
+        case e_smod_1OF1: return pyepr_decode_line_uchar_1_of_1_to_uchar;
+        case e_smod_1OF2: return pyepr_decode_line_uchar_1_of_2_to_uchar;
+        case e_smod_2OF2: return pyepr_decode_line_uchar_2_of_2_to_uchar;
+        default: return NULL;
+        }
+    }
+    if (band_short && raw_short) {
+        return band_smod == e_smod_1OF1 ?
+            pyepr_decode_line_ushort_1_of_1_to_ushort : NULL;
+    }
+    if (band_tid == e_tid_float) {
+        switch (band_smod) {
+        case e_smod_1OF1:
+            switch (raw_tid) {
+            case e_tid_uchar: return pyepr_decode_line_uchar_1_of_1_to_float;
+            case e_tid_char: return pyepr_decode_line_char_1_of_1_to_float;
+            case e_tid_ushort: return pyepr_decode_line_ushort_1_of_1_to_float;
+            case e_tid_short: return pyepr_decode_line_short_1_of_1_to_float;
+            default: return NULL;
+            }
+        case e_smod_1OF2:
+            switch (raw_tid) {
+            case e_tid_uchar: return pyepr_decode_line_uchar_1_of_2_to_float;
+            case e_tid_short: return pyepr_decode_line_short_1_of_2_to_float;
+            default: return NULL;
+            }
+        case e_smod_2OF2:
+            switch (raw_tid) {
+            case e_tid_uchar: return pyepr_decode_line_uchar_2_of_2_to_float;
+            case e_tid_short: return pyepr_decode_line_short_2_of_2_to_float;
+            default: return NULL;
+            }
+        case e_smod_2TOF:
+            return raw_tid == e_tid_uchar ?
+                pyepr_decode_line_uchar_2_to_f_to_float : NULL;
+        default:
+            return NULL;
+        }
+    }
+    if (band_tid == e_tid_uint && band_smod == e_smod_3TOI &&
+            raw_tid == e_tid_uchar) {
+        return pyepr_decode_line_uchar_3_to_i_to_uint;
+    }
+    return NULL;
+}
+
+
+/* see epr_swap_endian_order (in place byte swap of 2 or 4 bytes items) */
+static void pyepr_swap_bytes(void* elems, uint elem_size, uint nelems)
+{
+    uchar* p = (uchar*)elems;
+    uchar tmp;
+    uint i;
+
+    if (elem_size == 2) {
+        for (i = 0; i < nelems; ++i, p += 2) {
+            tmp = p[0]; p[0] = p[1]; p[1] = tmp;
+        }
+    } else if (elem_size == 4) {
+        for (i = 0; i < nelems; ++i, p += 4) {
+            tmp = p[0]; p[0] = p[3]; p[3] = tmp;
+            tmp = p[1]; p[1] = p[2]; p[2] = tmp;
+        }
+    }
+}
+
+
+/* see mirror_*_array (in place reversal of the lines of a raster) */
+#define PYEPR_MIRROR_LINES(NAME, TYPE)                                    \
+static void NAME(TYPE* raster_buffer, uint raster_width,                 \
+                 uint raster_height)                                     \
+{                                                                         \
+    TYPE* start;                                                          \
+    TYPE* end;                                                            \
+    TYPE tmp;                                                             \
+    uint h;                                                               \
+                                                                          \
+    for (h = 0; h < raster_height; h++) {                                 \
+        start = raster_buffer + (size_t)h * raster_width;                 \
+        end = start + raster_width - 1;                                   \
+        while (start < end) {                                             \
+            tmp = *start;                                                 \
+            *start++ = *end;                                              \
+            *end-- = tmp;                                                 \
+        }                                                                 \
+    }                                                                     \
+}
+
+PYEPR_MIRROR_LINES(pyepr_mirror_float_lines, float)
+PYEPR_MIRROR_LINES(pyepr_mirror_uchar_lines, uchar)
+PYEPR_MIRROR_LINES(pyepr_mirror_ushort_lines, ushort)
+PYEPR_MIRROR_LINES(pyepr_mirror_uint_lines, uint)
+
+
+/* see epr_zero_invalid_pixels (bm_raster is a uchar raster) */
+#define PYEPR_ZERO_INVALID_PIXELS(TYPE)                                   \
+    {                                                                     \
+        TYPE* pixels = (TYPE*)raster->buffer;                             \
+        for (pos = 0; pos < len; pos++) {                                 \
+            if (bm_pixels[pos] == 0) {                                    \
+                pixels[pos] = 0;                                          \
+            }                                                             \
+        }                                                                 \
+    }
+
+static void pyepr_zero_invalid_pixels(EPR_SRaster* raster,
+                                      const EPR_SRaster* bm_raster)
+{
+    const uchar* bm_pixels = (const uchar*)bm_raster->buffer;
+    size_t len = (size_t)raster->raster_width * raster->raster_height;
+    size_t pos;
+
+    switch (raster->data_type) {
+    case e_tid_char:
+    case e_tid_uchar:
+        PYEPR_ZERO_INVALID_PIXELS(uchar)
+        break;
+    case e_tid_short:
+    case e_tid_ushort:
+        PYEPR_ZERO_INVALID_PIXELS(ushort)
+        break;
+    case e_tid_int:
+    case e_tid_uint:
+        PYEPR_ZERO_INVALID_PIXELS(uint)
+        break;
+    case e_tid_float:
+        PYEPR_ZERO_INVALID_PIXELS(float)
+        break;
+    case e_tid_double:
+        PYEPR_ZERO_INVALID_PIXELS(double)
+        break;
+    default:
+        break;
+    }
+}
+
+#endif  /* PYEPR_EPR_BAND_DECODE_H */
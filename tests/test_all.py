@@ -18,6 +18,8 @@
 import os
 import re
 import sys
+import json
+import types
 import shutil
 import typing
 import numbers
@@ -28,7 +30,11 @@ import platform
 import tempfile
 import unittest
 import functools
+import itertools
+import threading
+import contextlib
 from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
 
 from packaging.version import parse as Version  # noqa: N812
 
@@ -39,6 +45,11 @@ except ImportError:
 else:
     have_resource = True
 
+try:
+    from concurrent import interpreters
+except ImportError:
+    interpreters = None
+
 
 import numpy as np
 import numpy.testing as npt
@@ -50,6 +61,8 @@ from epr._epr import (
     _EPR_MAGIC_RECORD,  # noqa: PLC2701
     _EPR_MAGIC_BAND_ID,  # noqa: PLC2701
     _EPR_MAGIC_PRODUCT_ID,  # noqa: PLC2701
+    _read_flags,  # noqa: PLC2701
+    _eval_bitmask,  # noqa: PLC2701
 )
 
 EPR_TO_NUMPY_TYPE = {
@@ -82,6 +95,9 @@ def has_epr_c_bug_pyepr009() -> bool:
 EPR_C_BUG_PYEPR009 = has_epr_c_bug_pyepr009()
 EPR_C_BUG_BCEPR002 = EPR_C_BUG_PYEPR009
 
+# in-memory C streams (fmemopen) are not available on Windows
+MMAP_BACKEND_UNAVAILABLE = sys.platform == "win32"
+
 
 TESTDIR = pathlib.Path(__file__).parent
 TEST_PRODUCT = "ASA_APM_1PNPDE20091007_025628_000000432083_00118_39751_9244.N1"
@@ -179,6 +195,27 @@ class TestOpenProduct(unittest.TestCase):
     def test_open_invalid_mode_03(self):
         self.assertRaises(TypeError, epr.open, PRODUCT_FILE, 0)
 
+    @unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+    def test_open_mmap(self):
+        with epr.open(PRODUCT_FILE, backend="mmap") as product:
+            self.assertTrue(isinstance(product, epr.Product))
+            self.assertEqual(product.mode, "rb")
+            self.assertEqual(product.backend, "mmap")
+
+    @unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+    def test_open_rwb_mmap(self):
+        with epr.open(PRODUCT_FILE, "rb+", backend="mmap") as product:
+            self.assertTrue(isinstance(product, epr.Product))
+            self.assertEqual(product.mode, "rb+")
+            self.assertEqual(product.backend, "mmap")
+
+    @unittest.skipUnless(MMAP_BACKEND_UNAVAILABLE, "mmap backend available")
+    def test_open_mmap_unsupported(self):
+        self.assertRaises(ValueError, epr.open, PRODUCT_FILE, backend="mmap")
+
+    def test_open_invalid_backend(self):
+        self.assertRaises(ValueError, epr.open, PRODUCT_FILE, "rb", "mem")
+
     def test_open_bytes(self):
         filename = str(PRODUCT_FILE).encode("UTF-8")
         with epr.open(filename) as product:
@@ -209,8 +246,296 @@ class TestOpenProduct(unittest.TestCase):
         self.assertRaises(ValueError, epr.Product, __file__)
 
 
+class TestOpenProductLazy(unittest.TestCase):
+    def test_open_lazy(self):
+        with (
+            epr.open(PRODUCT_FILE) as ref,
+            epr.open(PRODUCT_FILE, lazy=True) as product,
+        ):
+            self.assertEqual(product.id_string, ref.id_string)
+            self.assertEqual(product.tot_size, ref.tot_size)
+            self.assertEqual(str(product.get_mph()), str(ref.get_mph()))
+            self.assertEqual(str(product.get_sph()), str(ref.get_sph()))
+            self.assertEqual(
+                product.get_dataset_names(), ref.get_dataset_names()
+            )
+
+    def test_open_lazy_failure(self):
+        self.assertRaises(ValueError, epr.open, __file__, lazy=True)
+
+    def test_open_lazy_errors(self):
+        # same errors of epr_open_product
+        for filename in (__file__, TESTDIR / "missing.N1"):
+            with self.subTest(filename=filename):
+                with self.assertRaises(epr.EPRError) as ref:
+                    epr.open(filename)
+                with self.assertRaises(epr.EPRError) as cm:
+                    epr.open(filename, lazy=True)
+                self.assertIs(type(cm.exception), type(ref.exception))
+                self.assertEqual(cm.exception.args, ref.exception.args)
+
+    def test_open_lazy_invalid_sph(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            with PRODUCT_FILE.open("rb") as src:
+                filename.write_bytes(src.read(1300))
+            product = epr.open(filename, lazy=True)
+            self.assertEqual(product.id_string, TestProduct.ID_STRING)
+            self.assertRaises(ValueError, product.get_band_names)
+            self.assertTrue(product.closed)
+
+
+class TestReadHeaders(unittest.TestCase):
+    DSD_FIELDS = (
+        "index",
+        "ds_name",
+        "ds_type",
+        "filename",
+        "ds_offset",
+        "ds_size",
+        "num_dsr",
+        "dsr_size",
+    )
+
+    @staticmethod
+    def _record_to_dict(record):
+        data = {}
+        for field in record:
+            if field.get_num_elems() > 1:
+                value = field.get_elems().tolist()
+            else:
+                value = field.get_elem()
+            if isinstance(value, bytes):
+                value = value.decode("ascii")
+            data[field.get_name()] = value
+        return data
+
+    def test_read_headers(self):
+        (header,) = epr.read_headers([PRODUCT_FILE])
+        self.assertIsInstance(header, epr.ProductHeader)
+        self.assertEqual(header.file_path, os.fspath(PRODUCT_FILE))
+        with epr.open(PRODUCT_FILE) as product:
+            self.assertEqual(
+                header.mph, self._record_to_dict(product.get_mph())
+            )
+            self.assertEqual(
+                header.sph, self._record_to_dict(product.get_sph())
+            )
+            self.assertEqual(len(header.dsds), product.get_num_dsds())
+            for index, item in enumerate(header.dsds):
+                dsd = product.get_dsd_at(index)
+                for name in self.DSD_FIELDS:
+                    self.assertEqual(item[name], getattr(dsd, name))
+
+    def test_read_headers_value_types(self):
+        # values are typed as in the EPR C API
+        data = PRODUCT_FILE.read_bytes()[:8192]
+        for old, new in (
+            (b'PHASE="X"\n', b"PHASE=0\n \n"),
+            (b"CYCLE=+0000000083\n", b"CYCLE=-0000000083\n"),
+            (b"REL_ORBIT=+0000000118\n", b"REL_ORBIT=+00118-0004\n"),
+        ):
+            self.assertEqual(len(old), len(new))
+            data = data.replace(old, new, 1)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            filename.write_bytes(data)
+            (header,) = epr.read_headers([filename])
+            with epr.open(filename) as product:
+                mph = self._record_to_dict(product.get_mph())
+
+        self.assertEqual(list(header.mph), list(mph))
+        for name, value in mph.items():
+            with self.subTest(name=name):
+                self.assertEqual(header.mph[name], value)
+        self.assertEqual(header.mph["PHASE"], ord("0"))
+        self.assertEqual(header.mph["CYCLE"], -83)
+        self.assertEqual(header.mph["REL_ORBIT"], [118, -4])
+
+    def test_read_headers_values(self):
+        (header,) = epr.read_headers([PRODUCT_FILE])
+        self.assertEqual(header.mph["PRODUCT"], PRODUCT_FILE.name)
+        self.assertEqual(header.mph["ABS_ORBIT"], 39751)
+        self.assertEqual(header.mph["NUM_DSD"], TestProduct.DATASET_NDSDS)
+        self.assertEqual(
+            header.sph["SPH_DESCRIPTOR"], TestProduct.SPH_DESCRIPTOR
+        )
+        self.assertAlmostEqual(header.sph["LINE_TIME_INTERVAL"], 0.011)
+        self.assertEqual(header.dsds.dtype.names, self.DSD_FIELDS)
+
+    def test_read_headers_workers(self):
+        paths = [PRODUCT_FILE, str(PRODUCT_FILE)] * 3
+        ref = epr.read_headers(paths[:1])[0]
+        headers = epr.read_headers(paths, workers=4)
+        self.assertEqual(len(headers), len(paths))
+        for path, header in zip(paths, headers, strict=True):
+            self.assertEqual(header.file_path, os.fspath(path))
+            self.assertEqual(header.mph, ref.mph)
+            self.assertEqual(header.sph, ref.sph)
+            npt.assert_array_equal(header.dsds, ref.dsds)
+
+    def test_read_headers_executor(self):
+        paths = [PRODUCT_FILE] * 3
+        ref = epr.read_headers(paths[:1])[0]
+        with ThreadPoolExecutor(2) as executor:
+            headers = epr.read_headers(paths, executor=executor)
+        self.assertEqual(len(headers), len(paths))
+        for header in headers:
+            self.assertEqual(header.mph, ref.mph)
+            self.assertEqual(header.sph, ref.sph)
+            npt.assert_array_equal(header.dsds, ref.dsds)
+
+    def test_read_headers_empty(self):
+        self.assertEqual(epr.read_headers([]), [])
+
+    def test_read_headers_invalid_workers(self):
+        self.assertRaises(
+            ValueError, epr.read_headers, [PRODUCT_FILE], workers=0
+        )
+
+    def test_read_headers_invalid_product(self):
+        with self.assertRaises(epr.EPRValueError) as cm:
+            epr.read_headers([PRODUCT_FILE, __file__], workers=2)
+        self.assertEqual(cm.exception.code, 203)
+
+    def test_read_headers_truncated(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            with PRODUCT_FILE.open("rb") as src:
+                filename.write_bytes(src.read(1300))
+            self.assertRaises(epr.EPRError, epr.read_headers, [filename])
+
+    def test_read_headers_file_not_found(self):
+        self.assertRaises(
+            FileNotFoundError, epr.read_headers, ["non-existent.N1"]
+        )
+
+
+class TestProductLayoutCache(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        cache_home = os.environ.get("XDG_CACHE_HOME")
+        if cache_home is None:
+            self.addCleanup(os.environ.pop, "XDG_CACHE_HOME", None)
+        else:
+            self.addCleanup(
+                os.environ.__setitem__, "XDG_CACHE_HOME", cache_home
+            )
+        os.environ["XDG_CACHE_HOME"] = tmpdir.name
+        self.cache_dir = pathlib.Path(tmpdir.name) / "pyepr"
+
+    @staticmethod
+    def _get_layout(product):
+        return (
+            product.meris_iodd_version,
+            product.get_scene_width(),
+            product.get_scene_height(),
+            product.get_num_datasets(),
+            product.get_num_dsds(),
+            product.get_num_bands(),
+            product.get_dataset_names(),
+            product.get_band_names(),
+        )
+
+    @staticmethod
+    def _get_num_loads():
+        stats = epr.get_record_info_cache_stats()
+        return stats["hits"] + stats["misses"]
+
+    def _open_cached(self):
+        epr.open(PRODUCT_FILE, layout_cache=True).close()
+        (cache_file,) = self.cache_dir.glob("*.json")
+        return cache_file
+
+    def test_layout_cache_miss(self):
+        self.assertFalse(self.cache_dir.exists())
+        with epr.open(PRODUCT_FILE, layout_cache=True) as product:
+            self.assertEqual(product.id_string, TestProduct.ID_STRING)
+        self.assertEqual(len(list(self.cache_dir.glob("*.json"))), 1)
+
+    def test_layout_cache_hit(self):
+        self._open_cached()
+        with epr.open(PRODUCT_FILE) as ref:
+            layout = self._get_layout(ref)
+            ref_header = ref.get_header()
+        num_loads = self._get_num_loads()
+        with epr.open(PRODUCT_FILE, layout_cache=True) as product:
+            self.assertEqual(self._get_layout(product), layout)
+            header = product.get_header()
+            self.assertEqual(header.mph, ref_header.mph)
+            self.assertEqual(header.sph, ref_header.sph)
+            npt.assert_array_equal(header.dsds, ref_header.dsds)
+            self.assertEqual(self._get_num_loads(), num_loads)
+
+            # data access loads the product
+            band = product.get_band(TestProductHighLevelAPI.BAND_NAMES[0])
+            self.assertIsInstance(band, epr.Band)
+            self.assertEqual(self._get_num_loads(), num_loads + 1)
+            self.assertEqual(self._get_layout(product), layout)
+
+    def test_layout_cache_stale(self):
+        cache_file = self._open_cached()
+        data = json.loads(cache_file.read_text())
+        data["mtime_ns"] -= 1
+        data["band_names"] = []
+        cache_file.write_text(json.dumps(data))
+        with epr.open(PRODUCT_FILE, layout_cache=True) as product:
+            self.assertEqual(
+                product.get_band_names(), TestProductHighLevelAPI.BAND_NAMES
+            )
+        data = json.loads(cache_file.read_text())
+        self.assertEqual(
+            data["band_names"], TestProductHighLevelAPI.BAND_NAMES
+        )
+
+    def test_layout_cache_invalid(self):
+        cache_file = self._open_cached()
+        cache_file.write_text("{")
+        with epr.open(PRODUCT_FILE, layout_cache=True) as product:
+            self.assertEqual(
+                product.get_band_names(), TestProductHighLevelAPI.BAND_NAMES
+            )
+        self.assertIsInstance(json.loads(cache_file.read_text()), dict)
+
+    def test_layout_cache_closed(self):
+        self._open_cached()
+        product = epr.open(PRODUCT_FILE, layout_cache=True)
+        product.close()
+        self.assertRaises(ValueError, product.get_band_names)
+        self.assertRaises(ValueError, product.get_header)
+
+    def test_clear_layout_cache(self):
+        self._open_cached()
+        self.assertEqual(epr.clear_layout_cache(max_age=3600), 0)
+        self.assertEqual(epr.clear_layout_cache(), 1)
+        self.assertEqual(list(self.cache_dir.glob("*.json")), [])
+        self.assertEqual(epr.clear_layout_cache(), 0)
+
+    def test_clear_layout_cache_max_age(self):
+        cache_file = self._open_cached()
+        mtime = cache_file.stat().st_mtime - 7200
+        os.utime(cache_file, (mtime, mtime))
+        self.assertEqual(epr.clear_layout_cache(max_age=3600), 1)
+        self.assertFalse(cache_file.exists())
+
+    def test_clear_layout_cache_invalid(self):
+        self.assertRaises(ValueError, epr.clear_layout_cache, -1)
+
+    def test_get_header(self):
+        (ref,) = epr.read_headers([PRODUCT_FILE])
+        with epr.open(PRODUCT_FILE) as product:
+            header = product.get_header()
+        self.assertEqual(header.mph, ref.mph)
+        self.assertEqual(header.sph, ref.sph)
+        npt.assert_array_equal(header.dsds, ref.dsds)
+
+
 class TestProduct(unittest.TestCase):  # noqa: PLR0904
     OPEN_MODE = "rb"
+    BACKEND = "stdio"
+    LAZY = False
     ID_STRING = "ASA_APM_1PNPDE20091007_025628_000000432083_00118"
     TOT_SIZE = 22903686
 
@@ -236,7 +561,9 @@ class TestProduct(unittest.TestCase):  # noqa: PLR0904
     MERIS_IODD_VERSION = 0
 
     def setUp(self):
-        self.product = epr.Product(PRODUCT_FILE, self.OPEN_MODE)
+        self.product = epr.Product(
+            PRODUCT_FILE, self.OPEN_MODE, self.BACKEND, self.LAZY
+        )
         self.bm_expr = TEST_PRODUCT_BM_EXPR
 
     def tearDown(self):
@@ -258,6 +585,9 @@ class TestProduct(unittest.TestCase):  # noqa: PLR0904
     def test_mode_property(self):
         self.assertEqual(self.product.mode, self.OPEN_MODE)
 
+    def test_backend_property(self):
+        self.assertEqual(self.product.backend, self.BACKEND)
+
     def test_tot_size_property(self):
         self.assertEqual(self.product.tot_size, self.TOT_SIZE)
 
@@ -437,6 +767,28 @@ class TestProductRW(TestProduct):
     OPEN_MODE = "rb+"
 
 
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestProductMmap(TestProduct):
+    BACKEND = "mmap"
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestProductMmapRW(TestProduct):
+    OPEN_MODE = "rb+"
+    BACKEND = "mmap"
+
+
+class TestProductLazy(TestProduct):
+    LAZY = True
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestProductLazyMmapRW(TestProduct):
+    OPEN_MODE = "rb+"
+    BACKEND = "mmap"
+    LAZY = True
+
+
 class TestProductHighLevelAPI(unittest.TestCase):
     DATASET_NAMES = TestProduct.DATASET_NAMES
     BAND_NAMES = [
@@ -535,6 +887,953 @@ class TestProductHighLevelAPI(unittest.TestCase):
         self.assertTrue(product.closed)
 
 
+class TestProductReadBands(unittest.TestCase):
+    BACKEND = "stdio"
+    BAND_NAMES = TestProductHighLevelAPI.BAND_NAMES
+    BAND_NAME = "proc_data_1"
+    WINDOW = (90, 80, 200, 100)
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE, "rb", self.BACKEND)
+
+    def tearDown(self):
+        self.product.close()
+
+    def read_band(self, name, window, xstep=1, ystep=1):
+        xoffset, yoffset, width, height = window
+        band = self.product.get_band(name)
+        return band.read_as_array(
+            width, height, xoffset, yoffset, xstep, ystep
+        )
+
+    def test_read_bands(self):
+        data = self.product.read_bands(self.BAND_NAMES)
+        self.assertEqual(list(data), self.BAND_NAMES)
+        for name in self.BAND_NAMES:
+            band = self.product.get_band(name)
+            npt.assert_array_equal(data[name], band.read_as_array())
+
+    def test_read_bands_window(self):
+        data = self.product.read_bands(self.BAND_NAMES, self.WINDOW, 3, 2)
+        for name in self.BAND_NAMES:
+            npt.assert_array_equal(
+                data[name], self.read_band(name, self.WINDOW, 3, 2)
+            )
+
+    def test_read_bands_same_dataset(self):
+        names = [self.BAND_NAME, self.BAND_NAME]
+        ref = self.read_band(self.BAND_NAME, self.WINDOW, 2, 3)
+        out = np.zeros((2, *ref.shape), ref.dtype)
+        data = self.product.read_bands(names, self.WINDOW, 2, 3, out=out)
+        self.assertTrue(np.shares_memory(data[self.BAND_NAME], out))
+        npt.assert_array_equal(out[0], ref)
+        npt.assert_array_equal(out[1], ref)
+
+    def test_read_bands_invalid_out(self):
+        out = [np.zeros((100, 200), np.float32)]
+        self.assertRaises(
+            ValueError,
+            self.product.read_bands,
+            [self.BAND_NAME, self.BAND_NAME],
+            self.WINDOW,
+            out=out,
+        )
+
+    def test_read_bands_outside_scene(self):
+        width = self.product.get_scene_width()
+        self.assertRaises(
+            ValueError,
+            self.product.read_bands,
+            [self.BAND_NAME, self.BAND_NAME],
+            (width - 10, 0, 20, 10),
+        )
+
+    def test_read_bands_invalid_name(self):
+        self.assertRaises(
+            ValueError, self.product.read_bands, ["invalid_band_name"]
+        )
+
+    def test_close_while_reading(self):
+        # pending reads are completed before releasing the product
+        ref = self.product.read_bands(self.BAND_NAMES)
+        started = threading.Event()
+        results = []
+
+        def read():
+            started.set()
+            with contextlib.suppress(ValueError):
+                results.extend(
+                    self.product.read_bands(self.BAND_NAMES) for _ in range(10)
+                )
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        started.wait()
+        self.product.close()
+        thread.join()
+        self.assertTrue(self.product.closed)
+        for data in results:
+            for name in self.BAND_NAMES:
+                npt.assert_array_equal(data[name], ref[name])
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestProductReadBandsMmap(TestProductReadBands):
+    BACKEND = "mmap"
+
+
+class TestProductWindowForBBox(unittest.TestCase):
+    BBOX = (12.5, 44.5, 12.8, 44.7)
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE)
+
+    def tearDown(self):
+        self.product.close()
+
+    def _ref_window(self, bbox):
+        lon_min, lat_min, lon_max, lat_max = bbox
+        lat = self.product.get_band("latitude").read_as_array()
+        lon = self.product.get_band("longitude").read_as_array()
+        mask = (lat >= lat_min) & (lat <= lat_max)
+        mask &= (lon >= lon_min) & (lon <= lon_max)
+        lines = np.flatnonzero(mask.any(axis=1))
+        pixels = np.flatnonzero(mask.any(axis=0))
+        return (
+            pixels[0],
+            lines[0],
+            pixels[-1] - pixels[0] + 1,
+            lines[-1] - lines[0] + 1,
+        )
+
+    def test_window_for_bbox(self):
+        window = self.product.window_for_bbox(*self.BBOX)
+        self.assertEqual(window, self._ref_window(self.BBOX))
+
+    def test_window_for_bbox_small(self):
+        bbox = (12.9, 44.9, 12.91, 44.91)
+        window = self.product.window_for_bbox(*bbox)
+        self.assertEqual(window, self._ref_window(bbox))
+
+    def test_window_for_bbox_whole_scene(self):
+        window = self.product.window_for_bbox(-180, -90, 180, 90)
+        self.assertEqual(
+            window,
+            (
+                0,
+                0,
+                self.product.get_scene_width(),
+                self.product.get_scene_height(),
+            ),
+        )
+
+    def test_window_for_bbox_no_intersection(self):
+        self.assertIsNone(self.product.window_for_bbox(-10, -10, -9, -9))
+
+    def test_window_for_bbox_invalid(self):
+        self.assertRaises(
+            ValueError, self.product.window_for_bbox, 12, 45, 13, 44
+        )
+
+    def test_read_as_array_bbox(self):
+        band = self.product.get_band("proc_data_1")
+        xoffset, yoffset, width, height = self.product.window_for_bbox(
+            *self.BBOX
+        )
+        data = band.read_as_array(bbox=self.BBOX)
+        npt.assert_array_equal(
+            data, band.read_as_array(width, height, xoffset, yoffset)
+        )
+
+    def test_read_as_array_bbox_no_intersection(self):
+        band = self.product.get_band("proc_data_1")
+        self.assertRaises(
+            ValueError, band.read_as_array, bbox=(-10, -10, -9, -9)
+        )
+
+    def test_read_as_array_bbox_and_window(self):
+        band = self.product.get_band("proc_data_1")
+        self.assertRaises(ValueError, band.read_as_array, 10, bbox=self.BBOX)
+
+
+class TestBitmaskExprEval(unittest.TestCase):
+    # The parser and the evaluator of bit-mask expressions on synthetic
+    # flag bands, the expected masks follow the rules of the C API
+    # (epr_parse_bm_expr_str and epr_eval_bm_term)
+    FLAG_CODING = {"A": 0x01, "B": 0x02, "C": 0x04}
+
+    def setUp(self):
+        # all the combinations of the A, B and C flags
+        self.flag_bands = {
+            "flags": (
+                self.FLAG_CODING,
+                np.arange(8, dtype=np.uint8).reshape(2, 4),
+            ),
+            "quality": (
+                {"LOW": 0x0100, "BAD": 0x0300},
+                np.array(
+                    [
+                        [0x0000, 0x0100, 0x0200, 0x0300],
+                        [0x0301, 0x0201, 0x0101, 0x0001],
+                    ],
+                    np.uint16,
+                ),
+            ),
+        }
+
+    def eval(self, expr):
+        return _eval_bitmask(expr, self.flag_bands)
+
+    def assert_mask(self, expr, expected):
+        data = self.eval(expr)
+        self.assertEqual(data.dtype, np.uint8)
+        npt.assert_array_equal(data, np.array(expected, np.uint8))
+
+    def test_flag(self):
+        self.assert_mask("flags.A", [[0, 1, 0, 1], [0, 1, 0, 1]])
+        self.assert_mask("flags.C", [[0, 0, 0, 0], [1, 1, 1, 1]])
+
+    def test_multi_bit_flag(self):
+        # all the bits of the mask must be set
+        self.assert_mask("quality.LOW", [[0, 1, 0, 1], [1, 0, 1, 0]])
+        self.assert_mask("quality.BAD", [[0, 0, 0, 1], [1, 0, 0, 0]])
+
+    def test_precedence(self):
+        # "not" binds tighter than "and", that binds tighter than "or"
+        self.assert_mask(
+            "flags.A or flags.B and flags.C", [[0, 1, 0, 1], [0, 1, 1, 1]]
+        )
+        self.assert_mask(
+            "flags.B and flags.C or flags.A", [[0, 1, 0, 1], [0, 1, 1, 1]]
+        )
+        self.assert_mask(
+            "(flags.A or flags.B) and flags.C", [[0, 0, 0, 0], [0, 1, 1, 1]]
+        )
+        self.assert_mask(
+            "not flags.A and flags.B", [[0, 0, 1, 0], [0, 0, 1, 0]]
+        )
+        self.assert_mask(
+            "not (flags.A and flags.B)", [[1, 1, 1, 0], [1, 1, 1, 0]]
+        )
+        self.assert_mask("not not flags.A", [[0, 1, 0, 1], [0, 1, 0, 1]])
+
+    def test_operators(self):
+        for expr, ref in (
+            ("flags.A | flags.B & flags.C", "flags.A or flags.B and flags.C"),
+            ("!flags.A & flags.B", "not flags.A and flags.B"),
+            (
+                "!(flags.A&flags.B)|quality.BAD",
+                "not (flags.A and flags.B) or quality.BAD",
+            ),
+        ):
+            with self.subTest(expr=expr):
+                npt.assert_array_equal(self.eval(expr), self.eval(ref))
+
+    def test_case_insensitive_keywords(self):
+        self.assert_mask(
+            "flags.A Or NoT flags.C AND flags.b",
+            [[0, 1, 1, 1], [0, 1, 0, 1]],
+        )
+        self.assert_mask("NOT flags.a", [[1, 0, 1, 0], [1, 0, 1, 0]])
+
+    def test_trailing_tokens(self):
+        # as in the C API, the tokens following a complete expression
+        # are ignored
+        for expr in ("flags.A flags.B", "flags.A )", "flags.A ? flags.B"):
+            with self.subTest(expr=expr):
+                self.assert_mask(expr, [[0, 1, 0, 1], [0, 1, 0, 1]])
+
+    def test_syntax_errors(self):
+        for expr, message in (
+            ("(flags.A or flags.B", "')' expected"),
+            ("flags A", "'.' expected"),
+            ("flags.", "flag name expected"),
+            ("flags.A and", "operator or flag name expected"),
+            ("not", "operator or flag name expected"),
+            ("&", "operator or flag name expected"),
+        ):
+            with self.subTest(expr=expr):
+                with self.assertRaises(epr.EPRValueError) as cm:
+                    self.eval(expr)
+                self.assertEqual(cm.exception.code, 213)
+                self.assertIn(message, str(cm.exception))
+
+    def test_empty_expression(self):
+        self.assertRaises(epr.EPRValueError, self.eval, "")
+
+    def test_unknown_flag(self):
+        for expr in ("flags.D", "l2_flags.A"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(epr.EPRError) as cm:
+                    self.eval(expr)
+                self.assertEqual(cm.exception.code, 301)
+
+
+class SyntheticFlagBand:
+    # Band-like object with flags stored in memory, implementing the
+    # part of the Band interface used by Band.read_flags
+    def __init__(self, data, flag_coding):
+        self.name = "flags"
+        self.data = data
+        self.flag_coding = flag_coding
+
+    def get_name(self):
+        return self.name
+
+    def read_as_array(  # noqa: PLR0913, PLR0917
+        self, width=None, height=None, xoffset=0, yoffset=0, xstep=1, ystep=1
+    ):
+        if width is None:
+            width = self.data.shape[1] - xoffset
+        if height is None:
+            height = self.data.shape[0] - yoffset
+        return self.data[
+            yoffset : yoffset + height : ystep,
+            xoffset : xoffset + width : xstep,
+        ].copy()
+
+
+class TestReadFlags(unittest.TestCase):
+    # Band.read_flags on a synthetic flag band
+    FLAG_CODING = types.MappingProxyType({
+        "A": epr.FlagDef(0x01, "flag A"),
+        "B": epr.FlagDef(0x02, "flag B"),
+        "C": epr.FlagDef(0x04, None),
+        "AC": epr.FlagDef(0x05, "both A and C"),
+    })
+
+    def setUp(self):
+        # all the combinations of the A, B and C flags
+        data = np.arange(8, dtype=np.uint16).reshape(2, 4)
+        self.band = SyntheticFlagBand(data, self.FLAG_CODING)
+
+    def read_flags(
+        self, names=None, window=None, xstep=1, ystep=1, *, packed=False
+    ):
+        return _read_flags(self.band, names, window, xstep, ystep, packed)
+
+    def test_read_flags(self):
+        planes = self.read_flags()
+        self.assertEqual(list(planes), ["A", "B", "C", "AC"])
+        for plane in planes.values():
+            self.assertEqual(plane.dtype, np.bool_)
+            self.assertEqual(plane.shape, (2, 4))
+        npt.assert_array_equal(planes["A"], [[0, 1, 0, 1], [0, 1, 0, 1]])
+        npt.assert_array_equal(planes["B"], [[0, 0, 1, 1], [0, 0, 1, 1]])
+        npt.assert_array_equal(planes["C"], [[0, 0, 0, 0], [1, 1, 1, 1]])
+        # all the bits of the mask must be set
+        npt.assert_array_equal(planes["AC"], [[0, 0, 0, 0], [0, 1, 0, 1]])
+
+    def test_read_flags_names(self):
+        planes = self.read_flags(["c", "A"])
+        self.assertEqual(list(planes), ["c", "A"])
+        npt.assert_array_equal(planes["c"], [[0, 0, 0, 0], [1, 1, 1, 1]])
+        npt.assert_array_equal(planes["A"], [[0, 1, 0, 1], [0, 1, 0, 1]])
+
+    def test_read_flags_window(self):
+        planes = self.read_flags(["A", "C"], (1, 0, 3, 2))
+        npt.assert_array_equal(planes["A"], [[1, 0, 1], [1, 0, 1]])
+        npt.assert_array_equal(planes["C"], [[0, 0, 0], [1, 1, 1]])
+
+    def test_read_flags_step(self):
+        planes = self.read_flags(["A", "B"], (1, 0, 3, 2), xstep=2, ystep=2)
+        npt.assert_array_equal(planes["A"], [[1, 1]])
+        npt.assert_array_equal(planes["B"], [[0, 1]])
+
+    def test_read_flags_packed(self):
+        data = np.tile(np.arange(8, dtype=np.uint16), (3, 2))[:, :13]
+        self.band = SyntheticFlagBand(data, self.FLAG_CODING)
+        unpacked = self.read_flags()
+        planes = self.read_flags(packed=True)
+        self.assertEqual(list(planes), list(unpacked))
+        for name, plane in planes.items():
+            with self.subTest(name=name):
+                self.assertEqual(plane.dtype, np.uint8)
+                self.assertEqual(plane.shape, (3, 2))
+                npt.assert_array_equal(
+                    np.unpackbits(plane, axis=-1, count=13), unpacked[name]
+                )
+        npt.assert_array_equal(planes["A"], [[0b01010101, 0b01010000]] * 3)
+
+    def test_read_flags_packed_window(self):
+        planes = self.read_flags(["B"], (1, 0, 3, 2), packed=True)
+        npt.assert_array_equal(planes["B"], [[0b01100000]] * 2)
+
+    def test_read_flags_packed_large(self):
+        # packed in chunks of rows
+        rng = np.random.default_rng(0)
+        data = rng.integers(0, 8, (7, (1 << 18) + 3), dtype=np.uint8)
+        self.band = SyntheticFlagBand(data, self.FLAG_CODING)
+        mask = self.FLAG_CODING["B"].bit_mask
+        planes = self.read_flags(["B"], packed=True)
+        npt.assert_array_equal(
+            planes["B"], np.packbits((data & mask) == mask, axis=-1)
+        )
+
+    def test_read_flags_invalid_name(self):
+        with self.assertRaises(epr.EPRError) as cm:
+            self.read_flags(["A", "D"])
+        self.assertEqual(cm.exception.code, 301)
+
+    def test_read_flags_not_a_flag_band(self):
+        self.band.flag_coding = None
+        self.assertRaises(ValueError, self.read_flags)
+
+
+class TestCompileBitmask(unittest.TestCase):
+    def setUp(self):
+        self.product = epr.open(PRODUCT_FILE)
+
+    def tearDown(self):
+        self.product.close()
+
+    def test_compile_bitmask_invalid_band(self):
+        with self.assertRaises(epr.EPRError) as cm:
+            epr.compile_bitmask(self.product, "l5_flags.LAND")
+        self.assertEqual(cm.exception.code, 301)
+
+    def test_compile_bitmask_syntax_error(self):
+        self.assertRaises(
+            epr.EPRError,
+            epr.compile_bitmask,
+            self.product,
+            "l2_flags.LAND AND",
+        )
+
+    def test_compile_bitmask_syntax_error_code(self):
+        for expr in ("(l2_flags.LAND", "l2_flags LAND", "l2_flags.", "&"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(epr.EPRValueError) as cm:
+                    epr.compile_bitmask(self.product, expr)
+                self.assertEqual(cm.exception.code, 213)
+
+    def test_compile_bitmask_invalid_product(self):
+        self.assertRaises(
+            TypeError, epr.compile_bitmask, None, "l2_flags.LAND"
+        )
+
+    @unittest.skipIf(TEST_PRODUCT_BM_EXPR is None, "no flag band available")
+    def test_read(self):
+        bm = epr.compile_bitmask(self.product, TEST_PRODUCT_BM_EXPR)
+        self.assertIsInstance(bm, epr.BitmaskExpr)
+        self.assertEqual(bm.expr, TEST_PRODUCT_BM_EXPR)
+        self.assertIs(bm.product, self.product)
+
+        width = self.product.get_scene_width()
+        height = self.product.get_scene_height()
+        raster = epr.create_bitmask_raster(width, height)
+        self.product.read_bitmask_raster(TEST_PRODUCT_BM_EXPR, 0, 0, raster)
+
+        data = bm.read()
+        self.assertEqual(data.dtype, np.uint8)
+        npt.assert_array_equal(data, raster.data)
+
+    @unittest.skipIf(TEST_PRODUCT_BM_EXPR is None, "no flag band available")
+    def test_read_bitmask_raster(self):
+        bm = epr.compile_bitmask(self.product, TEST_PRODUCT_BM_EXPR)
+        ref = epr.create_bitmask_raster(20, 10, 2, 2)
+        raster = epr.create_bitmask_raster(20, 10, 2, 2)
+        self.product.read_bitmask_raster(TEST_PRODUCT_BM_EXPR, 3, 5, ref)
+        self.product.read_bitmask_raster(bm, 3, 5, raster)
+        npt.assert_array_equal(raster.data, ref.data)
+
+    def test_read_bitmasks_empty(self):
+        self.assertEqual(self.product.read_bitmasks({}), {})
+
+        window = (3, 5, 20, 10)
+        data = self.product.read_bitmasks({}, window, 2, labels=True)
+        self.assertEqual(data.dtype, np.uint8)
+        self.assertEqual(data.shape, (10, 10))
+        self.assertFalse(data.any())
+
+    def test_read_bitmasks_invalid_band(self):
+        with self.assertRaises(epr.EPRError) as cm:
+            self.product.read_bitmasks({"land": "l5_flags.LAND"})
+        self.assertEqual(cm.exception.code, 301)
+
+    @unittest.skipIf(TEST_PRODUCT_BM_EXPR is None, "no flag band available")
+    def test_read_bitmasks(self):
+        exprs = {
+            "a": TEST_PRODUCT_BM_EXPR,
+            "b": f"NOT ({TEST_PRODUCT_BM_EXPR})",
+        }
+        window = (3, 5, 20, 10)
+        data = self.product.read_bitmasks(exprs, window)
+        self.assertEqual(list(data), ["a", "b"])
+        for name, bm_expr in exprs.items():
+            raster = epr.create_bitmask_raster(20, 10)
+            self.product.read_bitmask_raster(bm_expr, 3, 5, raster)
+            npt.assert_array_equal(data[name], raster.data)
+
+        labels = self.product.read_bitmasks(exprs, window, labels=True)
+        npt.assert_array_equal(labels, np.where(data["a"], 1, 2))
+
+
+class TestProductConcurrentReads(unittest.TestCase):
+    BACKEND = "stdio"
+    WINDOW = (100, 200, 300, 400)
+    NTASKS = 16
+
+    def setUp(self):
+        self.product = epr.open(PRODUCT_FILE, backend=self.BACKEND)
+
+    def tearDown(self):
+        self.product.close()
+
+    def test_read_bands(self):
+        xoffset, yoffset, width, height = self.WINDOW
+        names = self.product.get_band_names()
+        ref = self.product.read_bands(names, self.WINDOW)
+
+        def read(index):
+            name = names[index % len(names)]
+            band = self.product.get_band(name)
+            return name, band.read_as_array(width, height, xoffset, yoffset)
+
+        with ThreadPoolExecutor(4) as executor:
+            for name, data in executor.map(read, range(self.NTASKS)):
+                npt.assert_array_equal(data, ref[name])
+
+    def test_read_records(self):
+        dataset = self.product.get_dataset("MDS1")
+        ref = dataset.read_records()
+
+        def read(index):
+            index %= dataset.get_num_records()
+            record = dataset.read_record(index)
+            return index, record.get_field("line_num").get_elem()
+
+        with ThreadPoolExecutor(4) as executor:
+            for index, value in executor.map(read, range(self.NTASKS)):
+                self.assertEqual(value, ref["line_num"][index])
+
+    def test_read_as_array_workers(self):
+        xoffset, yoffset, width, height = self.WINDOW
+        for band in self.product.bands():
+            ref = band.read_as_array(width, height, xoffset, yoffset)
+            for workers in (2, 3, 7):
+                data = band.read_as_array(
+                    width, height, xoffset, yoffset, workers=workers
+                )
+                npt.assert_array_equal(data, ref)
+
+    def test_read_as_array_workers_step(self):
+        band = self.product.get_band("proc_data_1")
+        ref = band.read_as_array(xstep=3, ystep=5)
+        data = band.read_as_array(xstep=3, ystep=5, workers=4)
+        npt.assert_array_equal(data, ref)
+
+    def test_read_raster_workers(self):
+        band = self.product.get_band("proc_data_1")
+        ref = band.read_raster()
+        raster = band.read_raster(workers=4)
+        npt.assert_array_equal(raster.data, ref.data)
+
+    def test_invalid_workers(self):
+        band = self.product.get_band("proc_data_1")
+        self.assertRaises(ValueError, band.read_as_array, workers=0)
+        self.assertRaises(ValueError, band.read_raster, workers=-1)
+
+    def test_read_as_array_workers_read_error(self):
+        dsd = self.product.get_dataset("MDS1").get_dsd()
+        size = dsd.ds_offset + dsd.ds_size // 2
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            filename.write_bytes(PRODUCT_FILE.read_bytes()[:size])
+            with epr.open(filename, backend=self.BACKEND) as product:
+                band = product.get_band("proc_data_1")
+                for _ in range(3):
+                    self.assertRaises(OSError, band.read_as_array, workers=4)
+
+    def test_read_record_read_error(self):
+        dataset = self.product.get_dataset("MDS1")
+        dsd = dataset.get_dsd()
+        size = dsd.ds_offset + dsd.ds_size // 2
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            filename.write_bytes(PRODUCT_FILE.read_bytes()[:size])
+            with epr.open(filename, backend=self.BACKEND) as product:
+                dataset = product.get_dataset("MDS1")
+                index = dataset.get_num_records() - 1
+                self.assertRaises(OSError, dataset.read_record, index)
+                self.assertEqual(dataset.read_record(0).index, 0)
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestProductConcurrentReadsMmap(TestProductConcurrentReads):
+    BACKEND = "mmap"
+
+
+class TestThreadingStress(unittest.TestCase):
+    NTHREADS = 8
+    NITER = 5
+    WINDOW = (50, 100, 200, 300)
+
+    def setUp(self):
+        self.product = epr.open(PRODUCT_FILE)
+
+    def tearDown(self):
+        self.product.close()
+
+    def run_threads(self, func):
+        # all the threads start calling func at the same time
+        barrier = threading.Barrier(self.NTHREADS)
+
+        def target(index):
+            barrier.wait()
+            for count in range(self.NITER):
+                func(index + count)
+
+        with ThreadPoolExecutor(self.NTHREADS) as executor:
+            futures = [
+                executor.submit(target, index)
+                for index in range(self.NTHREADS)
+            ]
+            for future in futures:
+                future.result()
+
+    def test_mixed_reads(self):
+        xoffset, yoffset, width, height = self.WINDOW
+        names = self.product.get_band_names()
+        ref = self.product.read_bands(names, self.WINDOW)
+        dataset = self.product.get_dataset("MDS1")
+        records = dataset.read_records()
+
+        def func(index):
+            name = names[index % len(names)]
+            band = self.product.get_band(name)
+            data = band.read_as_array(
+                width, height, xoffset, yoffset, workers=1 + index % 3
+            )
+            npt.assert_array_equal(data, ref[name])
+
+            index %= dataset.get_num_records()
+            field = dataset.read_record(index).get_field("line_num")
+            self.assertEqual(field.get_elems()[0], records["line_num"][index])
+
+        self.run_threads(func)
+
+    def test_raster_data(self):
+        band = self.product.get_band(self.product.get_band_names()[-1])
+        raster = band.read_raster()
+        ref = raster.data.copy()
+        arrays = []
+
+        def func(_index):
+            data = raster.data
+            arrays.append(data)
+            npt.assert_array_equal(data, ref)
+
+        self.run_threads(func)
+        self.assertEqual(len({id(data) for data in arrays}), 1)
+
+    def test_window_for_bbox(self):
+        grid_lat = self.product.get_band("latitude").read_tie_points()
+        grid_lon = self.product.get_band("longitude").read_tie_points()
+        bbox = (
+            float(np.median(grid_lon.data)) - 0.1,
+            float(np.median(grid_lat.data)) - 0.1,
+            float(np.median(grid_lon.data)) + 0.1,
+            float(np.median(grid_lat.data)) + 0.1,
+        )
+        windows = []
+
+        def func(_index):
+            windows.append(self.product.window_for_bbox(*bbox))
+
+        self.run_threads(func)
+        self.assertEqual(len(set(windows)), 1)
+
+
+class TestNumThreads(unittest.TestCase):
+    def setUp(self):
+        self.nthreads = epr.get_num_threads()
+
+    def tearDown(self):
+        epr.set_num_threads(self.nthreads)
+
+    def test_default(self):
+        self.assertEqual(self.nthreads, 1)
+
+    def test_set_num_threads(self):
+        self.assertEqual(epr.set_num_threads(3), self.nthreads)
+        self.assertEqual(epr.get_num_threads(), 3)
+
+    def test_set_num_threads_none(self):
+        epr.set_num_threads(None)
+        self.assertEqual(epr.get_num_threads(), os.cpu_count() or 1)
+
+    def test_set_num_threads_invalid(self):
+        self.assertRaises(ValueError, epr.set_num_threads, 0)
+
+    def test_read_as_array(self):
+        with epr.open(PRODUCT_FILE) as product:
+            band = product.get_band("proc_data_1")
+            ref = band.read_as_array(500, 300)
+            epr.set_num_threads(4)
+            npt.assert_array_equal(band.read_as_array(500, 300), ref)
+        self.assertEqual(epr.get_num_threads(), 4)
+
+
+class TestRecordInfoCache(unittest.TestCase):
+    DATASET_NAME = "MAIN_PROCESSING_PARAMS_ADS"
+
+    def setUp(self):
+        self.max_unused = epr.set_record_info_cache_size(32)
+        epr.clear_record_info_cache()
+
+    def tearDown(self):
+        epr.set_record_info_cache_size(self.max_unused)
+
+    def read_record(self, product):
+        dataset = product.get_dataset(self.DATASET_NAME)
+        return dataset.read_records(0, 1), dataset.dtype
+
+    def test_stats(self):
+        stats = epr.get_record_info_cache_stats()
+        self.assertEqual(
+            set(stats),
+            {
+                "hits",
+                "misses",
+                "evictions",
+                "entries",
+                "in_use",
+                "record_infos",
+                "max_unused",
+            },
+        )
+        self.assertEqual(stats["max_unused"], 32)
+        self.assertEqual(stats["entries"], stats["in_use"])
+
+    def test_shared(self):
+        with epr.open(PRODUCT_FILE) as product1:
+            data1, dtype1 = self.read_record(product1)
+            stats = epr.get_record_info_cache_stats()
+            with epr.open(PRODUCT_FILE) as product2:
+                data2, dtype2 = self.read_record(product2)
+                new_stats = epr.get_record_info_cache_stats()
+        self.assertEqual(new_stats["hits"], stats["hits"] + 1)
+        self.assertEqual(new_stats["misses"], stats["misses"])
+        self.assertEqual(new_stats["entries"], stats["entries"])
+        self.assertEqual(new_stats["record_infos"], stats["record_infos"])
+        self.assertEqual(dtype1, dtype2)
+        self.assertEqual(data1.tobytes(), data2.tobytes())
+
+    def test_reopen(self):
+        with epr.open(PRODUCT_FILE) as product:
+            ref = self.read_record(product)
+        stats = epr.get_record_info_cache_stats()
+        self.assertGreaterEqual(stats["record_infos"], 1)
+        with epr.open(PRODUCT_FILE, lazy=True) as product:
+            data, dtype = self.read_record(product)
+        new_stats = epr.get_record_info_cache_stats()
+        self.assertEqual(new_stats["hits"], stats["hits"] + 1)
+        self.assertEqual(new_stats["record_infos"], stats["record_infos"])
+        self.assertEqual(dtype, ref[1])
+        self.assertEqual(data.tobytes(), ref[0].tobytes())
+
+    def test_clear(self):
+        with epr.open(PRODUCT_FILE) as product:
+            self.read_record(product)
+            self.assertEqual(epr.clear_record_info_cache(), 0)
+        self.assertGreaterEqual(epr.clear_record_info_cache(), 1)
+        stats = epr.get_record_info_cache_stats()
+        self.assertEqual(stats["entries"], stats["in_use"])
+
+    def test_set_record_info_cache_size(self):
+        self.assertEqual(epr.set_record_info_cache_size(0), 32)
+        stats = epr.get_record_info_cache_stats()
+        self.assertEqual(stats["max_unused"], 0)
+        with epr.open(PRODUCT_FILE) as product:
+            self.read_record(product)
+        new_stats = epr.get_record_info_cache_stats()
+        self.assertEqual(new_stats["evictions"], stats["evictions"] + 1)
+        self.assertEqual(new_stats["entries"], new_stats["in_use"])
+
+    def test_close_order(self):
+        # record infos moved into the cache when a product is closed
+        # are still used by the other open products
+        epr.set_record_info_cache_size(0)
+        with epr.open(PRODUCT_FILE) as product:
+            names = product.get_dataset_names()
+            ref = {
+                name: product.get_dataset(name).read_records(0, 1).tobytes()
+                for name in names
+            }
+
+        for order in itertools.permutations(range(3)):
+            with self.subTest(order=order):
+                products = [epr.open(PRODUCT_FILE) for _ in range(3)]
+                # each product builds the record infos of some datasets
+                for index, product in enumerate(products):
+                    for name in names[index::3]:
+                        product.get_dataset(name).read_records(0, 1)
+                for index in order:
+                    products[index].close()
+                    for product in products:
+                        if product.closed:
+                            continue
+                        for name in names:
+                            dataset = product.get_dataset(name)
+                            data = dataset.read_records(0, 1)
+                            self.assertEqual(data.tobytes(), ref[name])
+                stats = epr.get_record_info_cache_stats()
+                self.assertEqual(stats["entries"], stats["in_use"])
+
+    def test_set_record_info_cache_size_invalid(self):
+        self.assertRaises(ValueError, epr.set_record_info_cache_size, -1)
+
+
+class TestProductPool(unittest.TestCase):
+    def setUp(self):
+        self.file_size = PRODUCT_FILE.stat().st_size
+        self.pool = epr.ProductPool()
+        self.addCleanup(self.pool.close)
+
+    def test_open(self):
+        product = self.pool.open(PRODUCT_FILE)
+        self.assertIsInstance(product, epr.Product)
+        self.assertEqual(product.id_string, TestProduct.ID_STRING)
+        self.assertIs(self.pool.open(str(PRODUCT_FILE)), product)
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["open"], 1)
+        self.assertEqual(stats["bytes"], self.file_size)
+        self.assertEqual(len(self.pool), 1)
+
+    @unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+    def test_open_mode_and_backend(self):
+        product = self.pool.open(PRODUCT_FILE)
+        mmap_product = self.pool.open(PRODUCT_FILE, backend="mmap")
+        rw_product = self.pool.open(PRODUCT_FILE, "rb+")
+        self.assertIsNot(mmap_product, product)
+        self.assertIsNot(rw_product, product)
+        self.assertEqual(mmap_product.backend, "mmap")
+        self.assertEqual(rw_product.mode, "rb+")
+        self.assertEqual(len(self.pool), 3)
+
+    @unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+    def test_max_open(self):
+        pool = epr.ProductPool(max_open=2)
+        self.addCleanup(pool.close)
+        product = pool.open(PRODUCT_FILE)
+        mmap_product = pool.open(PRODUCT_FILE, backend="mmap")
+        self.assertIs(pool.open(PRODUCT_FILE), product)
+        rw_product = pool.open(PRODUCT_FILE, "rb+")
+        self.assertTrue(mmap_product.closed)
+        self.assertFalse(product.closed)
+        self.assertFalse(rw_product.closed)
+        stats = pool.get_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["open"], 2)
+
+    @unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+    def test_max_bytes(self):
+        pool = epr.ProductPool(max_bytes=self.file_size)
+        self.addCleanup(pool.close)
+        self.assertEqual(pool.max_bytes, self.file_size)
+        product = pool.open(PRODUCT_FILE)
+        mmap_product = pool.open(PRODUCT_FILE, backend="mmap")
+        self.assertTrue(product.closed)
+        self.assertFalse(mmap_product.closed)
+        stats = pool.get_stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["bytes"], self.file_size)
+
+    def test_max_open_limit(self):
+        pool = epr.ProductPool(max_open=sys.maxsize)
+        self.assertLess(pool.max_open, sys.maxsize)
+        self.assertEqual(pool.max_open, self.pool.max_open)
+        self.assertIsNone(pool.max_bytes)
+
+    def test_invalid_limits(self):
+        self.assertRaises(ValueError, epr.ProductPool, max_open=0)
+        self.assertRaises(ValueError, epr.ProductPool, max_bytes=-1)
+
+    def test_modified_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = pathlib.Path(tmpdir) / PRODUCT_FILE.name
+            shutil.copyfile(PRODUCT_FILE, filename)
+            product = self.pool.open(filename)
+            mtime_ns = filename.stat().st_mtime_ns + 10**9
+            os.utime(filename, ns=(mtime_ns, mtime_ns))
+            new_product = self.pool.open(filename)
+            self.assertIsNot(new_product, product)
+            self.assertTrue(product.closed)
+            self.assertEqual(self.pool.get_stats()["invalidations"], 1)
+            self.pool.close()
+
+    def test_closed_product(self):
+        product = self.pool.open(PRODUCT_FILE)
+        product.close()
+        new_product = self.pool.open(PRODUCT_FILE)
+        self.assertIsNot(new_product, product)
+        self.assertFalse(new_product.closed)
+        self.assertEqual(self.pool.get_stats()["invalidations"], 1)
+
+    def test_file_not_found(self):
+        self.assertRaises(FileNotFoundError, self.pool.open, "missing.N1")
+
+    def test_clear(self):
+        product = self.pool.open(PRODUCT_FILE)
+        self.assertEqual(self.pool.clear(), 1)
+        self.assertTrue(product.closed)
+        self.assertEqual(len(self.pool), 0)
+        self.assertEqual(self.pool.get_stats()["bytes"], 0)
+
+    def test_context_manager(self):
+        with epr.ProductPool() as pool:
+            product = pool.open(PRODUCT_FILE)
+        self.assertTrue(product.closed)
+
+    def test_checkout(self):
+        with self.pool.checkout(PRODUCT_FILE) as product:
+            self.assertIsInstance(product, epr.Product)
+            self.assertIs(self.pool.open(PRODUCT_FILE), product)
+            self.assertEqual(self.pool.get_stats()["leased"], 1)
+        self.assertFalse(product.closed)
+        self.assertEqual(self.pool.get_stats()["leased"], 0)
+
+    def test_checkout_evicted(self):
+        pool = epr.ProductPool(max_open=1)
+        self.addCleanup(pool.close)
+        with pool.checkout(PRODUCT_FILE) as product:
+            with pool.checkout(PRODUCT_FILE):
+                other = pool.open(PRODUCT_FILE, "rb+")
+                self.assertEqual(pool.get_stats()["evictions"], 1)
+            self.assertFalse(product.closed)
+            band = product.get_band("proc_data_1")
+            self.assertEqual(band.read_as_array(10, 10).shape, (10, 10))
+            self.assertEqual(pool.get_stats()["leased"], 1)
+        self.assertTrue(product.closed)
+        self.assertFalse(other.closed)
+        self.assertEqual(pool.get_stats()["leased"], 0)
+
+    def test_checkout_clear(self):
+        with self.pool.checkout(PRODUCT_FILE) as product:
+            self.assertEqual(self.pool.clear(), 1)
+            self.assertFalse(product.closed)
+            self.assertEqual(len(self.pool), 0)
+        self.assertTrue(product.closed)
+
+    def test_checkout_reentered(self):
+        lease = self.pool.checkout(PRODUCT_FILE)
+        with lease:
+            self.assertRaises(RuntimeError, lease.__enter__)
+
+    def test_threads(self):
+        with ThreadPoolExecutor(4) as executor:
+            products = list(
+                executor.map(lambda _: self.pool.open(PRODUCT_FILE), range(16))
+            )
+        self.assertEqual(len({id(product) for product in products}), 1)
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["hits"] + stats["misses"], 16)
+        self.assertEqual(stats["open"], 1)
+
+
 class TestProductLowLevelAPI(unittest.TestCase):
     def setUp(self):
         self.product = epr.Product(PRODUCT_FILE)
@@ -581,6 +1880,22 @@ class TestClosedProduct(unittest.TestCase):  # noqa: PLR0904
     def test_get_num_bands(self):
         self.assertRaises(ValueError, self.product.get_num_bands)
 
+    def test_read_bands(self):
+        self.assertRaises(ValueError, self.product.read_bands, ["proc_data_1"])
+
+    def test_window_for_bbox(self):
+        self.assertRaises(
+            ValueError, self.product.window_for_bbox, 12, 44, 13, 45
+        )
+
+    def test_read_complex_band(self):
+        self.assertRaises(
+            ValueError,
+            self.product.read_complex_band,
+            "proc_data_1",
+            "proc_data_2",
+        )
+
     def test_get_mph(self):
         self.assertRaises(ValueError, self.product.get_mph)
 
@@ -619,6 +1934,16 @@ class TestClosedProduct(unittest.TestCase):  # noqa: PLR0904
             raster,
         )
 
+    def test_compile_bitmask(self):
+        self.assertRaises(
+            ValueError, epr.compile_bitmask, self.product, "l2_flags.LAND"
+        )
+
+    def test_read_bitmasks(self):
+        self.assertRaises(
+            ValueError, self.product.read_bitmasks, {"land": "l2_flags.LAND"}
+        )
+
     def test_get_dataset_names(self):
         self.assertRaises(ValueError, self.product.get_dataset_names)
 
@@ -687,31 +2012,263 @@ class TestDataset(unittest.TestCase):
         record = self.dataset.read_record(self.RECORD_INDEX)
         self.assertEqual(record.index, self.RECORD_INDEX)
 
-    def test_read_record_passed(self):
-        created_record = self.dataset.create_record()
-        read_record = self.dataset.read_record(
-            self.RECORD_INDEX, created_record
+    def test_read_record_passed(self):
+        created_record = self.dataset.create_record()
+        read_record = self.dataset.read_record(
+            self.RECORD_INDEX, created_record
+        )
+        self.assertTrue(created_record is read_record)
+
+    def test_read_record_passed_index(self):
+        created_record = self.dataset.create_record()
+        self.assertEqual(created_record.index, None)
+        read_record = self.dataset.read_record(
+            self.RECORD_INDEX, created_record
+        )
+        self.assertEqual(read_record.index, self.RECORD_INDEX)
+
+    def test_read_record_passed_invalid(self):
+        self.assertRaises(TypeError, self.dataset.read_record, 0, 0)
+
+    def test_dtype(self):
+        dtype = self.dataset.dtype
+        self.assertIsInstance(dtype, np.dtype)
+        record = self.dataset.read_record(self.RECORD_INDEX)
+        self.assertEqual(dtype.itemsize, record.tot_size)
+        self.assertEqual(list(dtype.names), record.get_field_names())
+        for name in dtype.names:
+            self.assertIn(dtype[name].base.byteorder, {">", "|"})
+
+    def test_dtype_cache(self):
+        record = self.dataset.create_record()
+        self.assertIs(self.dataset.dtype, self.dataset.dtype)
+        self.assertIs(record.dtype, self.dataset.dtype)
+
+
+class TestDatasetRW(TestDataset):
+    OPEN_MODE = "rb+"
+
+
+class TestDatasetHighLevelAPI(unittest.TestCase):
+    DATASET_NAME = TestDataset.DATASET_NAME
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE)
+        self.dataset = self.product.get_dataset(self.DATASET_NAME)
+
+    def tearDown(self):
+        self.product.close()
+
+    def test_records(self):
+        records = self.dataset.records()
+        self.assertTrue(records)
+        self.assertEqual(len(records), self.dataset.get_num_records())
+        for index, record in enumerate(records):
+            ref_record = self.dataset.read_record(index)
+            self.assertEqual(
+                record.get_field_names(), ref_record.get_field_names()
+            )
+
+    def test_iter(self):
+        for index, record in enumerate(self.dataset):
+            ref_record = self.dataset.read_record(index)
+            self.assertEqual(
+                record.get_field_names(), ref_record.get_field_names()
+            )
+        self.assertEqual(index + 1, self.dataset.get_num_records())
+
+    def test_repr(self):
+        pattern = (
+            r"epr\.Dataset\((?P<q>['\"])(?P<name>\w+)(?P=q)\) "
+            r"(?P<num>\d+) records"
+        )
+        mobj = re.match(pattern, repr(self.dataset))
+        self.assertNotEqual(mobj, None)
+        self.assertEqual(mobj.group("name"), self.dataset.get_name())
+        self.assertEqual(
+            mobj.group("num"), str(self.dataset.get_num_records())
+        )
+
+    def test_repr_type(self):
+        self.assertTrue(isinstance(repr(self.dataset), str))
+
+    def test_str(self):
+        lines = [repr(self.dataset), ""]
+        lines.extend(map(str, self.dataset))
+        data = "\n".join(lines)
+        self.assertEqual(data, str(self.dataset))
+
+    def test_str_type(self):
+        self.assertTrue(isinstance(str(self.dataset), str))
+
+
+class TestDatasetReadRecords(unittest.TestCase):
+    DATASET_NAME = "GEOLOCATION_GRID_ADS"
+    BACKEND = "stdio"
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE, "rb", self.BACKEND)
+        self.dataset = self.product.get_dataset(self.DATASET_NAME)
+
+    def tearDown(self):
+        self.product.close()
+
+    def assert_record_equal(self, data, record):
+        for name in data.dtype.names:
+            field = record.get_field(name)
+            self.assertTrue(
+                np.array_equal(np.ravel(data[name]), field.get_elems()), name
+            )
+
+    def test_read_records(self):
+        data = self.dataset.read_records()
+        self.assertIsInstance(data, np.ndarray)
+        self.assertEqual(data.shape, (self.dataset.get_num_records(),))
+        for index, record in enumerate(self.dataset):
+            self.assert_record_equal(data[index], record)
+
+    def test_read_records_dtype(self):
+        data = self.dataset.read_records()
+        record = self.dataset.read_record()
+        self.assertEqual(data.dtype.itemsize, record.tot_size)
+        for name in data.dtype.names:
+            self.assertTrue(data.dtype[name].base.isnative)
+        self.assertEqual(data.dtype["first_zero_doppler_time"], epr.MJD)
+        self.assertNotIn("spare_1", data.dtype.names)
+
+    def test_read_records_range(self):
+        data = self.dataset.read_records(2, 5)
+        self.assertEqual(data.shape, (3,))
+        for index, item in enumerate(data, 2):
+            self.assert_record_equal(item, self.dataset.read_record(index))
+
+    def test_read_records_negative_range(self):
+        num_records = self.dataset.get_num_records()
+        data = self.dataset.read_records(-3)
+        self.assertEqual(data.shape, (3,))
+        self.assert_record_equal(
+            data[-1], self.dataset.read_record(num_records - 1)
+        )
+
+    def test_read_records_empty_range(self):
+        data = self.dataset.read_records(5, 2)
+        self.assertEqual(data.shape, (0,))
+
+    def test_read_records_indices(self):
+        indices = [4, 5, 6, 0, 10, 10, -1]
+        num_records = self.dataset.get_num_records()
+        data = self.dataset.read_records(indices=indices)
+        self.assertEqual(data.shape, (len(indices),))
+        for item, index in zip(data, indices, strict=True):
+            record = self.dataset.read_record(index % num_records)
+            self.assert_record_equal(item, record)
+
+    def test_read_records_invalid_index(self):
+        num_records = self.dataset.get_num_records()
+        self.assertRaises(
+            ValueError, self.dataset.read_records, indices=[0, num_records]
+        )
+
+    def test_read_records_indices_and_range(self):
+        self.assertRaises(
+            ValueError, self.dataset.read_records, 1, 3, indices=[0]
+        )
+
+    def test_dtype_file_layout(self):
+        num_records = self.dataset.get_num_records()
+        raw_data = np.fromfile(
+            PRODUCT_FILE,
+            dtype=self.dataset.dtype,
+            count=num_records,
+            offset=self.dataset.get_dsd().ds_offset,
+        )
+        data = self.dataset.read_records()
+        self.assertEqual(raw_data.dtype.names, data.dtype.names)
+        for name in data.dtype.names:
+            npt.assert_array_equal(raw_data[name], data[name])
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestDatasetReadRecordsMmap(TestDatasetReadRecords):
+    BACKEND = "mmap"
+
+
+class TestDatasetReadField(unittest.TestCase):
+    DATASET_NAME = "MDS1"
+    BACKEND = "stdio"
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE, "rb", self.BACKEND)
+        self.dataset = self.product.get_dataset(self.DATASET_NAME)
+
+    def tearDown(self):
+        self.product.close()
+
+    def get_field_data(self, name, indices):
+        return np.asarray([
+            self.dataset.read_record(index).get_field(name).get_elems()
+            for index in indices
+        ])
+
+    def test_read_field(self):
+        data = self.dataset.read_field("line_num")
+        self.assertEqual(data.shape, (self.dataset.get_num_records(),))
+        self.assertTrue(data.dtype.isnative)
+        indices = range(0, self.dataset.get_num_records(), 500)
+        npt.assert_array_equal(
+            data[::500], self.get_field_data("line_num", indices).ravel()
+        )
+
+    def test_read_field_2d(self):
+        data = self.dataset.read_field("proc_data", 10, 20)
+        self.assertEqual(data.shape, (10, 1452))
+        self.assertEqual(data.dtype, np.uint16)
+        npt.assert_array_equal(
+            data, self.get_field_data("proc_data", range(10, 20))
+        )
+
+    def test_read_field_time(self):
+        data = self.dataset.read_field("zero_doppler_time", 0, 3)
+        self.assertEqual(data.dtype, epr.MJD)
+        npt.assert_array_equal(
+            data, self.get_field_data("zero_doppler_time", range(3)).ravel()
         )
-        self.assertTrue(created_record is read_record)
 
-    def test_read_record_passed_index(self):
-        created_record = self.dataset.create_record()
-        self.assertEqual(created_record.index, None)
-        read_record = self.dataset.read_record(
-            self.RECORD_INDEX, created_record
+    def test_read_field_step(self):
+        data = self.dataset.read_field("proc_data", 5, 30, 7)
+        npt.assert_array_equal(
+            data, self.get_field_data("proc_data", range(5, 30, 7))
         )
-        self.assertEqual(read_record.index, self.RECORD_INDEX)
 
-    def test_read_record_passed_invalid(self):
-        self.assertRaises(TypeError, self.dataset.read_record, 0, 0)
+    def test_read_field_negative_step(self):
+        data = self.dataset.read_field("line_num", -1, -6, -2)
+        npt.assert_array_equal(
+            data, self.dataset.read_field("line_num")[-1:-6:-2]
+        )
 
+    def test_read_field_empty(self):
+        data = self.dataset.read_field("proc_data", 5, 2)
+        self.assertEqual(data.shape, (0, 1452))
 
-class TestDatasetRW(TestDataset):
-    OPEN_MODE = "rb+"
+    def test_read_field_consistency(self):
+        records = self.dataset.read_records(100, 200)
+        for name in records.dtype.names:
+            data = self.dataset.read_field(name, 100, 200)
+            npt.assert_array_equal(data, records[name])
 
+    def test_read_field_invalid_name(self):
+        self.assertRaises(
+            epr.EPRValueError, self.dataset.read_field, "invalid_name"
+        )
 
-class TestDatasetHighLevelAPI(unittest.TestCase):
-    DATASET_NAME = TestDataset.DATASET_NAME
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestDatasetReadFieldMmap(TestDatasetReadField):
+    BACKEND = "mmap"
+
+
+class TestDatasetAsMemmap(unittest.TestCase):
+    DATASET_NAME = "GEOLOCATION_GRID_ADS"
 
     def setUp(self):
         self.product = epr.Product(PRODUCT_FILE)
@@ -720,47 +2277,56 @@ class TestDatasetHighLevelAPI(unittest.TestCase):
     def tearDown(self):
         self.product.close()
 
-    def test_records(self):
-        records = self.dataset.records()
-        self.assertTrue(records)
-        self.assertEqual(len(records), self.dataset.get_num_records())
-        for index, record in enumerate(records):
-            ref_record = self.dataset.read_record(index)
-            self.assertEqual(
-                record.get_field_names(), ref_record.get_field_names()
-            )
+    def test_as_memmap(self):
+        data = self.dataset.as_memmap()
+        self.assertIsInstance(data, np.memmap)
+        self.assertEqual(data.shape, (self.dataset.get_num_records(),))
+        self.assertEqual(data.dtype, self.dataset.dtype)
+        self.assertFalse(data.flags.writeable)
 
-    def test_iter(self):
-        for index, record in enumerate(self.dataset):
-            ref_record = self.dataset.read_record(index)
-            self.assertEqual(
-                record.get_field_names(), ref_record.get_field_names()
-            )
-        self.assertEqual(index + 1, self.dataset.get_num_records())
+    def test_as_memmap_data(self):
+        data = self.dataset.as_memmap()
+        records = self.dataset.read_records()
+        for name in records.dtype.names:
+            self.assertTrue(np.array_equal(data[name], records[name]), name)
 
-    def test_repr(self):
-        pattern = (
-            r"epr\.Dataset\((?P<q>['\"])(?P<name>\w+)(?P=q)\) "
-            r"(?P<num>\d+) records"
-        )
-        mobj = re.match(pattern, repr(self.dataset))
-        self.assertNotEqual(mobj, None)
-        self.assertEqual(mobj.group("name"), self.dataset.get_name())
-        self.assertEqual(
-            mobj.group("num"), str(self.dataset.get_num_records())
-        )
+    def test_as_memmap_writable_on_read_only_product(self):
+        self.assertRaises(TypeError, self.dataset.as_memmap, writable=True)
 
-    def test_repr_type(self):
-        self.assertTrue(isinstance(repr(self.dataset), str))
 
-    def test_str(self):
-        lines = [repr(self.dataset), ""]
-        lines.extend(map(str, self.dataset))
-        data = "\n".join(lines)
-        self.assertEqual(data, str(self.dataset))
+class TestDatasetAsMemmapWrite(unittest.TestCase):
+    DATASET_NAME = "MDS1"
+    FIELD_NAME = "proc_data"
 
-    def test_str_type(self):
-        self.assertTrue(isinstance(str(self.dataset), str))
+    def setUp(self):
+        self.filename = PRODUCT_FILE.with_name(PRODUCT_FILE.name + "_")
+        shutil.copy(PRODUCT_FILE, self.filename)
+
+    def tearDown(self):
+        self.filename.unlink()
+
+    def _read_field_data(self, filename):
+        with epr.open(filename) as product:
+            dataset = product.get_dataset(self.DATASET_NAME)
+            return [
+                record.get_field(self.FIELD_NAME).get_elems()
+                for record in dataset
+            ]
+
+    def test_as_memmap_writable(self):
+        with epr.open(self.filename, "rb+") as product:
+            dataset = product.get_dataset(self.DATASET_NAME)
+            data = dataset.as_memmap(writable=True)
+            self.assertTrue(data.flags.writeable)
+            data[self.FIELD_NAME][3:5] += 10
+            data.flush()
+            del data
+
+        expected = self._read_field_data(PRODUCT_FILE)
+        for index in (3, 4):
+            expected[index] += 10
+        data = self._read_field_data(self.filename)
+        npt.assert_array_equal(data, expected)
 
 
 class TestDatasetOnClosedProduct(unittest.TestCase):
@@ -793,6 +2359,18 @@ class TestDatasetOnClosedProduct(unittest.TestCase):
     def test_create_record(self):
         self.assertRaises(ValueError, self.dataset.create_record)
 
+    def test_dtype(self):
+        self.assertRaises(ValueError, getattr, self.dataset, "dtype")
+
+    def test_read_records(self):
+        self.assertRaises(ValueError, self.dataset.read_records)
+
+    def test_as_memmap(self):
+        self.assertRaises(ValueError, self.dataset.as_memmap)
+
+    def test_read_field(self):
+        self.assertRaises(ValueError, self.dataset.read_field, "line_num")
+
     def test_read_record(self):
         self.assertRaises(ValueError, self.dataset.read_record, 0)
 
@@ -814,6 +2392,7 @@ class TestDatasetOnClosedProduct(unittest.TestCase):
 
 class TestBand(unittest.TestCase):  # noqa: PLR0904
     OPEN_MODE = "rb+"
+    BACKEND = "stdio"
     DATASET_NAME = "MDS1"
     BAND_NAMES = (
         "slant_range_time",
@@ -834,6 +2413,7 @@ class TestBand(unittest.TestCase):  # noqa: PLR0904
     UNIT: str | None = None
     RTOL = 1e-7
     DATA_TYPE = np.float32
+    RAW_DATA_TYPE: np.typing.DTypeLike | None = np.uint16
     # fmt: off
     TEST_DATA: np.typing.NDArray = np.asarray([
         [228., 213., 235., 256., 239., 260., 210., 197., 233., 213.],
@@ -850,7 +2430,7 @@ class TestBand(unittest.TestCase):  # noqa: PLR0904
     # fmt: on
 
     def setUp(self):
-        self.product = epr.Product(PRODUCT_FILE, self.OPEN_MODE)
+        self.product = epr.Product(PRODUCT_FILE, self.OPEN_MODE, self.BACKEND)
         self.band = self.product.get_band(self.BAND_NAME)
 
     def tearDown(self):
@@ -881,6 +2461,12 @@ class TestBand(unittest.TestCase):  # noqa: PLR0904
     def test_bm_expr_property(self):
         self.assertEqual(self.band.bm_expr, None)
 
+    def test_flag_coding_property(self):
+        self.assertIsNone(self.band.flag_coding)
+
+    def test_read_flags_not_a_flag_band(self):
+        self.assertRaises(ValueError, self.band.read_flags)
+
     def test_unit_property(self):
         self.assertEqual(self.band.unit, self.UNIT)
 
@@ -1146,6 +2732,223 @@ class TestBand(unittest.TestCase):  # noqa: PLR0904
             box,
         )
 
+    def test_read_as_array_out(self):
+        ref = self.band.read_as_array(
+            self.WIDTH, self.HEIGHT, self.XOFFSET, self.YOFFSET
+        )
+        out = np.zeros((self.HEIGHT, self.WIDTH), self.DATA_TYPE)
+        data = self.band.read_as_array(
+            self.WIDTH, self.HEIGHT, self.XOFFSET, self.YOFFSET, out=out
+        )
+        self.assertIs(data, out)
+        npt.assert_array_equal(out, ref)
+
+    def test_read_as_array_out_with_step(self):
+        ref = self.band.read_as_array(
+            self.WIDTH, self.HEIGHT, self.XOFFSET, self.YOFFSET, 3, 2
+        )
+        cube = np.zeros((3, *ref.shape), self.DATA_TYPE)
+        self.band.read_as_array(
+            self.WIDTH,
+            self.HEIGHT,
+            self.XOFFSET,
+            self.YOFFSET,
+            3,
+            2,
+            out=cube[1],
+        )
+        npt.assert_array_equal(cube[1], ref)
+        self.assertFalse(cube[0].any())
+        self.assertFalse(cube[2].any())
+
+    def test_read_as_array_out_invalid_shape(self):
+        out = np.zeros((self.HEIGHT, self.WIDTH + 1), self.DATA_TYPE)
+        self.assertRaises(
+            ValueError,
+            self.band.read_as_array,
+            self.WIDTH,
+            self.HEIGHT,
+            out=out,
+        )
+
+    def test_read_as_array_out_invalid_dtype(self):
+        out = np.zeros((self.HEIGHT, self.WIDTH), np.complex128)
+        self.assertRaises(
+            ValueError,
+            self.band.read_as_array,
+            self.WIDTH,
+            self.HEIGHT,
+            out=out,
+        )
+
+    def test_read_as_array_out_not_contiguous(self):
+        out = np.zeros((self.HEIGHT, 2 * self.WIDTH), self.DATA_TYPE)
+        self.assertRaises(
+            (ValueError, BufferError),
+            self.band.read_as_array,
+            self.WIDTH,
+            self.HEIGHT,
+            out=out[:, ::2],
+        )
+
+    def test_read_as_array_raw(self):
+        if self.RAW_DATA_TYPE is None:
+            self.assertRaises(
+                ValueError,
+                self.band.read_as_array,
+                self.WIDTH,
+                self.HEIGHT,
+                scaled=False,
+            )
+            return
+
+        args = (self.WIDTH, self.HEIGHT, self.XOFFSET, self.YOFFSET, 3, 2)
+        raw = self.band.read_as_array(*args, scaled=False)
+        data = self.band.read_as_array(*args)
+        self.assertEqual(raw.dtype, self.RAW_DATA_TYPE)
+        self.assertEqual(raw.shape, data.shape)
+        npt.assert_array_equal(self.band.apply_scaling(raw), data)
+
+    def test_read_as_array_raw_out(self):
+        if self.RAW_DATA_TYPE is None:
+            return
+
+        out = np.zeros((self.HEIGHT, self.WIDTH), self.RAW_DATA_TYPE)
+        data = self.band.read_as_array(
+            self.WIDTH, self.HEIGHT, out=out, scaled=False
+        )
+        self.assertIs(data, out)
+        npt.assert_array_equal(
+            out,
+            self.band.read_as_array(self.WIDTH, self.HEIGHT, scaled=False),
+        )
+
+        out = np.zeros((self.HEIGHT, self.WIDTH), np.float64)
+        self.assertRaises(
+            ValueError,
+            self.band.read_as_array,
+            self.WIDTH,
+            self.HEIGHT,
+            out=out,
+            scaled=False,
+        )
+
+    def test_read_as_array_masked_without_mask(self):
+        ref = self.band.read_as_array(self.WIDTH, self.HEIGHT)
+        data = self.band.read_as_array(self.WIDTH, self.HEIGHT, masked=True)
+        self.assertIsInstance(data, np.ma.MaskedArray)
+        self.assertFalse(np.ma.is_masked(data))
+        npt.assert_array_equal(data.data, ref)
+
+    def test_read_as_array_invalid_mask(self):
+        with self.assertRaises(epr.EPRError) as cm:
+            self.band.read_as_array(
+                self.WIDTH, self.HEIGHT, mask="l5_flags.LAND"
+            )
+        self.assertEqual(cm.exception.code, 301)
+
+    @unittest.skipIf(TEST_PRODUCT_BM_EXPR is None, "no flag band available")
+    def test_read_as_array_mask(self):
+        args = (self.WIDTH, self.HEIGHT, self.XOFFSET, self.YOFFSET)
+        ref = self.band.read_as_array(*args)
+        raster = epr.create_bitmask_raster(self.WIDTH, self.HEIGHT)
+        self.product.read_bitmask_raster(
+            TEST_PRODUCT_BM_EXPR, self.XOFFSET, self.YOFFSET, raster
+        )
+        valid = raster.data.astype(bool)
+
+        data = self.band.read_as_array(
+            *args, mask=TEST_PRODUCT_BM_EXPR, fill_value=-1
+        )
+        npt.assert_array_equal(data[valid], ref[valid])
+        self.assertTrue((data[~valid] == -1).all())
+
+        data = self.band.read_as_array(
+            *args, mask=TEST_PRODUCT_BM_EXPR, masked=True
+        )
+        self.assertIsInstance(data, np.ma.MaskedArray)
+        npt.assert_array_equal(data.mask, ~valid)
+        npt.assert_array_equal(data.data, ref)
+
+    def test_apply_scaling(self):
+        raw = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        data = self.band.apply_scaling(raw)
+        self.assertEqual(data.dtype, np.float32)
+        npt.assert_allclose(
+            data, self.SCALING_OFFSET + self.SCALING_FACTOR * raw
+        )
+
+    def test_apply_scaling_dtype(self):
+        raw = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        data = self.band.apply_scaling(raw, dtype=np.float64)
+        self.assertEqual(data.dtype, np.float64)
+        self.assertRaises(
+            ValueError, self.band.apply_scaling, raw, dtype=np.int32
+        )
+
+    def test_apply_scaling_out(self):
+        raw = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        out = np.zeros(raw.shape, np.float64)
+        data = self.band.apply_scaling(raw, out=out)
+        self.assertIs(data, out)
+        npt.assert_allclose(out, self.band.apply_scaling(raw))
+        self.assertRaises(
+            ValueError, self.band.apply_scaling, raw, out=out[:2]
+        )
+
+    def test_create_compatible_raster_with_buffer(self):
+        buf = bytearray(self.HEIGHT * self.WIDTH * 8)
+        raster = self.band.create_compatible_raster(
+            self.WIDTH, self.HEIGHT, buffer=buf
+        )
+        self.band.read_raster(self.XOFFSET, self.YOFFSET, raster)
+        data = np.frombuffer(buf, raster.data.dtype)[: raster.data.size]
+        npt.assert_array_equal(data.reshape(raster.data.shape), raster.data)
+
+    def test_iter_blocks(self):
+        data = self.band.read_as_array()
+        blocks = []
+        for window, block in self.band.iter_blocks():
+            xoffset, yoffset, width, height = window
+            self.assertEqual(xoffset, 0)
+            self.assertEqual(width, data.shape[1])
+            self.assertEqual(block.shape, (height, width))
+            self.assertLessEqual(height, 512)
+            npt.assert_array_equal(block, data[yoffset : yoffset + height])
+            blocks.append(block.copy())
+        npt.assert_array_equal(np.concatenate(blocks), data)
+
+    def test_iter_blocks_with_step_and_halo(self):
+        xstep, ystep, halo = 3, 2, 4
+        data = self.band.read_as_array(xstep=xstep, ystep=ystep)
+        count = np.zeros(data.shape, dtype=int)
+        for window, block in self.band.iter_blocks(
+            (100, 150), xstep, ystep, halo
+        ):
+            xoffset, yoffset, width, height = window
+            self.assertLessEqual(block.shape[0], 100 + 2 * halo)
+            self.assertLessEqual(block.shape[1], 150 + 2 * halo)
+            npt.assert_array_equal(
+                block,
+                self.band.read_as_array(
+                    width, height, xoffset, yoffset, xstep, ystep
+                ),
+            )
+            rows = slice(yoffset // ystep, yoffset // ystep + block.shape[0])
+            cols = slice(xoffset // xstep, xoffset // xstep + block.shape[1])
+            count[rows, cols] += 1
+        self.assertTrue(np.all(count >= 1))
+        self.assertTrue(np.any(count > 1))
+
+    def test_iter_blocks_buffer_reuse(self):
+        blocks = self.band.iter_blocks((100, 100))
+        _, block1 = next(blocks)
+        _, block2 = next(blocks)
+        self.assertTrue(np.shares_memory(block1, block2))
+
+    def test_iter_blocks_invalid_block_shape(self):
+        self.assertRaises(ValueError, self.band.iter_blocks, (0, None))
+
     def test_read_as_array_default(self):
         data = self.band.read_as_array()
 
@@ -1299,6 +3102,12 @@ class TestBandRW(TestBand):
     OPEN_MODE = "rb+"
 
 
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestBandMmap(TestBand):
+    OPEN_MODE = "rb"
+    BACKEND = "mmap"
+
+
 class TestAnnotationBand(TestBand):
     DATASET_NAME = "GEOLOCATION_GRID_ADS"
     BAND_NAME = "incident_angle"
@@ -1307,6 +3116,7 @@ class TestAnnotationBand(TestBand):
     SCALING_OFFSET = 0.0
     UNIT = "deg"
     RTOL = 1e-7
+    RAW_DATA_TYPE = None
     # fmt: off
     TEST_DATA: np.typing.NDArray = np.asarray([
         [21.86950111, 21.86438370, 21.85926437, 21.85414696, 21.84902954,
@@ -1376,6 +3186,71 @@ class TestBandHighLevelAPI(unittest.TestCase):
         self.assertTrue(isinstance(str(band), str))
 
 
+class TestBandTiePoints(unittest.TestCase):
+    BAND_NAMES = (
+        "slant_range_time",
+        "incident_angle",
+        "latitude",
+        "longitude",
+    )
+
+    def setUp(self):
+        self.product = epr.Product(PRODUCT_FILE)
+
+    def tearDown(self):
+        self.product.close()
+
+    def test_read_tie_points(self):
+        for name in self.BAND_NAMES:
+            with self.subTest(name=name):
+                band = self.product.get_band(name)
+                grid = band.read_tie_points()
+                self.assertIsInstance(grid, epr.TiePointGrid)
+                self.assertEqual(grid.data.dtype, np.float32)
+                self.assertEqual(
+                    grid.data.shape, (len(grid.lines), len(grid.pixels))
+                )
+                self.assertTrue(np.all(np.diff(grid.lines) > 0))
+                self.assertTrue(np.all(np.diff(grid.pixels) > 0))
+                self.assertFalse(grid.data.flags.writeable)
+
+    def test_read_tie_points_cache(self):
+        band = self.product.get_band("latitude")
+        grid = band.read_tie_points()
+        self.assertIs(
+            self.product.get_band("latitude").read_tie_points(), grid
+        )
+
+    def test_read_tie_points_measurement_band(self):
+        band = self.product.get_band("proc_data_1")
+        self.assertRaises(ValueError, band.read_tie_points)
+        self.assertRaises(ValueError, band.interpolate, [0], [0])
+
+    def test_interpolate(self):
+        lines = np.arange(0, self.product.get_scene_height(), 7)
+        pixels = np.arange(0, self.product.get_scene_width(), 5)
+        for name in self.BAND_NAMES:
+            with self.subTest(name=name):
+                band = self.product.get_band(name)
+                data = band.interpolate(lines[:, None], pixels)
+                self.assertEqual(data.dtype, np.float32)
+                self.assertEqual(data.shape, (len(lines), len(pixels)))
+                ref = band.read_as_array()[lines[:, None], pixels]
+                npt.assert_allclose(data, ref, rtol=1e-6)
+
+    def test_interpolate_points(self):
+        band = self.product.get_band("latitude")
+        lines = [0, 10.5, 100]
+        pixels = [3, 77, 200]
+        data = band.interpolate(lines, pixels)
+        self.assertEqual(data.shape, (3,))
+        for value, line, pixel in zip(data, lines, pixels, strict=True):
+            npt.assert_allclose(value, band.interpolate(line, pixel))
+
+        ref = band.read_as_array()
+        npt.assert_allclose(data[[0, 2]], ref[[0, 100], [3, 200]], rtol=1e-6)
+
+
 class TestBandLowLevelAPI(unittest.TestCase):
     FIELD_INDEX = 7
     ELEM_INDEX = -1
@@ -1454,6 +3329,24 @@ class TestBandOnClosedProduct(unittest.TestCase):
             ValueError, self.band.read_as_array, self.WIDTH, self.HEIGHT
         )
 
+    def test_iter_blocks(self):
+        self.assertRaises(ValueError, self.band.iter_blocks)
+
+    def test_apply_scaling(self):
+        self.assertRaises(ValueError, self.band.apply_scaling, [1, 2])
+
+    def test_read_tie_points(self):
+        self.assertRaises(ValueError, self.band.read_tie_points)
+
+    def test_interpolate(self):
+        self.assertRaises(ValueError, self.band.interpolate, [0], [0])
+
+    def test_flag_coding(self):
+        self.assertRaises(ValueError, getattr, self.band, "flag_coding")
+
+    def test_read_flags(self):
+        self.assertRaises(ValueError, self.band.read_flags)
+
     def test_str(self):
         self.assertRaises(ValueError, str, self.band)
 
@@ -1508,6 +3401,42 @@ class TestCreateRaster(unittest.TestCase):
             self.RASTER_HEIGHT,
         )
 
+    def test_create_raster_with_buffer(self):
+        buf = np.zeros((self.RASTER_HEIGHT, self.RASTER_WIDTH), np.float32)
+        raster = epr.create_raster(
+            self.RASTER_DATA_TYPE,
+            self.RASTER_WIDTH,
+            self.RASTER_HEIGHT,
+            buffer=buf,
+        )
+        self.assertEqual(raster.get_width(), self.RASTER_WIDTH)
+        self.assertEqual(raster.get_height(), self.RASTER_HEIGHT)
+        raster.data[1, 2] = 3
+        self.assertEqual(buf[1, 2], 3)
+        self.assertEqual(raster.get_pixel(2, 1), 3)
+
+    def test_create_raster_with_too_small_buffer(self):
+        buf = np.zeros((self.RASTER_HEIGHT, self.RASTER_WIDTH - 1), np.float32)
+        self.assertRaises(
+            ValueError,
+            epr.create_raster,
+            self.RASTER_DATA_TYPE,
+            self.RASTER_WIDTH,
+            self.RASTER_HEIGHT,
+            buffer=buf,
+        )
+
+    def test_create_raster_with_read_only_buffer(self):
+        buf = bytes(self.RASTER_HEIGHT * self.RASTER_WIDTH * 4)
+        self.assertRaises(
+            BufferError,
+            epr.create_raster,
+            self.RASTER_DATA_TYPE,
+            self.RASTER_WIDTH,
+            self.RASTER_HEIGHT,
+            buffer=buf,
+        )
+
     def test_create_bitmask_raster(self):
         raster = epr.create_bitmask_raster(
             self.RASTER_WIDTH, self.RASTER_HEIGHT
@@ -1755,7 +3684,7 @@ class TestRasterLowLevelAPI(unittest.TestCase):
         self.assertEqual(self.raster._magic, _EPR_MAGIC_RASTER)  # noqa: SLF001
 
 
-class TestRecord(unittest.TestCase):
+class TestRecord(unittest.TestCase):  # noqa: PLR0904
     OPEN_MODE = "rb"
     DATASET_NAME = "MDS1_SQ_ADS"
     NUM_FIELD = 39
@@ -1840,6 +3769,13 @@ class TestRecord(unittest.TestCase):
     def test_index(self):
         self.assertEqual(self.record.index, self.RECORD_INDEX)
 
+    def test_dtype(self):
+        dtype = self.record.dtype
+        self.assertIsInstance(dtype, np.dtype)
+        self.assertEqual(dtype.itemsize, self.record.tot_size)
+        self.assertEqual(dtype["zero_doppler_time"], epr.MJD.newbyteorder(">"))
+        self.assertNotIn("spare_1", dtype.names)
+
 
 class TestRecordRW(TestRecord):
     OPEN_MODE = "rb+"
@@ -2042,6 +3978,9 @@ class TestRecordOnClosedProduct(unittest.TestCase):
     def test_fields(self):
         self.assertRaises(ValueError, self.record.fields)
 
+    def test_dtype(self):
+        self.assertRaises(ValueError, getattr, self.record, "dtype")
+
     def test_iter(self):
         self.assertRaises(ValueError, lambda x: next(iter(x)), self.record)
 
@@ -2201,6 +4140,7 @@ class TestFieldWriteOnReadOnly(unittest.TestCase):
 
 class TestFieldWrite(unittest.TestCase):
     OPEN_MODE = "rb+"
+    BACKEND = "stdio"
     REOPEN = False
     DATASET_NAME = "MDS1"
     RECORD_INDEX = 100
@@ -2290,7 +4230,7 @@ class TestFieldWrite(unittest.TestCase):
     def reopen(self, mode="rb"):
         if self.product is not None:
             self.product.close()
-        self.product = epr.Product(self.filename, mode)
+        self.product = epr.Product(self.filename, mode, self.BACKEND)
         self.dataset = self.product.get_dataset(self.DATASET_NAME)
         self.record = self.dataset.read_record(self.RECORD_INDEX)
         self.field = self.record.get_field(self.FIELD_NAME)
@@ -2598,6 +4538,17 @@ class TestFieldWriteReopen(TestFieldWrite):
     REOPEN = True
 
 
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestFieldWriteMmap(TestFieldWrite):
+    BACKEND = "mmap"
+
+
+@unittest.skipIf(MMAP_BACKEND_UNAVAILABLE, "mmap backend not available")
+class TestFieldWriteMmapReopen(TestFieldWrite):
+    BACKEND = "mmap"
+    REOPEN = True
+
+
 class TestTimeField(TestField):
     DATASET_NAME = "MDS1_SQ_ADS"
 
@@ -2889,6 +4840,12 @@ class TestDSD(unittest.TestCase):
     def test_ne_dsd_record(self):
         self.assertTrue(self.dsd != self.product)
 
+    def test_dataset_dsd(self):
+        dsd = self.product.get_dataset("MDS1").get_dsd()
+        self.assertEqual(dsd.ds_name, "MDS1")
+        self.product.close()
+        self.assertRaises(ValueError, getattr, dsd, "ds_name")
+
 
 class TestDSDRW(TestDSD):
     OPEN_MODE = "rb+"
@@ -3112,6 +5069,38 @@ class TestLibVersion(unittest.TestCase):
         self.assertTrue(isinstance(epr.EPR_C_API_VERSION, str))
 
 
+@unittest.skipIf(interpreters is None, "sub-interpreters not available")
+class TestSubinterpreters(unittest.TestCase):
+    CODE = f"""
+import epr
+with epr.open({str(PRODUCT_FILE)!r}) as product:
+    data = product.get_band("proc_data_1").read_as_array(100, 50)
+    assert data.shape == (50, 100), data.shape
+"""
+
+    def setUp(self):
+        self.interp = interpreters.create()
+        try:
+            self.interp.exec("import numpy")
+        except interpreters.ExecutionFailed:
+            self.interp.close()
+            self.skipTest("numpy cannot be imported in sub-interpreters")
+        try:
+            self.interp.exec("import epr")
+        except interpreters.ExecutionFailed:
+            self.interp.close()
+            self.skipTest("epr built without sub-interpreters support")
+
+    def tearDown(self):
+        self.interp.close()
+
+    def test_read_as_array(self):
+        self.interp.exec(self.CODE)
+        # the C API is still usable in the main interpreter
+        with epr.open(PRODUCT_FILE) as product:
+            product.get_band("proc_data_1").read_as_array(10, 10)
+
+
 # only PyPy 3 seems to be affected
 @unittest.skipIf(
     platform.python_implementation() == "PyPy",
@@ -3169,6 +5158,89 @@ class TestComplexBand(unittest.TestCase):
         ):
             self.product.get_complex_band_as_array(iname, qname, strict=True)
 
+    def test_read_complex_band(self):
+        iname = "proc_data_1"
+        qname = "proc_data_2"
+        cdata = self.product.read_complex_band(iname, qname)
+        self.assertIsInstance(cdata, np.ndarray)
+        self.assertEqual(cdata.dtype, np.complex64)
+
+        ref = self.product.get_complex_band_as_array(
+            iname, qname, strict=False
+        )
+        npt.assert_array_equal(cdata, ref.astype(np.complex64))
+
+    def test_read_complex_band_window(self):
+        iname = "proc_data_1"
+        qname = "proc_data_2"
+        xoffset, yoffset, width, height = 7, 11, 61, 37
+        cdata = self.product.read_complex_band(
+            iname, qname, window=(xoffset, yoffset, width, height)
+        )
+        self.assertEqual(cdata.shape, (height, width))
+
+        ref = self.product.get_complex_band_as_array(
+            iname, qname, strict=False
+        )
+        ref = ref[yoffset : yoffset + height, xoffset : xoffset + width]
+        npt.assert_array_equal(cdata, ref.astype(np.complex64))
+
+    def test_read_complex_band_looks(self):
+        iname = "proc_data_1"
+        qname = "proc_data_2"
+        window = (7, 11, 61, 37)
+        looks = (4, 3)
+        data = self.product.read_complex_band(
+            iname, qname, window=window, looks=looks
+        )
+        self.assertEqual(data.dtype, np.float32)
+        self.assertEqual(data.shape, (9, 20))
+
+        cdata = self.product.read_complex_band(iname, qname, window=window)
+        intensity = np.abs(cdata[:36, :60].astype(np.complex128)) ** 2
+        ref = intensity.reshape(9, 4, 20, 3).mean(axis=(1, 3))
+        npt.assert_allclose(data, ref, rtol=1e-6)
+
+    def test_read_complex_band_out(self):
+        iname = "proc_data_1"
+        qname = "proc_data_2"
+        window = (7, 11, 61, 37)
+        out = np.zeros((37, 61), dtype=np.complex64)
+        data = self.product.read_complex_band(
+            iname, qname, window=window, out=out
+        )
+        self.assertIs(data, out)
+        npt.assert_array_equal(
+            out, self.product.read_complex_band(iname, qname, window=window)
+        )
+
+    def test_read_complex_band_invalid_out(self):
+        iname = "proc_data_1"
+        qname = "proc_data_2"
+        window = (7, 11, 61, 37)
+        out = np.zeros((37, 61), dtype=np.complex128)
+        with self.assertRaises(ValueError):
+            self.product.read_complex_band(
+                iname, qname, window=window, out=out
+            )
+        with self.assertRaises(TypeError):
+            self.product.read_complex_band(
+                iname, qname, window=window, out=out.tolist()
+            )
+
+    def test_read_complex_band_invalid_looks(self):
+        with self.assertRaises(ValueError):
+            self.product.read_complex_band(
+                "proc_data_1", "proc_data_2", looks=(0, 1)
+            )
+
+    def test_read_complex_band_outside_scene(self):
+        width = self.product.get_scene_width()
+        with self.assertRaises(ValueError):
+            self.product.read_complex_band(
+                "proc_data_1", "proc_data_2", window=(width - 5, 0, 10, 10)
+            )
+
 
 if __name__ == "__main__":
     print(f"PyEPR:   {epr.__version__}")